@@ -4,8 +4,7 @@ from robyn import Response, Request, logger
 from robyn.authentication import TokenGetter, AuthenticationHandler
 from robyn.robyn import Identity
 
-from account.token import decode_access_token, get_cookies
-from common.utils import  is_valid_email
+from account.token import get_visited_token, verify_visited_token
 
 
 class CustomBearerGetter(TokenGetter):
@@ -16,7 +15,8 @@ class CustomBearerGetter(TokenGetter):
     @classmethod
     def get_token(cls, request: Request) -> Optional[str]:
         """
-        Retrieve the token from the 'cookie' header if present.
+        Retrieve the 'visited' token from the request identity, or from the
+        'cookie' header when no identity was attached.
 
         Args:
             request (Request): The incoming request object.
@@ -24,10 +24,7 @@ class CustomBearerGetter(TokenGetter):
         Returns:
             Optional[str]: The extracted token, if available.
         """
-        token = None
-        if "cookie" in request.headers:
-            token = get_cookies(request).get("visited")
-        return token
+        return get_visited_token(request)
 
     @classmethod
     def set_token(cls, request: Request, token: str):
@@ -73,15 +70,17 @@ class BasicAuthHandler(AuthenticationHandler):
         Returns:
             Optional[Identity]: The authenticated identity if successful, otherwise None.
         """
+        # already verified by the attach_identity middleware
+        if request.identity is not None and request.identity.claims.get("user"):
+            return request.identity
         token = self.token_getter.get_token(request)
         if not token:
             logger.error("No token found in the request.")
             return None
         try:
-            payload = decode_access_token(token)
-            payload_email = payload.get('email')
-            if is_valid_email(payload_email):
-                return Identity(claims={"user": payload_email})
+            visitor = verify_visited_token(token)
+            if visitor.email:
+                return visitor.to_identity()
             else:
                 logger.error("No email found in token payload.")
         except Exception as e:
@@ -0,0 +1,76 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from config.settings import settings
+
+# argon2id for new hashes; pbkdf2_sha1 hashes still verify and are replaced on the next login
+pwd_context = CryptContext(
+    schemes=["argon2", "pbkdf2_sha1"],
+    deprecated=["pbkdf2_sha1"],
+    argon2__type="ID",
+    argon2__memory_cost=65536,
+    argon2__time_cost=3,
+    argon2__parallelism=4,
+)
+
+# KDF calls take tens to hundreds of milliseconds of CPU; they never run on the event loop
+_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-kdf")
+
+
+async def hash_password(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_executor, pwd_context.hash, password)
+
+
+async def verify_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """
+    Check ``password`` against ``hashed``.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Whether it matched, and a replacement hash
+        when the stored one uses a deprecated scheme or outdated parameters.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor, pwd_context.verify_and_update, password, hashed
+    )
+
+
+class ConcurrencyGate:
+    """
+    Caps concurrent holders per key, e.g. logins in flight per client IP.
+    Used from the event loop only, so plain counters are enough.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._active: Dict[str, int] = {}
+
+    @contextmanager
+    def hold(self, key: str) -> Iterator[bool]:
+        """Yields False without taking a slot when ``key`` is at its limit."""
+        count = self._active.get(key, 0)
+        if count >= self.limit:
+            yield False
+            return
+        self._active[key] = count + 1
+        try:
+            yield True
+        finally:
+            if self._active[key] == 1:
+                del self._active[key]
+            else:
+                self._active[key] -= 1
+
+
+_login_ip_gate = ConcurrencyGate(settings.LOGIN_MAX_PER_IP)
+_login_email_gate = ConcurrencyGate(settings.LOGIN_MAX_PER_EMAIL)
+
+
+@contextmanager
+def login_slot(ip: Optional[str], email: str) -> Iterator[bool]:
+    """Yields whether a login attempt for ``email`` from ``ip`` may run now."""
+    with _login_ip_gate.hold(ip or "") as ip_ok, _login_email_gate.hold(email.lower()) as email_ok:
+        yield ip_ok and email_ok
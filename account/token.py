@@ -1,12 +1,16 @@
 import functools
+import time
+from dataclasses import dataclass
 from datetime import timedelta
 from http.cookies import SimpleCookie
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 import jwt
 from robyn import logger, Request
+from robyn.robyn import Identity
 
 from account.models import User
+from common.cache import TTLCache, MISSING
 from common.execute import get_from
 from common.utils import now_tz, is_valid_email, redirect_response, return_response
 from config.db import async_session
@@ -18,6 +22,11 @@ ALGORITHM = settings.JWT_ALGORITHM
 EMAIL_TOKEN_EXPIRY_MINUTES = settings.EMAIL_TOKEN_EXPIRY_MINUTES
 COOKIE_DOMAIN = settings.COOKIE_DOMAIN
 
+# authenticated users by 'visited' token, tagged ("user", email) for invalidation
+user_cache = TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+# decoded 'visited' payloads by token; invalid tokens are kept too, so garbage cookies are not re-verified
+token_cache = TTLCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL)
+
 
 # Token Handling
 async def verify_decode(request):
@@ -142,15 +151,75 @@ def get_cookies(request: Request) -> Optional[Dict[str, str]]:
     return None
 
 
-async def check_headers_valid_email(request):
-    """Check if the email in the headers is valid."""
+@dataclass(frozen=True)
+class Visitor:
+    """Identity carried by a verified 'visited' cookie."""
+    token: str
+    payload: dict
+
+    @property
+    def email(self) -> Optional[str]:
+        email = self.payload.get("email")
+        return email if is_valid_email(email) else None
+
+    def to_identity(self) -> Identity:
+        return Identity(claims={"user": self.email, "scope": self.payload.get("scope") or "", "token": self.token})
+
+
+def verify_visited_token(token: str) -> Visitor:
+    """Decode ``token``, reusing an earlier verification until the token expires."""
+    visitor = token_cache.get(token)
+    if visitor is MISSING or visitor.payload.get("exp", float("inf")) < time.time():
+        visitor = Visitor(token, decode_access_token(token))
+        token_cache.set(token, visitor)
+    return visitor
+
+
+def attach_identity(request: Request) -> Request:
+    """
+    Global before-request middleware: parse the cookie header and verify the
+    'visited' token once, and attach the result as ``request.identity``.
+    Requests without a valid session keep ``identity`` unset.
+    """
     try:
         cookie = get_cookies(request)
         token = cookie.get("visited") if cookie else None
         if token:
-            payload = decode_access_token(token)
-            email = payload.get("email")
-            return is_valid_email(email)
+            visitor = verify_visited_token(token)
+            if visitor.email:
+                request.identity = visitor.to_identity()
+    except Exception as e:
+        logger.error(f"Error attaching identity: {e}")
+    return request
+
+
+def get_visited_token(request: Request) -> Optional[str]:
+    identity = request.identity
+    if identity is not None and "token" in identity.claims:
+        return identity.claims["token"]
+    cookie = get_cookies(request)
+    return cookie.get("visited") if cookie else None
+
+
+def decode_visited(request: Request) -> Optional[Tuple[str, dict]]:
+    """
+    Token and payload of the 'visited' cookie. Served from the identity set
+    by ``attach_identity`` and the verified-token cache, so neither the
+    cookie header nor the JWT is parsed again by the handler.
+    """
+    token = get_visited_token(request)
+    if not token:
+        return None
+    visitor = verify_visited_token(token)
+    return visitor.token, visitor.payload
+
+
+async def check_headers_valid_email(request):
+    """Check if the email in the headers is valid."""
+    try:
+        visited = decode_visited(request)
+        if visited:
+            return is_valid_email(visited[1].get("email"))
     except Exception as e:
         logger.error(f"Error checking headers for valid email: {e}")
     return False
@@ -159,35 +228,56 @@ async def check_headers_valid_email(request):
 async def get_email_visited(request):
     """Retrieve the email from the 'visited' cookie."""
     try:
-        cookie = get_cookies(request)
-        token = cookie.get("visited") if cookie else None
-        if token:
-            payload = decode_access_token(token)
-            email = payload.get("email")
+        visited = decode_visited(request)
+        if visited:
+            email = visited[1].get("email")
             return email if is_valid_email(email) else None
     except Exception as e:
         logger.error(f"Error getting email from visited cookie: {e}")
     return None
 
 
-async def get_user_visited(request, session):
-    """Get the user associated with the visited email."""
+async def get_user_visited(request, session=None):
+    """
+    Get the user associated with the visited email. Users are cached per
+    token for USER_CACHE_TTL, so the DB is only queried on a miss or after
+    ``invalidate_user``; ``session`` is used for that query when given.
+    """
     try:
-        email = await get_email_visited(request)
-        if is_valid_email(email):
-            return await get_from(session, User, User.email, email)
+        visited = decode_visited(request)
+        if not visited:
+            return None
+        token, payload = visited
+        email = payload.get("email")
+        if not is_valid_email(email):
+            return None
+        user = user_cache.get(token)
+        if user is not MISSING:
+            return user
+        if session is None:
+            async with async_session() as session:
+                user = await get_from(session, User, User.email, email)
+        else:
+            user = await get_from(session, User, User.email, email)
+        if user:
+            user_cache.set(token, user, [("user", email)])
+        return user
     except Exception as e:
         logger.error(f"Error getting user from visited email: {e}")
     return None
 
 
+def invalidate_user(email: Optional[str]) -> None:
+    """Drop cached users of ``email`` after its record changed or its session ended."""
+    user_cache.invalidate(("user", email))
+
+
 async def get_payload_visited(request):
     """Get the payload from the 'visited' cookie."""
     try:
-        cookie = get_cookies(request)
-        token = cookie.get("visited") if cookie else None
-        if token:
-            return decode_access_token(token)
+        visited = decode_visited(request)
+        if visited:
+            return visited[1]
     except Exception as e:
         logger.error(f"Error getting payload from visited cookie: {e}")
     return None
@@ -200,11 +290,10 @@ def auth_required():
         @functools.wraps(func)
         async def wrapper(request: Request, *args, **kwargs):
             try:
-                async with async_session() as session:
-                    user = await get_user_visited(request, session)
-                    if user:
-                        return await func(request, *args, **kwargs)
-                    return redirect_response("/auth/login")
+                user = await get_user_visited(request)
+                if user:
+                    return await func(request, *args, **kwargs)
+                return redirect_response("/auth/login")
             except Exception as e:
                 logger.error(f"Error in auth_required decorator: {e}")
                 return return_response(
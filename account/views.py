@@ -1,13 +1,13 @@
 import urllib.parse
 from datetime import datetime
 
-from passlib.hash import pbkdf2_sha1
 from robyn import Response, SubRouter, Request, logger
-from sqlalchemy import or_
+from sqlalchemy import or_, update
 
 from account.models import User
+from account.passwords import hash_password, verify_password, login_slot
 from account.token import decode_reset_password, create_access_token, set_cookie, verify_decode, redirect_to_profile, \
-    auth_required, get_email_visited, get_user_visited
+    auth_required, get_email_visited, get_user_visited, invalidate_user
 from common.execute import get_from, filter_model
 from common.utils import is_valid_email, is_strong_password, redirect_response
 from config.db import async_session
@@ -57,7 +57,7 @@ async def user_register(request: Request):
             user_data = {
                 "name": user_name,
                 "email": user_email,
-                "password": pbkdf2_sha1.hash(user_password)
+                "password": await hash_password(user_password)
             }
             user = User(**user_data)
             session.add(user)
@@ -89,20 +89,29 @@ async def get_login(request: Request):
 @auth.post("/login")
 @redirect_to_profile()
 async def post_login(request: Request):
-    async with async_session() as session:
-        try:
-            obj = dict(urllib.parse.parse_qsl(request.body))
-            email = obj.get("email")
-            password = obj.get("password")
+    try:
+        obj = dict(urllib.parse.parse_qsl(request.body))
+        email = obj.get("email")
+        password = obj.get("password")
 
-            if not (is_valid_email(email) and password):
+        if not (is_valid_email(email) and password):
+            return Response(
+                status_code=400,
+                headers={"Content-Type": "text/plain"},
+                description="Missing or invalid email or password."
+            )
+
+        with login_slot(request.ip_addr, email) as allowed:
+            if not allowed:
                 return Response(
-                    status_code=400,
-                    headers={"Content-Type": "text/plain"},
-                    description="Missing or invalid email or password."
+                    status_code=429,
+                    headers={"Content-Type": "text/plain", "Retry-After": "1"},
+                    description="Too many login attempts in progress."
                 )
 
-            user = await get_from(session, User, User.email, email)
+            # no connection is held while the password is checked
+            async with async_session() as session:
+                user = await get_from(session, User, User.email, email)
             if not user:
                 return Response(
                     status_code=404,
@@ -117,32 +126,37 @@ async def post_login(request: Request):
                     description="Email not verified."
                 )
 
-            if not pbkdf2_sha1.verify(password, user.password):
+            verified, new_hash = await verify_password(password, user.password)
+            if not verified:
                 return Response(
                     status_code=400,
                     headers={"Content-Type": "text/plain"},
                     description="Invalid password."
                 )
 
-            user.last_login_date = datetime.now()
-            session.add(user)
+        values = {"last_login_date": datetime.now()}
+        if new_hash:
+            values["password"] = new_hash
+        async with async_session() as session:
+            await session.execute(update(User).where(User.id == user.id).values(**values))
             await session.commit()
+        invalidate_user(user.email)
 
-            payload = {"email": user.email, "scope": "email_verification"}
-            token = create_access_token(payload)
+        payload = {"email": user.email, "scope": "email_verification"}
+        token = create_access_token(payload)
 
-            return Response(
-                status_code=302,
-                headers={"Set-Cookie": set_cookie(token), "Location": "/"},
-                description="Redirecting to home."
-            )
-        except Exception as e:
-            logger.error(f"An error occurred during login: {e}")
-            return Response(
-                status_code=500,
-                headers={"Content-Type": "text/plain"},
-                description="Internal server error."
-            )
+        return Response(
+            status_code=302,
+            headers={"Set-Cookie": set_cookie(token), "Location": "/"},
+            description="Redirecting to home."
+        )
+    except Exception as e:
+        logger.error(f"An error occurred during login: {e}")
+        return Response(
+            status_code=500,
+            headers={"Content-Type": "text/plain"},
+            description="Internal server error."
+        )
 
 
 @auth.get("/logout")
@@ -150,12 +164,11 @@ async def post_login(request: Request):
 async def get_user_logout(request: Request):
     try:
         email = await get_email_visited(request)
-        async with async_session() as session:
-            user = await get_from(session, User, User.email, email)
-            if user and user.email == email:
-                auth_ = True
-                context = {"request": request, "auth": auth_, "user": user}
-                return templates.render_template("/auth/logout.html", **context)
+        user = await get_user_visited(request)
+        if user and user.email == email:
+            auth_ = True
+            context = {"request": request, "auth": auth_, "user": user}
+            return templates.render_template("/auth/logout.html", **context)
         return Response(
             status_code=403,
             headers={"Content-Type": "text/plain"},
@@ -182,15 +195,15 @@ async def user_logout(request: Request):
                 description="Invalid email in token payload."
             )
 
-        async with async_session() as session:
-            user = await get_from(session, User, User.email, email)
-            if not user or user.email != email:
-                return Response(
-                    status_code=400,
-                    headers={"Content-Type": "text/plain"},
-                    description="Invalid user."
-                )
+        user = await get_user_visited(request)
+        if not user or user.email != email:
+            return Response(
+                status_code=400,
+                headers={"Content-Type": "text/plain"},
+                description="Invalid user."
+            )
 
+        invalidate_user(email)
         return Response(
             status_code=302,
             headers={"Set-Cookie": set_cookie('', 0), "Location": "/"},
@@ -221,6 +234,7 @@ async def verify_email(request: Request):
             user.email_verified = True
             user.is_active = True
             await session.commit()
+            invalidate_user(email)
 
             return redirect_response("/auth/login")
     except Exception as e:
@@ -348,11 +362,13 @@ async def reset_password_confirm(request: Request):
         obj = dict(urllib.parse.parse_qsl(request.body))
         new_password = obj.get("password")
         if is_strong_password(new_password):
+            password_hash = await hash_password(new_password)
             async with async_session() as session:
                 user = await get_from(session, User, User.email, email)
-                user.password = pbkdf2_sha1.hash(new_password)
+                user.password = password_hash
                 session.add(user)
                 await session.commit()
+            invalidate_user(email)
             return redirect_response("/auth/login")
         return Response(
             status_code=302,
@@ -372,12 +388,11 @@ async def reset_password_confirm(request: Request):
 @auth_required()
 async def get_user_detail(request: Request):
     try:
-        async with async_session() as session:
-            user = await get_user_visited(request, session)
-            if user:
-                auth_ = True
-                context = {"request": request, "auth": auth_, "user": user}
-                return templates.render_template("/auth/details.html", **context)
+        user = await get_user_visited(request)
+        if user:
+            auth_ = True
+            context = {"request": request, "auth": auth_, "user": user}
+            return templates.render_template("/auth/details.html", **context)
         return Response(
             status_code=403,
             headers={"Content-Type": "text/plain"},
@@ -0,0 +1,53 @@
+"""Create hero_stats table
+
+Revision ID: 0b5d8e2f7c46
+Revises: f6c19d3e8a27
+Create Date: 2024-08-27 13:44:09.731582
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b5d8e2f7c46'
+down_revision: Union[str, None] = 'f6c19d3e8a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # populate afterwards with `python -m ingest hero-stats`
+    op.create_table('hero_stats',
+    sa.Column('scope_type', sa.String(length=10), nullable=False),
+    sa.Column('scope_id', sa.BigInteger(), nullable=False),
+    sa.Column('game_version_id', sa.SmallInteger(), nullable=False),
+    sa.Column('hero_id', sa.SmallInteger(), nullable=False),
+    sa.Column('matches', sa.Integer(), nullable=False),
+    sa.Column('picks', sa.Integer(), nullable=False),
+    sa.Column('wins', sa.Integer(), nullable=False),
+    sa.Column('bans', sa.Integer(), nullable=False),
+    sa.Column('first_phase_bans', sa.Integer(), nullable=False),
+    sa.Column('pick_rate', sa.Float(), nullable=False),
+    sa.Column('ban_rate', sa.Float(), nullable=False),
+    sa.Column('first_phase_ban_rate', sa.Float(), nullable=False),
+    sa.Column('win_rate', sa.Float(), nullable=False),
+    sa.Column('win_rate_low', sa.Float(), nullable=False),
+    sa.Column('win_rate_high', sa.Float(), nullable=False),
+    sa.Column('uuid', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('uuid')
+    )
+    op.create_index('ux_hero_stats_scope', 'hero_stats',
+                    ['scope_type', 'scope_id', 'game_version_id', 'hero_id'], unique=True)
+    op.create_index(op.f('ix_hero_stats_uuid'), 'hero_stats', ['uuid'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_hero_stats_uuid'), table_name='hero_stats')
+    op.drop_index('ux_hero_stats_scope', table_name='hero_stats')
+    op.drop_table('hero_stats')
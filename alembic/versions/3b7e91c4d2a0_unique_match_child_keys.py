@@ -0,0 +1,44 @@
+"""Unique keys for match players and pick/bans
+
+Revision ID: 3b7e91c4d2a0
+Revises: fcc2c78b0772
+Create Date: 2024-08-12 11:04:51.216340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e91c4d2a0'
+down_revision: Union[str, None] = 'fcc2c78b0772'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # keep the most recently updated row of any duplicates left by row-by-row saves;
+    # plain correlated subqueries so this runs on SQLite as well as PostgreSQL
+    op.execute(
+        'DELETE FROM match_players WHERE EXISTS ('
+        'SELECT 1 FROM match_players b '
+        'WHERE b.match_id = match_players.match_id AND b.player_slot = match_players.player_slot '
+        'AND (b.updated_at > match_players.updated_at '
+        'OR (b.updated_at = match_players.updated_at AND b.uuid > match_players.uuid)))'
+    )
+    op.execute(
+        'DELETE FROM match_picks_ban WHERE EXISTS ('
+        'SELECT 1 FROM match_picks_ban b '
+        'WHERE b.match_id = match_picks_ban.match_id AND b."order" = match_picks_ban."order" '
+        'AND (b.updated_at > match_picks_ban.updated_at '
+        'OR (b.updated_at = match_picks_ban.updated_at AND b.uuid > match_picks_ban.uuid)))'
+    )
+    op.create_index('ux_match_players_match_id_player_slot', 'match_players', ['match_id', 'player_slot'],
+                    unique=True)
+    op.create_index('ux_match_picks_ban_match_id_order', 'match_picks_ban', ['match_id', 'order'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_match_picks_ban_match_id_order', table_name='match_picks_ban')
+    op.drop_index('ux_match_players_match_id_player_slot', table_name='match_players')
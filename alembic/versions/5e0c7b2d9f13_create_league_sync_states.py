@@ -0,0 +1,41 @@
+"""Create league_sync_states table
+
+Revision ID: 5e0c7b2d9f13
+Revises: c41a9e0b7f35
+Create Date: 2024-08-21 14:02:51.630417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0c7b2d9f13'
+down_revision: Union[str, None] = 'c41a9e0b7f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('league_sync_states',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('last_series_id', sa.BigInteger(), nullable=True),
+    sa.Column('last_match_date_time', sa.BigInteger(), nullable=True),
+    sa.Column('is_backfilled', sa.Boolean(), nullable=True),
+    sa.Column('synced_at', sa.DateTime(), nullable=True),
+    sa.Column('uuid', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id', 'uuid')
+    )
+    op.create_index(op.f('ix_league_sync_states_id'), 'league_sync_states', ['id'], unique=True)
+    op.create_index(op.f('ix_league_sync_states_uuid'), 'league_sync_states', ['uuid'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_league_sync_states_uuid'), table_name='league_sync_states')
+    op.drop_index(op.f('ix_league_sync_states_id'), table_name='league_sync_states')
+    op.drop_table('league_sync_states')
@@ -0,0 +1,40 @@
+"""Add fingerprint columns to ingested tables
+
+Revision ID: 8d2f4a6c1e57
+Revises: 3b7e91c4d2a0
+Create Date: 2024-08-14 18:22:07.503129
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f4a6c1e57'
+down_revision: Union[str, None] = '3b7e91c4d2a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = (
+    'leagues',
+    'series',
+    'matches',
+    'match_picks_ban',
+    'match_players',
+    'teams',
+    'players',
+    'steam_accounts',
+    'pro_steam_accounts',
+)
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column('fingerprint', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, 'fingerprint')
@@ -0,0 +1,28 @@
+"""Add indexes backing keyset pagination of the player and team lists
+
+Revision ID: 9c3a5f7e1b28
+Revises: 0b5d8e2f7c46
+Create Date: 2024-08-28 09:41:03.512874
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3a5f7e1b28'
+down_revision: Union[str, None] = '0b5d8e2f7c46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_players_last_match_date_id', 'players', ['last_match_date', 'id'], unique=False,
+                    postgresql_ops={'last_match_date': 'DESC NULLS LAST', 'id': 'DESC'})
+    op.create_index('ix_teams_rank_id', 'teams', ['rank', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_teams_rank_id', table_name='teams')
+    op.drop_index('ix_players_last_match_date_id', table_name='players')
@@ -0,0 +1,41 @@
+"""Create picks_scope_versions table
+
+Revision ID: b9e1c7d4a2f8
+Revises: d7a2c4e9f1b3
+Create Date: 2024-09-04 11:08:52.730164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e1c7d4a2f8'
+down_revision: Union[str, None] = 'd7a2c4e9f1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # rows appear as matches are saved; until then a scope's validator is empty
+    op.create_table('picks_scope_versions',
+    sa.Column('scope_type', sa.String(length=10), nullable=False),
+    sa.Column('scope_id', sa.BigInteger(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('uuid', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('uuid')
+    )
+    op.create_index('ux_picks_scope_versions_scope', 'picks_scope_versions',
+                    ['scope_type', 'scope_id'], unique=True)
+    op.create_index(op.f('ix_picks_scope_versions_uuid'), 'picks_scope_versions', ['uuid'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_picks_scope_versions_uuid'), table_name='picks_scope_versions')
+    op.drop_index('ux_picks_scope_versions_scope', table_name='picks_scope_versions')
+    op.drop_table('picks_scope_versions')
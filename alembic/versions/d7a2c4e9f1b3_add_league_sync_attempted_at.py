@@ -0,0 +1,26 @@
+"""Record when a league sync was last attempted
+
+Revision ID: d7a2c4e9f1b3
+Revises: 9c3a5f7e1b28
+Create Date: 2024-09-02 10:17:45.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a2c4e9f1b3'
+down_revision: Union[str, None] = '9c3a5f7e1b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('league_sync_states', sa.Column('attempted_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('league_sync_states', 'attempted_at')
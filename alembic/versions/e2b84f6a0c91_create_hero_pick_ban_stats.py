@@ -0,0 +1,44 @@
+"""Create hero_pick_ban_stats table
+
+Revision ID: e2b84f6a0c91
+Revises: a7d3e5f10b64
+Create Date: 2024-08-23 16:18:40.274519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b84f6a0c91'
+down_revision: Union[str, None] = 'a7d3e5f10b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # populate afterwards with `python -m ingest rebuild-stats`
+    op.create_table('hero_pick_ban_stats',
+    sa.Column('scope_type', sa.String(length=10), nullable=False),
+    sa.Column('scope_id', sa.BigInteger(), nullable=False),
+    sa.Column('game_version_id', sa.SmallInteger(), nullable=False),
+    sa.Column('hero_id', sa.SmallInteger(), nullable=False),
+    sa.Column('is_pick', sa.Boolean(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('uuid', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('uuid')
+    )
+    op.create_index('ux_hero_pick_ban_stats_scope', 'hero_pick_ban_stats',
+                    ['scope_type', 'scope_id', 'game_version_id', 'hero_id', 'is_pick'], unique=True)
+    op.create_index(op.f('ix_hero_pick_ban_stats_uuid'), 'hero_pick_ban_stats', ['uuid'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_hero_pick_ban_stats_uuid'), table_name='hero_pick_ban_stats')
+    op.drop_index('ux_hero_pick_ban_stats_scope', table_name='hero_pick_ban_stats')
+    op.drop_table('hero_pick_ban_stats')
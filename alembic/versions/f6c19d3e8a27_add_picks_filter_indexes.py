@@ -0,0 +1,35 @@
+"""Add composite indexes for filtered hero pick queries
+
+Revision ID: f6c19d3e8a27
+Revises: e2b84f6a0c91
+Create Date: 2024-08-26 11:05:17.846230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6c19d3e8a27'
+down_revision: Union[str, None] = 'e2b84f6a0c91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_matches_league_id_game_version_id_start_date_time', 'matches',
+                    ['league_id', 'game_version_id', 'start_date_time'], unique=False)
+    op.create_index('ix_matches_game_version_id_start_date_time', 'matches',
+                    ['game_version_id', 'start_date_time'], unique=False)
+    op.create_index('ix_match_picks_ban_match_id_is_pick_hero_id', 'match_picks_ban',
+                    ['match_id', 'is_pick', 'hero_id'], unique=False)
+    op.create_index('ix_match_players_steam_account_id_match_id_hero_id', 'match_players',
+                    ['steam_account_id', 'match_id', 'hero_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_match_players_steam_account_id_match_id_hero_id', table_name='match_players')
+    op.drop_index('ix_match_picks_ban_match_id_is_pick_hero_id', table_name='match_picks_ban')
+    op.drop_index('ix_matches_game_version_id_start_date_time', table_name='matches')
+    op.drop_index('ix_matches_league_id_game_version_id_start_date_time', table_name='matches')
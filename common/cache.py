@@ -0,0 +1,114 @@
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+MISSING = object()
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries expire after ``ttl`` seconds.
+
+    Entries can carry tags, e.g. ("league", 16435), so writers can drop
+    every entry derived from an entity without knowing the exact keys.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, Tuple[Hashable, ...]]]" = OrderedDict()
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Hashable] = ()) -> None:
+        if key in self._entries:
+            self._drop(key)
+        tags = tuple(tags)
+        self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._drop(next(iter(self._entries)))
+
+    def invalidate(self, *tags: Hashable) -> None:
+        for tag in tags:
+            for key in self._tags.pop(tag, ()):
+                self._drop(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+def cached(cache: TTLCache, tags: Optional[Callable[..., Iterable[Hashable]]] = None):
+    """
+    Cache the result of an async function, keyed on its name and arguments
+    (which must be hashable). Concurrent misses for the same key share one
+    call. Falsy results, i.e. the services' error values, are not stored.
+
+    Args:
+        cache (TTLCache): Cache to store results in.
+        tags (Optional[Callable]): Called with the function's arguments, returns the entry's tags.
+    """
+    def decorator(func):
+        pending: Dict[Hashable, asyncio.Future] = {}
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+            value = cache.get(key)
+            if value is not MISSING:
+                return value
+            if key in pending:
+                return await asyncio.shield(pending[key])
+
+            future = asyncio.get_running_loop().create_future()
+            pending[key] = future
+            try:
+                value = await func(*args, **kwargs)
+                if value:
+                    cache.set(key, value, tags(*args, **kwargs) if tags else ())
+                future.set_result(value)
+                return value
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # retrieved here so a miss without waiters does not log "exception never retrieved"
+                future.exception()
+                raise
+            finally:
+                del pending[key]
+
+        return wrapper
+
+    return decorator
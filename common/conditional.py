@@ -0,0 +1,71 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import orjson
+from robyn import Request, Response, Headers
+from sqlalchemy import select, ScalarSelect
+
+from config.db import async_session
+from config.settings import BASE_DIR
+
+# changes with every deploy that touches a template, so cached pages are not revalidated across it
+TEMPLATES_VERSION = max((path.stat().st_mtime_ns for path in (BASE_DIR / "templates").rglob("*.html")), default=0)
+
+
+async def max_updated_at(*subqueries: ScalarSelect) -> Optional[datetime]:
+    """Latest of several ``select(func.max(Model.updated_at))...scalar_subquery()`` values, in one round trip."""
+    async with async_session() as session:
+        result = await session.execute(select(*subqueries))
+        values = [value for value in result.one() if value is not None]
+    return max(values) if values else None
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the parts identifying a representation, e.g. (kind, id, auth, updated_at)."""
+    payload = orjson.dumps([TEMPLATES_VERSION, *parts], default=str)
+    return f'"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"'
+
+
+def http_date(dt: datetime) -> str:
+    # updated_at is stored as naive local time
+    return format_datetime(dt.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    Evaluate If-None-Match, or If-Modified-Since when it is absent (RFC 9110 13.2.2).
+    If-None-Match uses weak comparison, so a CDN's W/ prefix still matches.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.astimezone(timezone.utc).replace(microsecond=0) <= since
+    return False
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, description="", headers=Headers(headers))
+
+
+def add_headers(response: Response, headers: Dict[str, str]) -> Response:
+    for key, value in headers.items():
+        response.headers.set(key, value)
+    return response
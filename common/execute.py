@@ -1,11 +1,106 @@
-from typing import Type, Tuple, Dict, Any
+import hashlib
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Type, Tuple, Dict, Any, List, Sequence, Optional, Iterable
 
+import orjson
 from robyn import logger
-from sqlalchemy import select, text
+from sqlalchemy import select, text, event, inspect, String
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
+from config import db
 from config.db import Base, async_session
+from config.settings import settings
+
+# bind parameter ceiling per statement: asyncpg 32767, SQLite 32766 (since 3.32)
+MAX_BIND_PARAMS = {"postgresql": 32767, "sqlite": 32766}
+DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+PENDING_KNOWN_IDS = "pending_known_ids"
+
+
+def _fingerprint_default(value: Any) -> str:
+    if isinstance(value, Base):
+        return str(value.uuid)
+    return str(value)
+
+
+def make_fingerprint(values: Dict[str, Any]) -> str:
+    """Stable digest of a row's values, independent of key order."""
+    payload = orjson.dumps(values, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=_fingerprint_default)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class KnownIds:
+    """
+    Bounded LRU set of primary keys known to exist in one table.
+
+    Used to skip stub inserts for foreign-key targets (Team, League, Series,
+    SteamAccount, ...) that were already written or loaded by this process.
+    Rows are only soft-deleted, so a known id never goes stale.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._ids: OrderedDict[Any, None] = OrderedDict()
+
+    def __contains__(self, key: Any) -> bool:
+        if key in self._ids:
+            self._ids.move_to_end(key)
+            return True
+        return False
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add_many(self, keys: Iterable[Any]) -> None:
+        for key in keys:
+            self._ids[key] = None
+            self._ids.move_to_end(key)
+        while len(self._ids) > self.capacity:
+            self._ids.popitem(last=False)
+
+    def clear(self) -> None:
+        self._ids.clear()
+
+
+_known_ids: Dict[str, KnownIds] = {}
+
+
+def known_ids(model: Type[Base]) -> KnownIds:
+    cache = _known_ids.get(model.__tablename__)
+    if cache is None:
+        cache = _known_ids[model.__tablename__] = KnownIds(settings.KNOWN_IDS_CACHE_SIZE)
+    return cache
+
+
+def remember_on_commit(session: AsyncSession, model: Type[Base], keys: Iterable[Any]) -> None:
+    """Queue ids to be added to the model's KnownIds once the session commits."""
+    session.info.setdefault(PENDING_KNOWN_IDS, []).append((model, list(keys)))
+
+
+@event.listens_for(Session, "after_commit")
+def _flush_pending_known_ids(session: Session) -> None:
+    for model, keys in session.info.pop(PENDING_KNOWN_IDS, []):
+        known_ids(model).add_many(keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending_known_ids(session: Session) -> None:
+    session.info.pop(PENDING_KNOWN_IDS, None)
+
+
+async def warm_known_ids(*models: Type[Base]) -> None:
+    """Preload the most recent ids of each model into its KnownIds cache."""
+    async with async_session() as session:
+        for model in models:
+            cache = known_ids(model)
+            result = await session.execute(select(model.id).order_by(model.id.desc()).limit(cache.capacity))
+            cache.add_many(reversed(result.scalars().all()))
+            logger.info("known ids warmed: %s=%s", model.__tablename__, len(cache))
 
 
 async def active(session, model, **kwargs):
@@ -54,6 +149,12 @@ async def filter_model(session, model, filter_):
 
 
 async def get_count_conn():
+    """
+    Number of active PostgreSQL connections, as ``{"count": n}``. The count is
+    None on other backends, which have no pg_stat_activity.
+    """
+    if db.engine.dialect.name != "postgresql":
+        return {"count": None}
     async with async_session() as session:
         result = await session.execute(text("SELECT COUNT(*) FROM pg_stat_activity WHERE state = 'active';"))
         count = result.scalar()
@@ -97,6 +198,34 @@ async def get_or_create(
         raise
 
 
+def as_column_values(model: Type[Base], values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Replaces many-to-one relationships in ``values`` by their foreign-key
+    columns, so they can be compared without loading the related row.
+    """
+    relationships = inspect(model).relationships
+    columns = {}
+    for key, value in values.items():
+        if key not in relationships:
+            columns[key] = value
+            continue
+        for local, remote in relationships[key].local_remote_pairs:
+            columns[local.key] = getattr(value, remote.key) if value is not None else None
+    return columns
+
+
+def same_value(model: Type[Base], instance: Base, key: str, value: Any) -> bool:
+    """Whether ``instance`` already stores ``value`` in ``key``, as the database would have stored it."""
+    stored = getattr(instance, key)
+    if stored == value:
+        return True
+    column = model.__table__.columns.get(key)
+    if column is None or stored is None or value is None or not isinstance(column.type, String):
+        return False
+    # text columns hold str(value); CHAR(n) also comes back padded with spaces
+    return str(stored).rstrip() == str(value).rstrip()
+
+
 async def update_or_create(
         session: AsyncSession,
         model: Type[Base],
@@ -105,7 +234,8 @@ async def update_or_create(
 ) -> Tuple[Base, bool]:
     """
     Attempts to get an instance of the model matching the kwargs.
-    If found, updates it with the defaults.
+    If found, updates it with the defaults unless its stored fingerprint or its
+    current values show nothing changed, in which case nothing is written.
     If not found, creates a new instance with the combined kwargs and defaults.
 
     :param session: SQLAlchemy AsyncSession
@@ -117,8 +247,20 @@ async def update_or_create(
     result = await session.execute(select(model).filter_by(**kwargs))
     instance = result.scalars().first()
 
+    defaults = as_column_values(model, defaults or {})
+    fingerprinted = hasattr(model, "fingerprint")
+    if fingerprinted:
+        digest = make_fingerprint({**kwargs, **defaults})
+        if instance and instance.fingerprint == digest:
+            return instance, False
+
     if instance:
-        for key, value in (defaults or {}).items():
+        # the stored digest may be another writer's (a different column set):
+        # compare the columns themselves before writing anything
+        changed = {key: value for key, value in defaults.items() if not same_value(model, instance, key, value)}
+        if not changed:
+            return instance, False
+        for key, value in changed.items():
             setattr(instance, key, value)
         created = False
     else:
@@ -126,6 +268,9 @@ async def update_or_create(
         instance = model(**params)
         session.add(instance)
         created = True
+    if fingerprinted:
+        instance.fingerprint = digest
+        defaults = {**defaults, "fingerprint": digest}
 
     try:
         await session.commit()
@@ -142,3 +287,131 @@ async def update_or_create(
             raise
 
     return instance, created
+
+
+async def bulk_upsert(
+        session: AsyncSession,
+        model: Type[Base],
+        rows: Sequence[Dict[str, Any]],
+        index_elements: Sequence[str] = ("id",),
+        update_fields: Optional[Sequence[str]] = None,
+) -> List[Any]:
+    """
+    Inserts or updates many rows with INSERT ... ON CONFLICT DO UPDATE,
+    split into as few statements as the dialect's bind-parameter limit allows.
+    The caller owns the transaction: nothing is committed here.
+
+    :param session: SQLAlchemy AsyncSession
+    :param model: SQLAlchemy model class
+    :param rows: Column values per row; rows sharing a conflict key are collapsed, last one wins
+    :param index_elements: Columns of the unique index used as the conflict target
+    :param update_fields: Columns overwritten on conflict; defaults to every supplied column
+        except the conflict keys. An empty sequence leaves existing rows untouched (DO NOTHING).
+        A row only overwrites the columns it supplies: rows are written in one statement per
+        set of supplied columns, so a missing column never turns into NULL
+    :return: Conflict-key values of the inserted or updated rows; rows of fingerprinted
+        models whose values are unchanged are skipped and not returned
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect not in DIALECT_INSERTS:
+        raise NotImplementedError(f"bulk_upsert does not support dialect {dialect}")
+
+    table = model.__table__
+    fingerprinted = "fingerprint" in table.c and (update_fields is None or len(update_fields) > 0)
+    unique_rows = {}
+    for row in rows:
+        key = tuple(row.get(field) for field in index_elements)
+        if None not in key:
+            if fingerprinted:
+                # digest only what gets written, so a skipped row really has nothing to write
+                written = row if update_fields is None else {f: row[f] for f in update_fields if f in row}
+                row = {**row, "fingerprint": make_fingerprint(written)}
+            unique_rows[key] = row
+    if not unique_rows:
+        return []
+    # a stable key order keeps concurrent transactions locking rows in the same sequence
+    unique_rows = dict(sorted(unique_rows.items()))
+
+    # a multi-row VALUES needs the same columns in every row
+    groups: Dict[frozenset, List[Dict[str, Any]]] = {}
+    for row in unique_rows.values():
+        groups.setdefault(frozenset(row), []).append(row)
+
+    now = datetime.now()
+    key_columns = [table.c[field] for field in index_elements]
+    keys = []
+    for row_columns, group in groups.items():
+        columns = row_columns | {"uuid", "created_at", "updated_at"}
+        values = [{"uuid": uuid.uuid4(), "created_at": now, "updated_at": now, **row} for row in group]
+        if update_fields is None:
+            set_fields = [c for c in columns if c not in index_elements and c not in ("uuid", "created_at")]
+        elif update_fields:
+            extra_fields = ["updated_at", "fingerprint"] if fingerprinted else ["updated_at"]
+            set_fields = [c for c in dict.fromkeys([*update_fields, *extra_fields]) if c in columns]
+        else:
+            set_fields = []
+
+        chunk_size = max(1, MAX_BIND_PARAMS[dialect] // len(columns))
+        for start in range(0, len(values), chunk_size):
+            stmt = DIALECT_INSERTS[dialect](table).values(values[start:start + chunk_size])
+            if set_fields:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=key_columns,
+                    set_={field: stmt.excluded[field] for field in set_fields},
+                    where=table.c.fingerprint.is_distinct_from(stmt.excluded.fingerprint) if fingerprinted else None,
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=key_columns)
+            result = await session.execute(stmt.returning(*key_columns))
+            keys.extend(row[0] if len(key_columns) == 1 else tuple(row) for row in result.all())
+    if tuple(index_elements) == ("id",):
+        remember_on_commit(session, model, (key[0] for key in unique_rows))
+    return keys
+
+
+async def bulk_increment(
+        session: AsyncSession,
+        model: Type[Base],
+        rows: Sequence[Dict[str, Any]],
+        index_elements: Sequence[str],
+        fields: Sequence[str],
+) -> None:
+    """
+    Adds the ``fields`` values of each row to the matching counter row,
+    inserting it when missing (INSERT ... ON CONFLICT DO UPDATE SET f = f + excluded.f).
+    The caller owns the transaction: nothing is committed here.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect not in DIALECT_INSERTS:
+        raise NotImplementedError(f"bulk_increment does not support dialect {dialect}")
+    if not rows:
+        return
+
+    table = model.__table__
+    now = datetime.now()
+    # sorted like bulk_upsert so concurrent increments lock rows in the same order
+    rows = sorted(rows, key=lambda row: tuple(row[field] for field in index_elements))
+    values = [{"uuid": uuid.uuid4(), "created_at": now, "updated_at": now, **row} for row in rows]
+    chunk_size = max(1, MAX_BIND_PARAMS[dialect] // len(values[0]))
+    for start in range(0, len(values), chunk_size):
+        stmt = DIALECT_INSERTS[dialect](table).values(values[start:start + chunk_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[field] for field in index_elements],
+            set_={
+                "updated_at": stmt.excluded.updated_at,
+                **{field: table.c[field] + stmt.excluded[field] for field in fields},
+            },
+        )
+        await session.execute(stmt)
+
+
+async def ensure_exists(session: AsyncSession, model: Type[Base], rows: Sequence[Dict[str, Any]]) -> None:
+    """
+    Inserts stub rows (keyed by ``id``) for foreign-key targets that are not
+    known to exist yet; existing rows are left untouched. Ids served from the
+    KnownIds cache cost no database round trip.
+    """
+    cache = known_ids(model)
+    missing = [row for row in rows if row.get("id") is not None and row["id"] not in cache]
+    if missing:
+        await bulk_upsert(session, model, missing, update_fields=())
@@ -0,0 +1,160 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+
+from robyn import logger
+
+from config.settings import settings
+
+# seconds covered by each rate-limit window advertised by the upstream APIs
+RATE_LIMIT_WINDOWS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+    "month": 2592000,
+}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given either as delta-seconds or an HTTP date.
+
+    Args:
+        value (Optional[str]): The raw header value.
+
+    Returns:
+        Optional[float]: Number of seconds to wait, or None if absent/invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_rate_limit_remaining(headers: Mapping[str, str]) -> Dict[str, int]:
+    """
+    Collect remaining-quota headers, e.g. ``X-RateLimit-Remaining-Minute`` (STRATZ)
+    or ``X-Rate-Limit-Remaining-Minute`` (OpenDota), keyed by window name.
+    """
+    remaining = {}
+    for key, value in headers.items():
+        name = key.lower().replace("ratelimit", "rate-limit")
+        if "rate-limit-remaining-" not in name:
+            continue
+        window = name.rsplit("-", 1)[-1]
+        if window in RATE_LIMIT_WINDOWS:
+            try:
+                remaining[window] = int(value)
+            except ValueError:
+                continue
+    return remaining
+
+
+class UpstreamLimiter:
+    """
+    Token bucket plus in-flight cap for a single upstream API.
+
+    The refill rate adapts to the upstream: it is halved on 429/503 responses
+    and recovers additively on success, never exceeding the configured rate.
+    Retry-After and exhausted rate-limit windows pause the whole bucket.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, max_in_flight: int):
+        self.name = name
+        self.max_rate = rate
+        self.min_rate = rate / 16
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def _take_token(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Wait for an in-flight slot and a token, then hold the slot for the request."""
+        async with self._in_flight:
+            await self._take_token()
+            yield
+
+    def pause(self, seconds: float) -> None:
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            self._paused_until = until
+            self._tokens = 0.0
+            logger.warn("%s limiter paused for %.1fs (rate %.2f/s)", self.name, seconds, self.rate)
+
+    def on_response(self, status_code: int, headers: Mapping[str, str]) -> Optional[float]:
+        """
+        Feed a response back into the limiter.
+
+        Returns:
+            Optional[float]: The Retry-After delay when the upstream asked us to back off.
+        """
+        retry_after = parse_retry_after(headers.get("retry-after"))
+        if status_code in (429, 503):
+            self.rate = max(self.min_rate, self.rate / 2)
+            delay = retry_after if retry_after is not None else 1 / self.rate
+            self.pause(delay)
+            return delay
+
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+        for window, left in parse_rate_limit_remaining(headers).items():
+            if left <= 0:
+                self.pause(retry_after or RATE_LIMIT_WINDOWS[window])
+        return retry_after
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    if retry_after is not None:
+        return retry_after
+    base = settings.HTTP_BACKOFF_BASE * (2 ** attempt)
+    return base + random.uniform(0, base / 2)
+
+
+_limiters: Dict[str, UpstreamLimiter] = {}
+
+
+def get_limiter(url: str) -> UpstreamLimiter:
+    """Return the limiter shared by all requests to the upstream serving ``url``."""
+    if url.startswith(settings.STRATZ_API):
+        name, rate, burst, in_flight = ("stratz", settings.STRATZ_RATE_PER_SECOND,
+                                        settings.STRATZ_BURST, settings.STRATZ_MAX_IN_FLIGHT)
+    elif url.startswith(settings.OPENDOTA_API):
+        name, rate, burst, in_flight = ("opendota", settings.OPENDOTA_RATE_PER_SECOND,
+                                        settings.OPENDOTA_BURST, settings.OPENDOTA_MAX_IN_FLIGHT)
+    else:
+        name, rate, burst, in_flight = ("default", settings.STRATZ_RATE_PER_SECOND,
+                                        settings.STRATZ_BURST, settings.STRATZ_MAX_IN_FLIGHT)
+    limiter = _limiters.get(name)
+    if limiter is None:
+        limiter = _limiters[name] = UpstreamLimiter(name, rate, burst, in_flight)
+    return limiter
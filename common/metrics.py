@@ -0,0 +1,219 @@
+import functools
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from inspect import iscoroutinefunction
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from jinja2 import Template
+from robyn import Robyn, Response, Headers, logger
+from robyn.robyn import FunctionInfo
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config.settings import settings, templates
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Summary:
+    """
+    Count, sum and quantiles of observations per label set. Quantiles are
+    taken over the last METRICS_SAMPLE_SIZE observations, so they follow
+    current load rather than the whole process lifetime.
+    """
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._series: Dict[Labels, Tuple[Deque[float], List[float]]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = (deque(maxlen=settings.METRICS_SAMPLE_SIZE), [0, 0.0])
+        series[0].append(value)
+        series[1][0] += 1
+        series[1][1] += value
+
+    def expose(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} summary"
+        for labels, (samples, (count, total)) in self._series.items():
+            ordered = sorted(samples)
+            for q in QUANTILES:
+                value = ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+                yield f"{self.name}{format_labels(labels + (('quantile', str(q)),))} {value}"
+            yield f"{self.name}_sum{format_labels(labels)} {total}"
+            yield f"{self.name}_count{format_labels(labels)} {count}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, value: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + value
+
+    def expose(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in self._values.items():
+            yield f"{self.name}{format_labels(labels)} {value}"
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+request_duration = Summary("http_request_duration_seconds", "Handler latency by route.")
+responses_total = Counter("http_responses_total", "Responses by route and status code.")
+render_duration = Summary("template_render_seconds", "Time spent rendering templates per request, by route.")
+request_queries = Summary("db_queries_per_request", "SQL statements executed per request, by route.")
+query_seconds = Counter("db_query_seconds_total", "Time spent in SQL statements, by route.")
+n_plus_one_total = Counter("db_n_plus_one_suspects_total", "Requests over N_PLUS_ONE_THRESHOLD statements, by route.")
+
+METRICS = (request_duration, responses_total, render_duration, request_queries, query_seconds, n_plus_one_total)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    query_time: float = 0.0
+    render_time: float = 0.0
+    rendering: bool = False
+
+
+# stats of the request whose handler is running; each handler runs in its own task context
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append((statement, time.perf_counter()))
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _, started = conn.info["query_start"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_time += time.perf_counter() - started
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # after_cursor_execute does not fire for a failed statement
+    conn = exception_context.connection
+    pending = conn.info.get("query_start") if conn is not None else None
+    if pending and pending[-1][0] == exception_context.statement:
+        pending.pop()
+
+
+class TimedTemplate(Template):
+    """Adds the time of outermost renders to the current request's stats."""
+
+    def render(self, *args: Any, **kwargs: Any) -> str:
+        stats = _request_stats.get()
+        if stats is None or stats.rendering:
+            return super().render(*args, **kwargs)
+        stats.rendering = True
+        started = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            stats.render_time += time.perf_counter() - started
+            stats.rendering = False
+
+
+def status_of(response: Any) -> int:
+    # robyn sends dicts, strings and other non-Response returns as 200
+    return response.status_code if isinstance(response, Response) else 200
+
+
+def record(method: str, route: str, status_code: int, elapsed: float, stats: RequestStats) -> None:
+    labels = (("method", method), ("route", route))
+    request_duration.observe(labels, elapsed)
+    responses_total.inc(labels + (("status", str(status_code)),))
+    render_duration.observe(labels, stats.render_time)
+    request_queries.observe(labels, stats.queries)
+    query_seconds.inc(labels, stats.query_time)
+    if stats.queries > settings.N_PLUS_ONE_THRESHOLD:
+        n_plus_one_total.inc(labels)
+        logger.warn("possible N+1: %s %s ran %s statements in %.3fs",
+                    method, route, stats.queries, stats.query_time)
+
+
+def instrument(handler: Callable, method: str, route: str) -> Callable:
+    """Wrap a route handler, as registered by robyn, to record its metrics."""
+    if iscoroutinefunction(handler):
+        @functools.wraps(handler)
+        async def async_instrumented(*args, **kwargs):
+            stats = RequestStats()
+            token = _request_stats.set(stats)
+            started = time.perf_counter()
+            try:
+                response = await handler(*args, **kwargs)
+            except Exception:
+                _request_stats.reset(token)
+                record(method, route, 500, time.perf_counter() - started, stats)
+                raise
+            _request_stats.reset(token)
+            record(method, route, status_of(response), time.perf_counter() - started, stats)
+            return response
+
+        return async_instrumented
+
+    @functools.wraps(handler)
+    def instrumented(*args, **kwargs):
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = handler(*args, **kwargs)
+        except Exception:
+            _request_stats.reset(token)
+            record(method, route, 500, time.perf_counter() - started, stats)
+            raise
+        _request_stats.reset(token)
+        record(method, route, status_of(response), time.perf_counter() - started, stats)
+        return response
+
+    return instrumented
+
+
+def install_metrics(app: Robyn) -> None:
+    """
+    Instrument every route registered on ``app`` so far, and time template
+    renders. Call after all routers are included.
+    """
+    templates.env.template_class = TimedTemplate
+    for index, route in enumerate(app.router.routes):
+        function = route.function
+        method = str(route.route_type).rsplit(".", 1)[-1]
+        handler = instrument(function.handler, method, route.route)
+        app.router.routes[index] = route._replace(function=FunctionInfo(
+            handler, function.is_async, function.number_of_params, function.args, function.kwargs,
+        ))
+
+
+def metrics_response() -> Response:
+    """This process's metrics in the Prometheus text exposition format."""
+    lines = [line for metric in METRICS for line in metric.expose()]
+    return Response(
+        status_code=200,
+        description="\n".join(lines) + "\n",
+        headers=Headers({"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}),
+    )
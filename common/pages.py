@@ -0,0 +1,54 @@
+from typing import Any, Hashable, Iterable, Optional, Dict
+
+from markupsafe import Markup
+from robyn import Response, Headers
+
+from common.cache import TTLCache, MISSING
+from config.settings import settings, templates
+
+page_cache = TTLCache(settings.PAGE_CACHE_SIZE, settings.PAGE_CACHE_TTL)
+fragment_cache = TTLCache(settings.FRAGMENT_CACHE_SIZE, settings.PAGE_CACHE_TTL)
+
+
+def render_html(template: str, **context: Any) -> str:
+    return templates.env.get_template(template).render(**context)
+
+
+def html_response(body: str, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """The response ``templates.render_template`` would build for ``body``."""
+    return Response(
+        status_code=status_code,
+        description=body,
+        headers=Headers({"Content-Type": "text/html; charset=utf-8", **(headers or {})}),
+    )
+
+
+def cached_fragment(template: str, key: Hashable, tags: Iterable[Hashable] = (), **context: Any) -> Markup:
+    """
+    Render an include once per ``key`` and reuse the markup until one of
+    ``tags`` is invalidated or the entry expires. Registered as a template
+    global, e.g. ``{{ cached_fragment("matches/includes/match-tables.html",
+    ("series", series_obj.id), matches=series_obj.matches) }}``.
+
+    The fragment must not depend on anything outside ``context`` but ``key``.
+    """
+    key = (template, key)
+    body = fragment_cache.get(key)
+    if body is MISSING:
+        body = Markup(render_html(template, **context))
+        fragment_cache.set(key, body, tags)
+    return body
+
+
+def invalidate_pages(*tags: Hashable) -> None:
+    """
+    Drop cached pages and fragments tagged with any of ``tags``, e.g.
+    ("league", 16435). Only this process's caches are affected; others
+    catch up after PAGE_CACHE_TTL.
+    """
+    tags = [tag for tag in tags if tag[-1] is not None]
+    page_cache.invalidate(*tags)
+    fragment_cache.invalidate(*tags)
+
+
+templates.env.globals["cached_fragment"] = cached_fragment
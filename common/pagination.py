@@ -0,0 +1,85 @@
+import base64
+from typing import Any, List, Optional, Sequence, Tuple
+
+from orjson import orjson
+from robyn import Request
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque, URL-safe cursor holding the sort key values of the last row of a page."""
+    return base64.urlsafe_b64encode(orjson.dumps(list(values))).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[List[Any]]:
+    if not cursor:
+        return None
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        return None
+    if not isinstance(values, list) or not all(value is None or type(value) is int for value in values):
+        return None
+    return values
+
+
+def get_cursor(request: Request) -> Optional[List[Any]]:
+    return decode_cursor(request.query_params.get("cursor", None))
+
+
+def keyset_page(stmt: Select, key_column: Any, id_column: Any, cursor: Optional[List[Any]], limit: int,
+                nullable: bool = True) -> Select:
+    """
+    Order ``stmt`` by ``key_column`` desc then ``id_column`` desc and start
+    after the cursor row, so every page costs the same as the first. One
+    extra row is fetched to tell whether there is a next page.
+
+    The seek is a row-value comparison, (key, id) < cursor, which the (key, id)
+    index serves as a range. It never reaches NULL keys: with a nullable key
+    use ``fetch_keyset_page``, which continues into the NULL tail, or pass
+    ``nullable=False`` when the query already excludes NULLs.
+    A cursor of [None, id] seeks within the NULL tail, [None, None] starts it.
+    """
+    same_key = key_column is id_column
+    if cursor is not None and len(cursor) == (1 if same_key else 2):
+        if same_key:
+            stmt = stmt.filter(id_column < cursor[0])
+        elif cursor[0] is None:
+            stmt = stmt.filter(key_column.is_(None))
+            if cursor[1] is not None:
+                stmt = stmt.filter(id_column < cursor[1])
+        else:
+            stmt = stmt.filter(tuple_(key_column, id_column) < tuple_(*cursor))
+    if same_key:
+        ordering = [id_column.desc()]
+    else:
+        ordering = [key_column.desc().nulls_last() if nullable else key_column.desc(), id_column.desc()]
+    return stmt.order_by(*ordering).limit(limit + 1)
+
+
+async def fetch_keyset_page(session: AsyncSession, stmt: Select, key_column: Any, id_column: Any,
+                            cursor: Optional[List[Any]], key_attr: str, limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Run ``keyset_page`` over a nullable key and ``split_page`` the rows. When
+    the rows with a key run out, the page is filled from the NULL tail with a
+    second, equally indexed query.
+    """
+    result = await session.execute(keyset_page(stmt, key_column, id_column, cursor, limit))
+    items = list(result.scalars().all())
+    if len(items) <= limit and cursor is not None and len(cursor) == 2 and cursor[0] is not None:
+        tail = keyset_page(stmt, key_column, id_column, [None, None], limit - len(items))
+        result = await session.execute(tail)
+        items.extend(result.scalars().all())
+    return split_page(items, key_attr, limit)
+
+
+def split_page(items: Sequence[Any], key_attr: str, limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Trim the extra row fetched by ``keyset_page`` and build the next page's cursor."""
+    items = list(items)
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    last = items[-1]
+    values = [last.id] if key_attr == "id" else [getattr(last, key_attr), last.id]
+    return items, encode_cursor(values)
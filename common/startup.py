@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+from common.execute import warm_known_ids
 from config.db import engine, Base
+from leagues.models import League, Series
+from players.models import ProSteamAccount, SteamAccount, Player
+from teams.models import Team
 
 
 async def on_app_startup() -> None:
@@ -12,3 +16,8 @@ async def on_app_startup() -> None:
 async def on_app_shutdown() -> None:
     async with engine.begin() as connection:
         await connection.run_sync(Base.metadata.drop_all)
+
+
+async def warm_identity_cache() -> None:
+    """Load known ids of the stub-created models so ingestion can skip existence checks."""
+    await warm_known_ids(League, Series, Team, ProSteamAccount, SteamAccount, Player)
@@ -1,15 +1,19 @@
 import asyncio
 import re
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta
 from typing import Optional, Any, Dict, Union, List, Callable, TypeVar, Awaitable, Iterable
 from urllib.parse import quote
 
+import httpx
 import pytz
-import requests
 from dateutil import parser
 from robyn import logger, Request, Response
 
+from common.client import get_http_client
 from common.constants import HEROES
+from common.limiter import get_limiter, backoff_delay
 from config.settings import settings, templates
 
 s_tz = settings.TIME_ZONE
@@ -125,32 +129,48 @@ def convert_to_datetime(date_string: Optional[str], tz: str = s_tz) -> str | Non
         return None
 
 
-def response_to_json(url: str) -> Optional[Any]:
-    try:
-        token = settings.TOKEN_STRATZ
-        headers = {"Authorization": f"Bearer {token}"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        json_data = response.json()
-        if json_data:
+async def response_to_json(url: str) -> Optional[Any]:
+    token = settings.TOKEN_STRATZ
+    headers = {"Authorization": f"Bearer {token}"}
+    limiter = get_limiter(url)
+    for attempt in range(settings.HTTP_MAX_RETRIES + 1):
+        retry_after = None
+        try:
+            async with limiter.slot():
+                response = await get_http_client().get(url, headers=headers)
+            retry_after = limiter.on_response(response.status_code, response.headers)
+            response.raise_for_status()
+            json_data = response.json()
+            if not json_data:
+                # an empty page is a valid answer, e.g. the end of a paginated list
+                logger.debug(f"JSON is empty data for URL: {url}")
             return json_data
-        else:
-            logger.warning(f"JSON is empty data for URL: {url}")
+        except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
+            if status_code != 429 and status_code < 500:
+                logger.error(f"HTTPStatusError while requesting URL {url}: {repr(e)}")
+                return None
+            logger.warn(f"HTTP {status_code} for URL {url}, attempt {attempt + 1}")
+        except httpx.TransportError as e:
+            logger.warn(f"TransportError while requesting URL {url}, attempt {attempt + 1}: {repr(e)}")
+        except httpx.HTTPError as e:
+            logger.error(f"HTTPError while requesting URL {url}: {repr(e)}")
             return None
-    except requests.exceptions.SSLError as e:
-        logger.error(f"SSL error occurred: {e}")
-    except requests.RequestException as e:
-        logger.error(f"RequestException while requesting URL {url}: {repr(e)}")
-    except ValueError as e:
-        logger.error(f"ValueError while parsing JSON from URL {url}: {repr(e)}")
-    except Exception as e:
-        logger.error(f"Unexpected exception: {repr(e)}")
+        except ValueError as e:
+            logger.error(f"ValueError while parsing JSON from URL {url}: {repr(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected exception: {repr(e)}")
+            return None
+        if attempt < settings.HTTP_MAX_RETRIES:
+            await asyncio.sleep(backoff_delay(attempt, retry_after))
+    logger.error(f"Giving up on URL {url} after {settings.HTTP_MAX_RETRIES + 1} attempts")
     return None
 
 
 async def fetch_data(url: str, expected_type: Union[type[Dict[str, Any]], type[List[Any]]]) -> Optional[T]:
     try:
-        response = response_to_json(url)
+        response = await response_to_json(url)
         if isinstance(response, expected_type):
             return response
         else:
@@ -161,6 +181,18 @@ async def fetch_data(url: str, expected_type: Union[type[Dict[str, Any]], type[L
         return None
 
 
+class UpstreamError(Exception):
+    """An upstream API request failed or returned an unexpected payload."""
+
+
+async def fetch_required(url: str, expected_type: Union[type[Dict[str, Any]], type[List[Any]]]) -> T:
+    """Like ``fetch_data``, but raises UpstreamError instead of returning None, so a job can retry."""
+    data = await fetch_data(url, expected_type)
+    if data is None:
+        raise UpstreamError(f"no {expected_type.__name__} from {url}")
+    return data
+
+
 def int_to_abs(my_dict: Dict[str, Any], key: str) -> Optional[int]:
     try:
         if my_dict and key in my_dict:
@@ -222,24 +254,65 @@ async def save_data_if_exists(
     return None
 
 
+# one limit for every ingestion fan-out in the process, nested ones included,
+# so a sync never runs more than INGEST_TASK_CONCURRENCY saves against the DB pool
+_ingest_slots = asyncio.Semaphore(settings.INGEST_TASK_CONCURRENCY)
+# [holds a slot] for the task running inside ``bounded``
+_held_slot: ContextVar[Optional[List[bool]]] = ContextVar("held_slot", default=None)
+
+
+async def bounded(coro: Awaitable[Any]) -> Any:
+    await _ingest_slots.acquire()
+    held = [True]
+    token = _held_slot.set(held)
+    try:
+        return await coro
+    finally:
+        _held_slot.reset(token)
+        if held[0]:
+            _ingest_slots.release()
+
+
+@asynccontextmanager
+async def waiting_on_children():
+    """
+    Lend the caller's slot to its child tasks while it waits for them, so a
+    nested fan-out shares the limit instead of deadlocking on it.
+    """
+    held = _held_slot.get()
+    if not held or not held[0]:
+        yield
+        return
+    _ingest_slots.release()
+    held[0] = False
+    try:
+        yield
+    finally:
+        await _ingest_slots.acquire()
+        held[0] = True
+
+
 async def process_related_data(
         data: Optional[Dict[str, Any]],
         key: str,
-        save_function: Callable[..., Awaitable[None]],
+        save_function: Callable[..., Awaitable[Any]],
         *args: Any
-) -> Optional[None]:
+) -> Optional[List[Any]]:
+    """Save every item under ``key``; returns the results in item order, None if the fan-out failed."""
     try:
         if data and key in data:
             items = data.get(key, [])
             items = items if isinstance(items, list) else [items]
 
-            # Create tasks for each item and await them concurrently
-            async with asyncio.TaskGroup() as tg:
-                for item in items:
-                    tg.create_task(save_function(item, *args))
-
+            # Create tasks for each item and await them concurrently, within the
+            # process-wide INGEST_TASK_CONCURRENCY limit so a sync cannot drain the DB pool
+            async with waiting_on_children(), asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(bounded(save_function(item, *args))) for item in items]
+            return [task.result() for task in tasks]
+        return []
     except Exception as e:
         logger.error(f"process_related_data: Error processing related data for key '{key}': {e}")
+        return None
 
 
 async def process_entities(entity_ids: Iterable[int], task_function: Callable[[int], Any], entity_name: str) -> None:
@@ -251,20 +324,18 @@ async def process_entities(entity_ids: Iterable[int], task_function: Callable[[i
         task_function (Callable[[int], Any]): The async task function to be called (e.g., task_get_and_save_player).
         entity_name (str): String representing the entity type (e.g., 'Player' or 'Account').
     """
+    async def process(entity_id: int) -> None:
+        # a failing entity must not cancel its siblings in the task group
+        try:
+            await task_function(entity_id)
+            logger.info("%s ID: %s processed successfully", entity_name, entity_id)
+        except Exception as e:
+            logger.error("Error processing %s ID: %s, error: %s", entity_name, entity_id, repr(e))
+
     try:
-        async with asyncio.TaskGroup() as tg:
-            tasks = {}
+        async with waiting_on_children(), asyncio.TaskGroup() as tg:
             for entity_id in entity_ids:
-                task = tg.create_task(task_function(entity_id))
-                tasks[task] = entity_id
-
-            for task in tasks:
-                entity_id = tasks[task]
-                try:
-                    await task  # Wait for the task to complete
-                    logger.info("%s ID: %s processed successfully", entity_name, entity_id)
-                except Exception as e:
-                    logger.error("Error processing %s ID: %s, error: %s", entity_name, entity_id, repr(e))
+                tg.create_task(bounded(process(entity_id)))
     except Exception as e:
         logger.error("Failed to process %s entities: %s", entity_name, repr(e))
 
@@ -1,33 +1,105 @@
 from __future__ import annotations
 
+import time
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict, Any
 
 from orjson import orjson
 from sqlalchemy import DateTime, UUID, CHAR, String, Text, Boolean, SmallInteger, BigInteger, JSON, Integer
-from sqlalchemy.ext.asyncio import AsyncAttrs, create_async_engine, async_sessionmaker
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncEngine, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, class_mapper, Mapped, mapped_column, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, PoolProxiedConnection
 from typing_extensions import Annotated
 
 from common.utils import get_delta_time
 from config.settings import settings
 
-if settings.USE_SQLITE_DB == "True":
-    SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./db.sqlite3/"
 
-    engine = create_async_engine(
-        SQLALCHEMY_DATABASE_URL
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait and how many time out."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        self.checkouts += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        return connection
+
+
+def make_engine(pool_size: int = settings.DB_POOL_SIZE, max_overflow: int = settings.DB_MAX_OVERFLOW) -> AsyncEngine:
+    """
+    SQLite gets no pooling, opening a file connection is cheap. Other
+    backends get a TimedQueuePool sized by the caller.
+    """
+    if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+        return create_async_engine(SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+    return create_async_engine(
+        SQLALCHEMY_DATABASE_URL,
+        poolclass=TimedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
     )
+
+
+if settings.USE_SQLITE_DB == "True":
+    SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./db.sqlite3/"
 else:
     SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-    engine = create_async_engine(
-        SQLALCHEMY_DATABASE_URL
-    )
+engine = make_engine()
 async_session = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
 
+async def use_engine(pool_size: int, max_overflow: int) -> AsyncEngine:
+    """
+    Replace the module engine with one sized for the calling process and
+    rebind ``async_session`` to it, e.g. for the ingestion worker.
+    """
+    global engine
+    old_engine = engine
+    engine = make_engine(pool_size, max_overflow)
+    async_session.configure(bind=engine)
+    await old_engine.dispose()
+    return engine
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Occupancy and checkout wait of the current engine's pool."""
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__, "backend": engine.dialect.name}
+    if isinstance(pool, TimedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(0, pool.overflow()),
+            max_overflow=pool._max_overflow,
+            checkouts=pool.checkouts,
+            timeouts=pool.timeouts,
+            wait_avg=pool.wait_total / pool.checkouts if pool.checkouts else 0.0,
+            wait_max=pool.wait_max,
+        )
+    return stats
+
+
 class Base(AsyncAttrs, DeclarativeBase):
     __abstract__ = True
 
@@ -63,6 +135,14 @@ class Base(AsyncAttrs, DeclarativeBase):
                             default=str)
 
 
+class FingerprintMixin:
+    """
+    Digest of the normalized values last written from upstream data;
+    lets upserts skip rows whose content has not changed.
+    """
+    fingerprint: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+
+
 a_id = Annotated[int, mapped_column(BigInteger, primary_key=True, unique=True, index=True)]
 a_small_int = Annotated[int, mapped_column(SmallInteger, nullable=True)]
 a_big_int = Annotated[int, mapped_column(BigInteger, nullable=True)]
@@ -71,4 +151,7 @@ a_str = Annotated[str, mapped_column(String(240), nullable=True)]
 a_text = Annotated[str, mapped_column(Text, nullable=True)]
 a_bool = Annotated[str, mapped_column(Boolean, nullable=True)]
 a_json = Annotated[JSON, mapped_column(JSON, nullable=True)]
+# large payloads no page renders; loaded on access or with undefer_group(JSON_GROUP)
+JSON_GROUP = "json"
+a_json_deferred = Annotated[JSON, mapped_column(JSON, nullable=True, deferred=True, deferred_group=JSON_GROUP)]
 a_char = Annotated[str, mapped_column(CHAR(20), nullable=True)]
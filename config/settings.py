@@ -37,6 +37,20 @@ class Settings(BaseModel):
     JWT_ALGORITHM: str = config("JWT_ALGORITHM")
     COOKIE_DOMAIN: str = config("COOKIE_DOMAIN")
     EMAIL_TOKEN_EXPIRY_MINUTES: int = 120
+    # signed-in users cached per session token
+    USER_CACHE_SIZE: int = config("USER_CACHE_SIZE", default=1024, cast=int)
+    USER_CACHE_TTL: float = config("USER_CACHE_TTL", default=60.0, cast=float)
+    # verified 'visited' JWT payloads, so a token's signature is checked once rather than per request
+    TOKEN_CACHE_SIZE: int = config("TOKEN_CACHE_SIZE", default=4096, cast=int)
+    TOKEN_CACHE_TTL: float = config("TOKEN_CACHE_TTL", default=300.0, cast=float)
+    # recent observations kept per route for latency quantiles, and SQL statements per request
+    # above which a request is logged as a possible N+1
+    METRICS_SAMPLE_SIZE: int = config("METRICS_SAMPLE_SIZE", default=1024, cast=int)
+    N_PLUS_ONE_THRESHOLD: int = config("N_PLUS_ONE_THRESHOLD", default=25, cast=int)
+    # threads for password hashing and concurrent login attempts allowed per client IP / per email
+    PASSWORD_HASH_WORKERS: int = config("PASSWORD_HASH_WORKERS", default=2, cast=int)
+    LOGIN_MAX_PER_IP: int = config("LOGIN_MAX_PER_IP", default=4, cast=int)
+    LOGIN_MAX_PER_EMAIL: int = config("LOGIN_MAX_PER_EMAIL", default=1, cast=int)
 
     UPLOAD_FOLDER: str = config("UPLOAD_FOLDER")
 
@@ -52,6 +66,77 @@ class Settings(BaseModel):
     TOKEN_STRATZ: str = config("TOKEN_STRATZ")
     STRATZ_API: str = 'https://api.stratz.com/api/v1'
     OPENDOTA_API: str = 'https://api.opendota.com/api'
+
+    HTTP_TIMEOUT: float = config("HTTP_TIMEOUT", default=30.0, cast=float)
+    HTTP_MAX_CONNECTIONS: int = config("HTTP_MAX_CONNECTIONS", default=50, cast=int)
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = config("HTTP_MAX_KEEPALIVE_CONNECTIONS", default=20, cast=int)
+    HTTP_KEEPALIVE_EXPIRY: float = config("HTTP_KEEPALIVE_EXPIRY", default=30.0, cast=float)
+    HTTP_MAX_RETRIES: int = config("HTTP_MAX_RETRIES", default=3, cast=int)
+    HTTP_BACKOFF_BASE: float = config("HTTP_BACKOFF_BASE", default=1.0, cast=float)
+
+    # upstream quotas: STRATZ allows ~250 req/min, OpenDota free tier 60 req/min
+    STRATZ_RATE_PER_SECOND: float = config("STRATZ_RATE_PER_SECOND", default=4.0, cast=float)
+    STRATZ_BURST: int = config("STRATZ_BURST", default=10, cast=int)
+    STRATZ_MAX_IN_FLIGHT: int = config("STRATZ_MAX_IN_FLIGHT", default=8, cast=int)
+    OPENDOTA_RATE_PER_SECOND: float = config("OPENDOTA_RATE_PER_SECOND", default=0.9, cast=float)
+    OPENDOTA_BURST: int = config("OPENDOTA_BURST", default=3, cast=int)
+    OPENDOTA_MAX_IN_FLIGHT: int = config("OPENDOTA_MAX_IN_FLIGHT", default=2, cast=int)
+
+    KNOWN_IDS_CACHE_SIZE: int = config("KNOWN_IDS_CACHE_SIZE", default=100000, cast=int)
+
+    # job workers inside the web process; crawling normally runs in `python -m ingest worker`
+    JOB_WORKERS: int = config("JOB_WORKERS", default=0, cast=int)
+    JOB_POLL_INTERVAL: float = config("JOB_POLL_INTERVAL", default=2.0, cast=float)
+    JOB_MAX_ATTEMPTS: int = config("JOB_MAX_ATTEMPTS", default=3, cast=int)
+    JOB_RETRY_BACKOFF: float = config("JOB_RETRY_BACKOFF", default=30.0, cast=float)
+    # running jobs refresh locked_at every JOB_HEARTBEAT_INTERVAL; one silent for JOB_LOCK_TIMEOUT is requeued
+    JOB_HEARTBEAT_INTERVAL: float = config("JOB_HEARTBEAT_INTERVAL", default=30.0, cast=float)
+    JOB_LOCK_TIMEOUT: float = config("JOB_LOCK_TIMEOUT", default=300.0, cast=float)
+
+    PICKS_CACHE_SIZE: int = config("PICKS_CACHE_SIZE", default=2048, cast=int)
+    PICKS_CACHE_TTL: float = config("PICKS_CACHE_TTL", default=300.0, cast=float)
+    SYNERGY_CACHE_TTL: float = config("SYNERGY_CACHE_TTL", default=1800.0, cast=float)
+    # rendered detail pages and match-table fragments; ingestion drops them on save
+    PAGE_CACHE_SIZE: int = config("PAGE_CACHE_SIZE", default=512, cast=int)
+    PAGE_CACHE_TTL: float = config("PAGE_CACHE_TTL", default=120.0, cast=float)
+    FRAGMENT_CACHE_SIZE: int = config("FRAGMENT_CACHE_SIZE", default=4096, cast=int)
+    SYNERGY_TOP_LINKS: int = config("SYNERGY_TOP_LINKS", default=50, cast=int)
+    SYNERGY_MIN_COUNT: int = config("SYNERGY_MIN_COUNT", default=2, cast=int)
+    # captains mode bans with a smaller order belong to the first ban phase
+    FIRST_PHASE_BANS: int = config("FIRST_PHASE_BANS", default=7, cast=int)
+
+    # series per request for league backfills and for incremental refreshes
+    LEAGUE_SERIES_PAGE_SIZE: int = config("LEAGUE_SERIES_PAGE_SIZE", default=500, cast=int)
+    LEAGUE_SERIES_DELTA_PAGE_SIZE: int = config("LEAGUE_SERIES_DELTA_PAGE_SIZE", default=20, cast=int)
+    LEAGUE_SYNC_OVERLAP: int = config("LEAGUE_SYNC_OVERLAP", default=6 * 3600, cast=int)
+
+    # scheduler run by the ingest worker; intervals in seconds
+    SCHEDULER_ENABLED: bool = config("SCHEDULER_ENABLED", default=True, cast=bool)
+    SCHEDULER_TICK: float = config("SCHEDULER_TICK", default=30.0, cast=float)
+    SCHEDULER_LEASE_TTL: float = config("SCHEDULER_LEASE_TTL", default=90.0, cast=float)
+    SCHEDULE_LIVE_LEAGUE: int = config("SCHEDULE_LIVE_LEAGUE", default=60, cast=int)
+    SCHEDULE_ACTIVE_LEAGUE: int = config("SCHEDULE_ACTIVE_LEAGUE", default=900, cast=int)
+    SCHEDULE_ACTIVE_WINDOW: int = config("SCHEDULE_ACTIVE_WINDOW", default=2 * 86400, cast=int)
+    SCHEDULE_IDLE_LEAGUE: int = config("SCHEDULE_IDLE_LEAGUE", default=6 * 3600, cast=int)
+    SCHEDULE_FINISHED_LEAGUE: int = config("SCHEDULE_FINISHED_LEAGUE", default=86400, cast=int)
+    SCHEDULE_FINISHED_GRACE: int = config("SCHEDULE_FINISHED_GRACE", default=7 * 86400, cast=int)
+    SCHEDULE_LEAGUE_LIST: int = config("SCHEDULE_LEAGUE_LIST", default=600, cast=int)
+    SCHEDULE_TEAMS: int = config("SCHEDULE_TEAMS", default=86400, cast=int)
+    SCHEDULE_PRO_PLAYERS: int = config("SCHEDULE_PRO_PLAYERS", default=86400, cast=int)
+    SCHEDULE_HERO_STATS: int = config("SCHEDULE_HERO_STATS", default=1800, cast=int)
+
+    EXPORT_BATCH_SIZE: int = config("EXPORT_BATCH_SIZE", default=10000, cast=int)
+
+    INGEST_WORKERS: int = config("INGEST_WORKERS", default=4, cast=int)
+    INGEST_TASK_CONCURRENCY: int = config("INGEST_TASK_CONCURRENCY", default=16, cast=int)
+    INGEST_DB_POOL_SIZE: int = config("INGEST_DB_POOL_SIZE", default=10, cast=int)
+    INGEST_DB_MAX_OVERFLOW: int = config("INGEST_DB_MAX_OVERFLOW", default=10, cast=int)
+    # web process connection pool (PostgreSQL; SQLite opens a connection per checkout)
+    DB_POOL_SIZE: int = config("DB_POOL_SIZE", default=10, cast=int)
+    DB_MAX_OVERFLOW: int = config("DB_MAX_OVERFLOW", default=10, cast=int)
+    DB_POOL_TIMEOUT: float = config("DB_POOL_TIMEOUT", default=10.0, cast=float)
+    DB_POOL_RECYCLE: int = config("DB_POOL_RECYCLE", default=1800, cast=int)
+    DB_POOL_PRE_PING: bool = config("DB_POOL_PRE_PING", default=True, cast=bool)
     # data2
     GAME_VERSION: int = 175
     URL_IMG_HERO: str = config("URL_IMG_HERO")
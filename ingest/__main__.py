@@ -0,0 +1,52 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+from config.settings import settings
+from ingest.export import EXPORT_MODELS, EXPORT_FORMATS
+from ingest.worker import run_ingest_worker, run_enqueue, run_rebuild_stats, run_hero_stats, run_export
+from jobs.tasks import JOB_TASKS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m ingest", description="STRATZ/OpenDota ingestion")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    worker = commands.add_parser("worker", help="run ingestion job workers")
+    worker.add_argument("-c", "--concurrency", type=int, default=settings.INGEST_WORKERS,
+                        help="number of jobs processed at the same time")
+    worker.add_argument("--no-scheduler", dest="scheduler", action="store_false",
+                        default=settings.SCHEDULER_ENABLED, help="only process queued jobs")
+
+    enqueue = commands.add_parser("enqueue", help="queue an ingestion job")
+    enqueue.add_argument("kind", choices=sorted(JOB_TASKS))
+    enqueue.add_argument("entity_id", type=int, nargs="?")
+
+    commands.add_parser("rebuild-stats", help="recompute hero pick/ban stats from stored matches")
+    commands.add_parser("hero-stats", help="recompute hero win/pick/ban rates")
+
+    export = commands.add_parser("export", help="stream match tables to Parquet/Arrow files")
+    export.add_argument("tables", nargs="+", choices=sorted(EXPORT_MODELS))
+    export.add_argument("-o", "--out", type=Path, default=Path("export"), help="output directory")
+    export.add_argument("-f", "--format", dest="file_format", choices=EXPORT_FORMATS, default="parquet")
+    export.add_argument("--columns", type=lambda value: value.split(","), help="comma separated column names")
+    export.add_argument("--game-version", dest="game_version_id", type=int)
+    export.add_argument("--league", dest="league_id", type=int)
+    export.add_argument("--batch-size", type=int, default=settings.EXPORT_BATCH_SIZE)
+
+    args = parser.parse_args()
+    if args.command == "worker":
+        asyncio.run(run_ingest_worker(args.concurrency, args.scheduler))
+    elif args.command == "enqueue":
+        asyncio.run(run_enqueue(args.kind, args.entity_id))
+    elif args.command == "rebuild-stats":
+        asyncio.run(run_rebuild_stats())
+    elif args.command == "hero-stats":
+        asyncio.run(run_hero_stats())
+    elif args.command == "export":
+        asyncio.run(run_export(args.tables, args.out, args.file_format, args.columns,
+                               args.game_version_id, args.league_id, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+from pathlib import Path
+from typing import Optional, Sequence
+
+from orjson import orjson
+from robyn import logger
+from sqlalchemy import select, BigInteger, SmallInteger, Integer, Boolean, Float, DateTime, JSON, UUID
+
+from config.db import async_session
+from config.settings import settings
+from matches.models import Match, MatchPlayer, MatchPickBan
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for exports
+    pa = pq = None
+
+EXPORT_MODELS = {
+    "matches": Match,
+    "match_players": MatchPlayer,
+    "match_picks_ban": MatchPickBan,
+}
+EXPORT_FORMATS = ("parquet", "arrow")
+
+
+def arrow_type(column):
+    """Arrow type of a table column; JSON and UUID values are exported as strings."""
+    column_type = column.type
+    if isinstance(column_type, BigInteger):
+        return pa.int64()
+    if isinstance(column_type, SmallInteger):
+        return pa.int16()
+    if isinstance(column_type, Integer):
+        return pa.int32()
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def export_statement(table_name: str, columns: Optional[Sequence[str]] = None,
+                     game_version_id: Optional[int] = None, league_id: Optional[int] = None):
+    model = EXPORT_MODELS[table_name]
+    table = model.__table__
+    selected = [table.c[name] for name in columns] if columns else [
+        column for column in table.c if column.name != "fingerprint"
+    ]
+    stmt = select(*selected).where(table.c.deleted_at.is_(None))
+
+    match_filters = []
+    if game_version_id is not None:
+        match_filters.append(Match.game_version_id == game_version_id)
+    if league_id is not None:
+        match_filters.append(Match.league_id == league_id)
+    if match_filters:
+        if model is Match:
+            stmt = stmt.where(*match_filters)
+        else:
+            stmt = stmt.where(table.c.match_id.in_(select(Match.id).where(*match_filters)))
+    order_column = table.c.id if "id" in table.c else table.c.match_id
+    return stmt.order_by(order_column), selected
+
+
+def to_arrow_batch(rows, selected, schema):
+    values = {column.name: [] for column in selected}
+    for row in rows:
+        for column, value in zip(selected, row):
+            if value is not None and isinstance(column.type, JSON):
+                value = orjson.dumps(value).decode()
+            elif value is not None and isinstance(column.type, UUID):
+                value = str(value)
+            values[column.name].append(value)
+    return pa.RecordBatch.from_pydict(values, schema=schema)
+
+
+async def export_table(
+        table_name: str,
+        path: Path,
+        file_format: str = "parquet",
+        columns: Optional[Sequence[str]] = None,
+        game_version_id: Optional[int] = None,
+        league_id: Optional[int] = None,
+        batch_size: int = settings.EXPORT_BATCH_SIZE,
+) -> int:
+    """
+    Stream a table to a Parquet or Arrow IPC file in ``batch_size`` row
+    batches read through a server-side cursor, so memory stays bounded by
+    one batch whatever the table size. Returns the number of rows written.
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow is required for exports: pip install pyarrow")
+
+    stmt, selected = export_statement(table_name, columns, game_version_id, league_id)
+    schema = pa.schema([pa.field(column.name, arrow_type(column)) for column in selected])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(path, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(str(path), schema)
+
+    total = 0
+    try:
+        async with async_session() as session:
+            result = await session.stream(stmt.execution_options(yield_per=batch_size))
+            async for rows in result.partitions(batch_size):
+                batch = to_arrow_batch(rows, selected, schema)
+                writer.write_batch(batch)
+                total += batch.num_rows
+    finally:
+        writer.close()
+    logger.info("exported %s rows of %s to %s", total, table_name, path)
+    return total
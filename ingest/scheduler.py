@@ -0,0 +1,100 @@
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Optional
+
+from robyn import logger
+
+from common.utils import date_as_number, now_tz
+from config.settings import settings
+from jobs.services import enqueue_job, get_last_finished_at, acquire_lease, release_lease, requeue_stale_jobs
+from leagues.models import League
+from leagues.services import get_leagues_to_refresh, update_is_over_league, update_is_over_series
+
+LEASE_NAME = "scheduler"
+
+# job kind -> seconds between runs of the crawls that are not tied to one league
+GLOBAL_SCHEDULE = {
+    "leagues": settings.SCHEDULE_LEAGUE_LIST,
+    "teams": settings.SCHEDULE_TEAMS,
+    "pro_players": settings.SCHEDULE_PRO_PLAYERS,
+    "hero_stats": settings.SCHEDULE_HERO_STATS,
+}
+
+
+def league_refresh_interval(league: League, last_match_date_time: Optional[int], now: int) -> Optional[int]:
+    """
+    Seconds between refreshes of a league, or None when it needs none.
+
+    Live leagues refresh every SCHEDULE_LIVE_LEAGUE seconds, leagues with a
+    recent match every SCHEDULE_ACTIVE_LEAGUE (twice as long for tier 2),
+    other running leagues every SCHEDULE_IDLE_LEAGUE and finished leagues
+    every SCHEDULE_FINISHED_LEAGUE until SCHEDULE_FINISHED_GRACE has passed.
+    """
+    if league.has_live_matches:
+        return settings.SCHEDULE_LIVE_LEAGUE
+    if league.is_over:
+        if league.end_datetime and league.end_datetime >= now - settings.SCHEDULE_FINISHED_GRACE:
+            return settings.SCHEDULE_FINISHED_LEAGUE
+        return None
+    last_match = last_match_date_time or league.last_match_date
+    if last_match and last_match >= now - settings.SCHEDULE_ACTIVE_WINDOW:
+        return settings.SCHEDULE_ACTIVE_LEAGUE * (1 if (league.tier or 0) >= 3 else 2)
+    return settings.SCHEDULE_IDLE_LEAGUE
+
+
+async def schedule_tick() -> int:
+    """
+    Queue every refresh that is due. Returns how many were due; jobs still
+    queued from an earlier tick are deduplicated by ``enqueue_job``.
+    """
+    await update_is_over_league()
+    await update_is_over_series()
+    await requeue_stale_jobs()
+    due = 0
+    now = datetime.now()
+
+    for kind, interval in GLOBAL_SCHEDULE.items():
+        last_run = await get_last_finished_at(kind)
+        if last_run is None or last_run <= now - timedelta(seconds=interval):
+            due += await enqueue_job(kind) is not None
+
+    unix_now = date_as_number(now_tz())
+    for league, attempted_at, last_match_date_time in await get_leagues_to_refresh(
+            unix_now - settings.SCHEDULE_FINISHED_GRACE):
+        interval = league_refresh_interval(league, last_match_date_time, unix_now)
+        if interval is None:
+            continue
+        # spaced from the last attempt, so a league whose upstream keeps failing is not retried every tick
+        if attempted_at is None or attempted_at <= now - timedelta(seconds=interval):
+            due += await enqueue_job("league", league.id) is not None
+    return due
+
+
+async def run_scheduler(stop_event: asyncio.Event) -> None:
+    """
+    Tick every SCHEDULER_TICK seconds. Only the process holding the
+    scheduler lease queues work, so running several workers is safe; a
+    crashed leader is replaced once its lease expires.
+    """
+    holder = f"{socket.gethostname()}:{os.getpid()}"
+    is_leader = False
+    while not stop_event.is_set():
+        try:
+            leader = await acquire_lease(LEASE_NAME, holder, settings.SCHEDULER_LEASE_TTL)
+            if leader != is_leader:
+                logger.info("scheduler %s: %s", holder, "leader" if leader else "standby")
+                is_leader = leader
+            if leader:
+                due = await schedule_tick()
+                if due:
+                    logger.info("scheduler: %s refreshes due", due)
+        except Exception as e:
+            logger.error(f"scheduler tick failed: {e}")
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=settings.SCHEDULER_TICK)
+        except asyncio.TimeoutError:
+            pass
+    if is_leader:
+        await release_lease(LEASE_NAME, holder)
@@ -0,0 +1,77 @@
+import asyncio
+import signal
+from pathlib import Path
+from typing import List, Optional
+
+from robyn import logger
+
+from common.client import init_http_client, close_http_client
+from common.startup import warm_identity_cache
+from config import db
+from config.settings import settings
+from ingest.export import export_table
+from ingest.scheduler import run_scheduler
+from jobs.services import enqueue_job
+from jobs.worker import start_job_workers, stop_job_workers
+from matches.services import rebuild_hero_pick_ban_stats, refresh_hero_stats
+
+
+async def run_ingest_worker(concurrency: int = settings.INGEST_WORKERS,
+                            scheduler: bool = settings.SCHEDULER_ENABLED) -> None:
+    """
+    Run ingestion job workers (and the refresh scheduler) until SIGINT/SIGTERM,
+    with a connection pool of their own so crawling never competes with the
+    web process.
+    """
+    await db.use_engine(settings.INGEST_DB_POOL_SIZE, settings.INGEST_DB_MAX_OVERFLOW)
+    await init_http_client()
+    await warm_identity_cache()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    await start_job_workers(concurrency)
+    scheduler_task = loop.create_task(run_scheduler(stop_event)) if scheduler else None
+    logger.info("ingest worker started with %s workers", concurrency)
+    try:
+        await stop_event.wait()
+    finally:
+        logger.info("ingest worker stopping")
+        if scheduler_task is not None:
+            await scheduler_task
+        await stop_job_workers()
+        await close_http_client()
+        await db.engine.dispose()
+
+
+async def run_enqueue(kind: str, entity_id: Optional[int] = None) -> None:
+    job = await enqueue_job(kind, entity_id)
+    if job is None:
+        logger.error("failed to queue %s", kind)
+    else:
+        logger.info("job %s is %s", job.dedup_key, job.status)
+    await db.engine.dispose()
+
+
+async def run_rebuild_stats() -> None:
+    count = await rebuild_hero_pick_ban_stats()
+    logger.info("hero pick/ban stats rebuilt: %s rows", count)
+    await db.engine.dispose()
+
+
+async def run_hero_stats() -> None:
+    count = await refresh_hero_stats()
+    logger.info("hero stats refreshed: %s rows", count)
+    await db.engine.dispose()
+
+
+async def run_export(tables: List[str], out: Path, file_format: str, columns: Optional[List[str]],
+                     game_version_id: Optional[int], league_id: Optional[int], batch_size: int) -> None:
+    try:
+        for table_name in tables:
+            path = out / f"{table_name}.{file_format}"
+            await export_table(table_name, path, file_format, columns, game_version_id, league_id, batch_size)
+    finally:
+        await db.engine.dispose()
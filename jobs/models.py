@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Index, String, SmallInteger, DateTime, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from config.db import Base, a_big_int, a_str, a_text
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    ACTIVE = (QUEUED, RUNNING)
+
+
+class Job(Base):
+    __tablename__ = 'jobs'
+
+    kind: Mapped[str] = mapped_column(String(60), nullable=False)
+    entity_id: Mapped[a_big_int]
+    dedup_key: Mapped[str] = mapped_column(String(120), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default=JobStatus.QUEUED)
+    attempts: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=3)
+    run_after: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
+    locked_by: Mapped[a_str]
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[a_text]
+
+    __table_args__ = (
+        Index('ix_jobs_status_run_after', 'status', 'run_after'),
+        # at most one queued/running job per dedup key, e.g. "league:16435"
+        Index('ux_jobs_dedup_key_active', 'dedup_key', unique=True,
+              postgresql_where=text("status IN ('queued', 'running')"),
+              sqlite_where=text("status IN ('queued', 'running')")),
+    )
+
+    def __str__(self):
+        return f"{self.dedup_key} [{self.status}] attempt {self.attempts}/{self.max_attempts}"
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "entity_id": self.entity_id,
+            "dedup_key": self.dedup_key,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "run_after": str(self.run_after),
+            "locked_by": self.locked_by,
+            "finished_at": str(self.finished_at) if self.finished_at else None,
+            "last_error": self.last_error,
+            "created_at": str(self.created_at),
+        }
+
+
+class Lease(Base):
+    """Named lock held by one process until ``expires_at``, e.g. the scheduler leader."""
+    __tablename__ = 'leases'
+
+    name: Mapped[str] = mapped_column(String(60), nullable=False, unique=True)
+    holder: Mapped[a_str]
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    def __str__(self):
+        return f"{self.name} held by {self.holder} until {self.expires_at}"
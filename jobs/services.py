@@ -0,0 +1,203 @@
+from datetime import datetime, timedelta
+from typing import Optional, List
+
+from robyn import logger
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.db import async_session
+from config.settings import settings
+from jobs.models import Job, JobStatus, Lease
+
+
+def make_dedup_key(kind: str, entity_id: Optional[int] = None) -> str:
+    return kind if entity_id is None else f"{kind}:{entity_id}"
+
+
+async def get_active_job(session: AsyncSession, dedup_key: str) -> Optional[Job]:
+    stmt = (
+        select(Job)
+        .filter(Job.dedup_key == dedup_key, Job.status.in_(JobStatus.ACTIVE))
+        .filter(Job.deleted_at.is_(None))
+    )
+    result = await session.execute(stmt)
+    return result.scalars().first()
+
+
+async def enqueue_job(kind: str, entity_id: Optional[int] = None, delay: float = 0) -> Optional[Job]:
+    """
+    Queue an ingestion job unless one with the same dedup key is already
+    queued or running, in which case that job is returned instead.
+
+    Args:
+        kind (str): Registered job kind, e.g. 'league' or 'team'.
+        entity_id (Optional[int]): Id passed to the job function.
+        delay (float): Seconds to wait before the job becomes runnable.
+
+    Returns:
+        Optional[Job]: The new or already active job, None on error.
+    """
+    dedup_key = make_dedup_key(kind, entity_id)
+    try:
+        async with async_session() as session:
+            job = await get_active_job(session, dedup_key)
+            if job:
+                return job
+            job = Job(
+                kind=kind,
+                entity_id=entity_id,
+                dedup_key=dedup_key,
+                status=JobStatus.QUEUED,
+                attempts=0,
+                max_attempts=settings.JOB_MAX_ATTEMPTS,
+                run_after=datetime.now() + timedelta(seconds=delay),
+            )
+            session.add(job)
+            try:
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+                return await get_active_job(session, dedup_key)
+            logger.info("job queued: %s", dedup_key)
+            return job
+    except Exception as e:
+        logger.error(f"enqueue_job {dedup_key}: {e}")
+        return None
+
+
+async def claim_job(worker_id: str) -> Optional[Job]:
+    """
+    Claim the oldest runnable job. PostgreSQL skips rows locked by other
+    workers (FOR UPDATE SKIP LOCKED); the status-guarded UPDATE makes the
+    claim safe on SQLite too, where the lock clause is not rendered.
+    """
+    now = datetime.now()
+    async with async_session() as session:
+        stmt = (
+            select(Job)
+            .filter(Job.status == JobStatus.QUEUED, Job.run_after <= now)
+            .filter(Job.deleted_at.is_(None))
+            .order_by(Job.run_after)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(stmt)
+        job = result.scalars().first()
+        if not job:
+            return None
+        claimed = await session.execute(
+            update(Job)
+            .where(Job.uuid == job.uuid, Job.status == JobStatus.QUEUED)
+            .values(status=JobStatus.RUNNING, locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        if claimed.rowcount != 1:
+            return None
+        job.status, job.locked_by, job.locked_at, job.attempts = JobStatus.RUNNING, worker_id, now, job.attempts + 1
+        return job
+
+
+async def finish_job(job: Job, error: Optional[str] = None) -> None:
+    """Mark a job done, or schedule a retry with exponential backoff until attempts run out."""
+    now = datetime.now()
+    if error is None:
+        values = {"status": JobStatus.DONE, "finished_at": now, "last_error": None}
+    elif job.attempts < job.max_attempts:
+        backoff = settings.JOB_RETRY_BACKOFF * (2 ** (job.attempts - 1))
+        values = {"status": JobStatus.QUEUED, "run_after": now + timedelta(seconds=backoff), "last_error": error}
+        logger.warn("job %s failed, retry in %ss: %s", job.dedup_key, backoff, error)
+    else:
+        values = {"status": JobStatus.FAILED, "finished_at": now, "last_error": error}
+        logger.error("job %s failed permanently: %s", job.dedup_key, error)
+    async with async_session() as session:
+        await session.execute(
+            update(Job).where(Job.uuid == job.uuid).values(locked_by=None, locked_at=None, **values)
+        )
+        await session.commit()
+
+
+async def heartbeat_job(job: Job) -> None:
+    """Refresh the lock of a running job so ``requeue_stale_jobs`` leaves it alone."""
+    async with async_session() as session:
+        await session.execute(
+            update(Job)
+            .where(Job.uuid == job.uuid, Job.status == JobStatus.RUNNING, Job.locked_by == job.locked_by)
+            .values(locked_at=datetime.now())
+        )
+        await session.commit()
+
+
+async def requeue_stale_jobs() -> int:
+    """Return jobs whose worker stopped sending heartbeats, e.g. because it died, to the queue."""
+    stale_before = datetime.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    try:
+        async with async_session() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.status == JobStatus.RUNNING, Job.locked_at < stale_before)
+                .values(status=JobStatus.QUEUED, locked_by=None, locked_at=None)
+            )
+            await session.commit()
+        if result.rowcount:
+            logger.warn("requeued %s stale jobs", result.rowcount)
+        return result.rowcount
+    except Exception as e:
+        logger.error(f"requeue_stale_jobs: {e}")
+        return 0
+
+
+async def get_recent_jobs(limit: int = 50) -> List[Job]:
+    stmt = (
+        select(Job)
+        .filter(Job.deleted_at.is_(None))
+        .order_by(Job.created_at.desc())
+        .limit(limit)
+    )
+    async with async_session() as session:
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+
+async def get_last_finished_at(dedup_key: str) -> Optional[datetime]:
+    stmt = select(func.max(Job.finished_at)).filter(Job.dedup_key == dedup_key, Job.status == JobStatus.DONE)
+    async with async_session() as session:
+        result = await session.execute(stmt)
+        return result.scalar()
+
+
+async def acquire_lease(name: str, holder: str, ttl: float) -> bool:
+    """
+    Take or renew the named lease. Returns True while ``holder`` owns it;
+    another holder can only take it over once it has expired.
+    """
+    now = datetime.now()
+    expires_at = now + timedelta(seconds=ttl)
+    async with async_session() as session:
+        result = await session.execute(
+            update(Lease)
+            .where(Lease.name == name, or_(Lease.holder == holder, Lease.expires_at < now))
+            .values(holder=holder, expires_at=expires_at)
+        )
+        if result.rowcount:
+            await session.commit()
+            return True
+        session.add(Lease(name=name, holder=holder, expires_at=expires_at))
+        try:
+            await session.commit()
+            return True
+        except IntegrityError:
+            await session.rollback()
+            return False
+
+
+async def release_lease(name: str, holder: str) -> None:
+    try:
+        async with async_session() as session:
+            await session.execute(
+                update(Lease).where(Lease.name == name, Lease.holder == holder).values(expires_at=datetime.now())
+            )
+            await session.commit()
+    except Exception as e:
+        logger.error(f"release_lease {name}: {e}")
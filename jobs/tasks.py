@@ -0,0 +1,24 @@
+from typing import Dict, Callable, Awaitable, Any
+
+from leagues.services import (
+    get_and_save_leagues,
+    check_and_save_leagues_data,
+    get_and_save_league_series,
+    backfill_league_series,
+)
+from matches.services import refresh_hero_stats
+from players.services import get_and_save_player, get_and_save_pro_players
+from teams.services import get_and_save_teams, get_and_save_team
+
+# job kind -> ingestion coroutine; kinds with an entity id receive it as the only argument
+JOB_TASKS: Dict[str, Callable[..., Awaitable[Any]]] = {
+    "leagues": get_and_save_leagues,
+    "leagues_all": check_and_save_leagues_data,
+    "league": get_and_save_league_series,
+    "league_backfill": backfill_league_series,
+    "teams": get_and_save_teams,
+    "team": get_and_save_team,
+    "pro_players": get_and_save_pro_players,
+    "player": get_and_save_player,
+    "hero_stats": refresh_hero_stats,
+}
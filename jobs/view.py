@@ -0,0 +1,17 @@
+from robyn import SubRouter, Request, logger
+
+from account.token import auth_required
+from jobs.services import get_recent_jobs
+
+job = SubRouter(__name__, prefix="/jobs")
+
+
+@job.get("/list")
+@auth_required()
+async def get_job_list(request: Request):
+    try:
+        jobs = await get_recent_jobs()
+        return {"jobs": [job_obj.to_dict() for job_obj in jobs]}
+    except Exception as e:
+        logger.error("get_job_list: %s", e)
+        return {"error": "Internal server error"}
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import socket
+from typing import List, Optional
+
+from robyn import logger
+
+from config.settings import settings
+from jobs.models import Job
+from jobs.services import claim_job, finish_job, requeue_stale_jobs, heartbeat_job
+from jobs.tasks import JOB_TASKS
+
+_stop_event: Optional[asyncio.Event] = None
+_workers: List[asyncio.Task] = []
+
+
+async def keep_alive(job: Job) -> None:
+    while True:
+        await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+        try:
+            await heartbeat_job(job)
+        except Exception as e:
+            logger.error(f"heartbeat for {job.dedup_key} failed: {e}")
+
+
+async def execute_job(job: Job) -> None:
+    task_function = JOB_TASKS.get(job.kind)
+    if task_function is None:
+        await finish_job(job, f"Unknown job kind: {job.kind}")
+        return
+    heartbeat = asyncio.create_task(keep_alive(job))
+    try:
+        if job.entity_id is None:
+            await task_function()
+        else:
+            await task_function(job.entity_id)
+    except Exception as e:
+        await finish_job(job, repr(e))
+        return
+    finally:
+        heartbeat.cancel()
+    await finish_job(job)
+
+
+async def run_worker(worker_id: str, stop_event: asyncio.Event) -> None:
+    logger.info("job worker %s started", worker_id)
+    while not stop_event.is_set():
+        try:
+            job = await claim_job(worker_id)
+        except Exception as e:
+            logger.error(f"job worker {worker_id}: failed to claim job: {e}")
+            job = None
+        if job is None:
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=settings.JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        logger.info("job worker %s running %s", worker_id, job.dedup_key)
+        await execute_job(job)
+    logger.info("job worker %s stopped", worker_id)
+
+
+async def start_job_workers(concurrency: int = settings.JOB_WORKERS) -> None:
+    """Start ``concurrency`` workers on the running loop, after requeueing jobs orphaned by a crash."""
+    global _stop_event
+    if _workers:
+        return
+    await requeue_stale_jobs()
+    _stop_event = asyncio.Event()
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    loop = asyncio.get_running_loop()
+    for number in range(concurrency):
+        _workers.append(loop.create_task(run_worker(f"{prefix}:{number}", _stop_event)))
+
+
+async def stop_job_workers() -> None:
+    """Signal workers to stop after their current job and wait for them."""
+    if _stop_event is not None:
+        _stop_event.set()
+    if _workers:
+        await asyncio.gather(*_workers, return_exceptions=True)
+        _workers.clear()
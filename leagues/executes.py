@@ -6,8 +6,8 @@ from sqlalchemy.orm import selectinload, with_loader_criteria
 
 from config.db import async_session
 from leagues.models import Series
-from matches.models import Match, MatchPickBan
-from teams.models import Team
+from matches.models import Match, MatchPickBan, MATCH_LIST_COLUMNS
+from teams.models import Team, TEAM_LIST_COLUMNS
 
 
 async def execute_series_for_league(league_id: int) -> Optional[List[Series]]:
@@ -17,12 +17,13 @@ async def execute_series_for_league(league_id: int) -> Optional[List[Series]]:
             .filter(Series.league_id == league_id)
             .order_by(Series.id.desc())
             .options(
-                selectinload(Series.team_one),
-                selectinload(Series.team_two),
+                selectinload(Series.team_one).load_only(*TEAM_LIST_COLUMNS),
+                selectinload(Series.team_two).load_only(*TEAM_LIST_COLUMNS),
                 selectinload(Series.matches)
+                .load_only(*MATCH_LIST_COLUMNS)
                 .options(
-                    selectinload(Match.radiant_team),
-                    selectinload(Match.dire_team),
+                    selectinload(Match.radiant_team).load_only(*TEAM_LIST_COLUMNS),
+                    selectinload(Match.dire_team).load_only(*TEAM_LIST_COLUMNS),
                     selectinload(Match.pick_bans)
                 ),
                 with_loader_criteria(Series, Series.deleted_at.is_(None)),
@@ -1,8 +1,11 @@
-from sqlalchemy import ForeignKey, BigInteger, Index
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import ForeignKey, BigInteger, Index, DateTime
 from sqlalchemy.orm import Mapped, relationship, mapped_column
 
 from common.utils import date_as_number, unix_to_datetime, get_delta_time, unix_to_string
-from config.db import a_id, a_str, a_text, a_bool, a_small_int, a_big_int, Base
+from config.db import a_id, a_str, a_text, a_bool, a_small_int, a_big_int, Base, FingerprintMixin
 
 
 # class LeagueQuery(Session):
@@ -30,7 +33,7 @@ from config.db import a_id, a_str, a_text, a_bool, a_small_int, a_big_int, Base
 #         ).update({League.is_over: True})
 
 
-class League(Base):
+class League(FingerprintMixin, Base):
     __tablename__ = 'leagues'
 
     id: Mapped[a_id]
@@ -93,7 +96,14 @@ class League(Base):
         return self.start_datetime >= date_as_number()
 
 
-class Series(Base):
+# columns rendered by the league list and the team leagues table
+LEAGUE_LIST_COLUMNS = (
+    League.id, League.display_name, League.tier, League.status, League.prize_pool, League.is_over,
+    League.start_datetime, League.end_datetime, League.updated_at,
+)
+
+
+class Series(FingerprintMixin, Base):
     __tablename__ = 'series'
 
     id: Mapped[a_id]
@@ -154,3 +164,19 @@ class Series(Base):
         if self.winning_team_id == self.team_two.id:
             return f'<span class="badge text-bg-success">{team_two_name}</span>'
         return team_two_name
+
+
+class LeagueSyncState(Base):
+    """High-water mark of the series already ingested for one league."""
+    __tablename__ = 'league_sync_states'
+
+    id: Mapped[a_id]  # league id
+    last_series_id: Mapped[a_big_int]
+    last_match_date_time: Mapped[a_big_int]
+    is_backfilled: Mapped[a_bool]
+    synced_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # start of the latest sync, successful or not; the scheduler spaces refreshes from it
+    attempted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    def __str__(self):
+        return f"lg{self.id} sync-{self.last_match_date_time}"
@@ -1,20 +1,25 @@
-from datetime import timedelta
-from typing import Dict, Any, Optional
+from datetime import timedelta, datetime
+from typing import Dict, Any, Optional, List
 
 from robyn import logger
-from sqlalchemy import update, select, or_
+from sqlalchemy import update, select, or_, func
+from sqlalchemy.orm import load_only
 
-from common.execute import get_or_create, update_or_create
+from common.conditional import max_updated_at
+from common.execute import bulk_upsert, ensure_exists
+from common.pages import invalidate_pages
 from common.urls import get_url_league_list, get_url_league_series_list
 from common.utils import (
     int_to_abs,
     date_as_number,
     now_tz,
-    fetch_data,
+    fetch_required,
     process_related_data, process_entities,
 )
-from config.db import Base, async_session
-from leagues.models import League, Series
+from config.db import async_session
+from config.settings import settings
+from leagues.models import League, Series, LeagueSyncState, LEAGUE_LIST_COLUMNS
+from matches.models import Match, MatchPickBan, HeroStat
 from matches.services import save_match
 from teams.models import Team
 
@@ -22,50 +27,54 @@ from teams.models import Team
 # leagues
 async def get_and_save_leagues():
     try:
-        leagues = await fetch_data(get_url_league_list(), list)
-        await process_related_data({"leagues": leagues}, "leagues", save_league)
+        leagues = await fetch_required(get_url_league_list(), list)
+        await save_leagues(leagues)
         await update_is_over_league()
     except Exception as e:
         logger.error(f"get_and_save_leagues: An error occurred: {e}")
+        raise
 
 
-async def save_league(league_data: Dict[str, Any]) -> Base | None:
+def build_league_defaults(league_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": league_data.get("id"),
+        "registration_period": league_data.get("registrationPeriod"),
+        "country": league_data.get("country"),
+        "venue": league_data.get("venue"),
+        "private": league_data.get("private"),
+        "city": league_data.get("city"),
+        "description": league_data.get("description"),
+        "has_live_matches": league_data.get("hasLiveMatches"),
+        "tier": league_data.get("tier"),
+        "tournament_url": league_data.get("tournamentUrl"),
+        "free_to_spectate": league_data.get("freeToSpectate"),
+        "is_followed": league_data.get("isFollowed"),
+        "pro_circuit_points": league_data.get("proCircuitPoints"),
+        "banner": league_data.get("banner"),
+        "stop_sales_time": league_data.get("stopSalesTime"),
+        "image_uri": league_data.get("imageUri"),
+        "display_name": league_data.get("displayName"),
+        "end_datetime": league_data.get("endDateTime"),
+        "name": league_data.get("name"),
+        "prize_pool": league_data.get("prizePool"),
+        "base_prize_pool": league_data.get("basePrizePool"),
+        "region": league_data.get("region"),
+        "start_datetime": league_data.get("startDateTime"),
+        "status": league_data.get("status"),
+    }
+
+
+async def save_leagues(leagues_data: Optional[List[Dict[str, Any]]]) -> List[int]:
     try:
-        defaults = {
-            "id": league_data.get("id"),
-            "registration_period": league_data.get("registrationPeriod"),
-            "country": league_data.get("country"),
-            "venue": league_data.get("venue"),
-            "private": league_data.get("private"),
-            "city": league_data.get("city"),
-            "description": league_data.get("description"),
-            "has_live_matches": league_data.get("hasLiveMatches"),
-            "tier": league_data.get("tier"),
-            "tournament_url": league_data.get("tournamentUrl"),
-            "free_to_spectate": league_data.get("freeToSpectate"),
-            "is_followed": league_data.get("isFollowed"),
-            "pro_circuit_points": league_data.get("proCircuitPoints"),
-            "banner": league_data.get("banner"),
-            "stop_sales_time": league_data.get("stopSalesTime"),
-            "image_uri": league_data.get("imageUri"),
-            "display_name": league_data.get("displayName"),
-            "end_datetime": league_data.get("endDateTime"),
-            "name": league_data.get("name"),
-            "prize_pool": league_data.get("prizePool"),
-            "base_prize_pool": league_data.get("basePrizePool"),
-            "region": league_data.get("region"),
-            "start_datetime": league_data.get("startDateTime"),
-            "status": league_data.get("status"),
-        }
+        rows = [build_league_defaults(league_data) for league_data in leagues_data or []]
         async with async_session() as session:
-            league, created = await update_or_create(
-                session, League, defaults, id=league_data.get("id")
-            )
-        return league
+            league_ids = await bulk_upsert(session, League, rows)
+            await session.commit()
+        invalidate_pages(*[("league", league_id) for league_id in league_ids])
+        return league_ids
     except Exception as e:
-        session.rollback()
-        logger.error(f"An error occurred while saving League: {e}")
-        return None
+        logger.error(f"An error occurred while saving Leagues: {e}")
+        return []
 
 
 async def update_is_over_league():
@@ -73,7 +82,7 @@ async def update_is_over_league():
         stmt = (
             update(League)
             .filter(
-                League.end_datetime < date_as_number(),
+                League.end_datetime < date_as_number(now_tz()),
                 League.deleted_at.is_(None),
             )
             .filter(League.is_over.is_(False) | League.is_over.is_(None))
@@ -108,33 +117,147 @@ async def check_and_save_leagues_data():
         await process_entities(league_ids, get_and_save_league_series, "league")
     except Exception as e:
         logger.error(f"get_and_save_all_data_leagues: An error occurred: {e}")
+        raise
+
+
+async def get_leagues_to_refresh(finished_since: int) -> List[Any]:
+    """
+    Tier 2+ leagues still running or finished after ``finished_since`` (unix time),
+    with their sync state: rows of (League, attempted_at, last_match_date_time).
+    """
+    stmt = (
+        select(League, func.coalesce(LeagueSyncState.attempted_at, LeagueSyncState.synced_at),
+               LeagueSyncState.last_match_date_time)
+        .outerjoin(LeagueSyncState, LeagueSyncState.id == League.id)
+        .filter(League.deleted_at.is_(None), League.tier >= 2)
+        .filter(
+            League.is_over.is_(False)
+            | League.is_over.is_(None)
+            | (League.end_datetime >= finished_since)
+        )
+    )
+    async with async_session() as session:
+        result = await session.execute(stmt)
+        return result.all()
+
+
+async def get_league_updated_at(league_id: int) -> Optional[datetime]:
+    """Latest change to anything the league detail page shows."""
+    return await max_updated_at(
+        select(func.max(League.updated_at)).filter(League.id == league_id).scalar_subquery(),
+        select(func.max(Series.updated_at)).filter(Series.league_id == league_id).scalar_subquery(),
+        select(func.max(Match.updated_at)).filter(Match.league_id == league_id).scalar_subquery(),
+        select(func.max(MatchPickBan.updated_at)).join(Match)
+        .filter(Match.league_id == league_id).scalar_subquery(),
+        select(func.max(Team.updated_at))
+        .join(Series, or_(Series.team_one_id == Team.id, Series.team_two_id == Team.id))
+        .filter(Series.league_id == league_id).scalar_subquery(),
+        select(func.max(HeroStat.updated_at))
+        .filter(HeroStat.scope_type == 'league', HeroStat.scope_id == league_id).scalar_subquery(),
+    )
 
 
 # league series
-async def get_and_save_league_series(league_id: int):
+async def get_league_sync_state(league_id: int) -> Optional[LeagueSyncState]:
+    async with async_session() as session:
+        stmt = select(LeagueSyncState).filter(LeagueSyncState.id == league_id)
+        result = await session.execute(stmt)
+        return result.scalars().first()
+
+
+async def save_league_sync_state(league_id: int, last_series_id: Optional[int],
+                                 last_match_date_time: Optional[int], is_backfilled: bool) -> None:
+    row = {
+        "id": league_id,
+        "last_series_id": last_series_id,
+        "last_match_date_time": last_match_date_time,
+        "is_backfilled": is_backfilled,
+        "synced_at": datetime.now(),
+    }
+    async with async_session() as session:
+        await bulk_upsert(session, LeagueSyncState, [row])
+        await session.commit()
+
+
+async def mark_league_sync_attempt(league_id: int) -> None:
+    async with async_session() as session:
+        await bulk_upsert(session, LeagueSyncState, [{"id": league_id, "attempted_at": datetime.now()}])
+        await session.commit()
+
+
+async def get_and_save_league_series(league_id: int, full: bool = False):
+    """
+    Sync the series of a league, newest first, page by page.
+
+    The first sync (or ``full``) walks every page. Later syncs only fetch
+    small pages until they reach series older than the stored high-water
+    mark, minus LEAGUE_SYNC_OVERLAP seconds to catch series still in play.
+    The mark only moves once every fetched page has been saved; when some
+    matches failed to save it stops just before the earliest of them.
+    """
     try:
-        series = await fetch_data(get_url_league_series_list(league_id), list)
         await update_is_over_series()
-        await process_related_data({"series": series}, "series", save_series)
+        state = await get_league_sync_state(league_id)
+        await mark_league_sync_attempt(league_id)
+        backfill = full or state is None or not state.is_backfilled or state.last_match_date_time is None
+        if backfill:
+            take, since = settings.LEAGUE_SERIES_PAGE_SIZE, None
+        else:
+            take, since = settings.LEAGUE_SERIES_DELTA_PAGE_SIZE, state.last_match_date_time - settings.LEAGUE_SYNC_OVERLAP
+        last_series_id = state.last_series_id if state else None
+        last_match_date_time = state.last_match_date_time if state else None
+
+        resume_before = None
+        skip = 0
+        while True:
+            page = await fetch_required(get_url_league_series_list(league_id, take=take, skip=skip), list)
+            fresh = [
+                series_data for series_data in page
+                if since is None or series_data.get("lastMatchDate") is None or series_data["lastMatchDate"] >= since
+            ]
+            if fresh and await save_series_list(fresh) is None:
+                raise RuntimeError(f"league {league_id}: failed to save the series page at skip {skip}")
+            failed_before = await save_series_matches(fresh)
+            if failed_before is not None:
+                resume_before = failed_before if resume_before is None else min(resume_before, failed_before)
+            for series_data in fresh:
+                last_series_id = max(filter(None, (last_series_id, series_data.get("id"))), default=None)
+                last_match_date_time = max(
+                    filter(None, (last_match_date_time, series_data.get("lastMatchDate"))), default=None
+                )
+            if len(page) < take or len(fresh) < len(page):
+                break
+            skip += take
+
+        if resume_before is not None:
+            logger.warn("league %s: some matches failed to save, resuming before %s", league_id, resume_before)
+            last_match_date_time = (resume_before if last_match_date_time is None
+                                    else min(last_match_date_time, resume_before))
+        logger.info("league %s synced up to series %s", league_id, last_series_id)
+        await save_league_sync_state(league_id, last_series_id, last_match_date_time,
+                                     is_backfilled=backfill or state.is_backfilled)
     except Exception as e:
         logger.error(f"get_and_save_league_series: An error occurred: {e}")
+        raise
 
 
-async def save_series(series_data: Dict[str, Any]) -> Optional[Base]:
+async def backfill_league_series(league_id: int):
+    await get_and_save_league_series(league_id, full=True)
+
+
+async def save_series_list(series_list: Optional[List[Dict[str, Any]]]) -> Optional[List[int]]:
     try:
-        series_id = series_data.get("id")
-        team_one_id = int_to_abs(series_data, "teamOneId")
-        team_two_id = int_to_abs(series_data, "teamTwoId")
-        league_id = series_data.get("leagueId")
-        async with async_session() as session:
-            league, _ = await get_or_create(session, League, {}, id=league_id)
-            team_one, _ = await get_or_create(
-                session, Team, {"name": f"Team-{team_one_id}"}, id=team_one_id
-            )
-            team_two, _ = await get_or_create(
-                session, Team, {"name": f"Team-{team_two_id}"}, id=team_two_id
-            )
-            defaults = {
+        series_list = [series_data for series_data in series_list or [] if series_data.get("id")]
+        league_rows, team_rows, series_rows = [], [], []
+        for series_data in series_list:
+            team_one_id = int_to_abs(series_data, "teamOneId")
+            team_two_id = int_to_abs(series_data, "teamTwoId")
+            league_id = series_data.get("leagueId")
+            league_rows.append({"id": league_id})
+            team_rows.append({"id": team_one_id, "name": f"Team-{team_one_id}"})
+            team_rows.append({"id": team_two_id, "name": f"Team-{team_two_id}"})
+            series_rows.append({
+                "id": series_data.get("id"),
                 "league_id": league_id,
                 "team_one_id": team_one_id,
                 "team_two_id": team_two_id,
@@ -143,15 +266,41 @@ async def save_series(series_data: Dict[str, Any]) -> Optional[Base]:
                 "team_two_win_count": series_data.get("teamTwoWinCount"),
                 "winning_team_id": int_to_abs(series_data, "winningTeamId"),
                 "last_match_date_time": series_data.get("lastMatchDate"),
-            }
-            series, _ = await update_or_create(session, Series, defaults, id=series_id)
-
-        await process_related_data(series_data, "matches", save_match)
+            })
+        async with async_session() as session:
+            await ensure_exists(session, League, league_rows)
+            await ensure_exists(session, Team, team_rows)
+            series_ids = await bulk_upsert(session, Series, series_rows)
+            await session.commit()
+        changed = set(series_ids)
+        invalidate_pages(*[tag for row in series_rows if row["id"] in changed
+                           for tag in (("league", row["league_id"]), ("series", row["id"]))])
+        return series_ids
     except Exception as e:
         logger.error(f"Failed to save series: {e}")
         return None
 
 
+async def save_series_matches(series_list: List[Dict[str, Any]]) -> Optional[int]:
+    """
+    Save the matches of already saved series.
+
+    Returns:
+        Optional[int]: None when every match was saved, otherwise a match time
+        just before the earliest match that failed, for the sync mark.
+    """
+    matches, match_times = [], []
+    for series_data in series_list:
+        for match_data in series_data.get("matches") or []:
+            matches.append(match_data)
+            match_times.append(match_data.get("startDateTime") or series_data.get("lastMatchDate") or 0)
+    results = await process_related_data({"matches": matches}, "matches", save_match)
+    if results is None:
+        results = [None] * len(matches)
+    failed_times = [match_time for match_time, result in zip(match_times, results) if result is None]
+    return min(failed_times) - 1 if failed_times else None
+
+
 async def update_is_over_series():
     try:
         stmt = (
@@ -183,6 +332,7 @@ async def get_leagues_for_team(team_id: int):
             .join(Series)
             .filter(League.deleted_at.is_(None), Series.deleted_at.is_(None))
             .filter(or_(Series.team_one_id == team_id, Series.team_two_id == team_id))
+            .options(load_only(*LEAGUE_LIST_COLUMNS))
             .distinct()
             .order_by(League.id.desc())
         )
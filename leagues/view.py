@@ -1,15 +1,23 @@
-import asyncio
+from datetime import datetime
+from typing import Optional
 
 from robyn import SubRouter, Request, jsonify, logger
 from sqlalchemy import select
+from sqlalchemy.orm import load_only
 
 from account.token import check_headers_valid_email, auth_required
+from common.cache import cached
+from common.conditional import make_etag, validator_headers, is_not_modified, not_modified_response
+from common.pages import page_cache, render_html, html_response
+from common.pagination import get_cursor, keyset_page, split_page
 from common.utils import parse_int, redirect_response, not_found_response
 from config.db import async_session
 from config.settings import templates
+from jobs.services import enqueue_job
 from leagues.executes import execute_series_for_league
-from leagues.models import League
-from leagues.services import get_and_save_leagues, get_and_save_league_series, check_and_save_leagues_data
+from leagues.models import League, LEAGUE_LIST_COLUMNS
+from leagues.services import get_league_updated_at
+from matches.services import get_hero_stats
 
 league = SubRouter(__name__, prefix="/league")
 
@@ -23,16 +31,19 @@ async def index():
 async def get_league_list(request: Request):
     try:
         auth = await check_headers_valid_email(request)
+        cursor = get_cursor(request)
         async with (async_session() as session):
             stmt = (
                 select(League)
                 .filter(League.deleted_at.is_(None), League.tier >= 2)
-                .order_by(League.id.desc())
+                .options(load_only(*LEAGUE_LIST_COLUMNS))
             )
+            stmt = keyset_page(stmt, League.id, League.id, cursor, limit=50)
             result = await session.execute(stmt)
-            leagues = result.scalars().all()
+            leagues, next_cursor = split_page(result.scalars().all(), "id", limit=50)
         template = "/leagues/list.html"
-        context = {"request": request, "leagues": leagues, "auth": auth, "user": {}}
+        context = {"request": request, "leagues": leagues, "cursor": cursor, "next_cursor": next_cursor,
+                   "auth": auth, "user": {}}
         template = templates.render_template(template, **context)
         return template
     except Exception as e:
@@ -43,7 +54,7 @@ async def get_league_list(request: Request):
 @auth_required()
 async def update_leagues(request: Request):
     try:
-        asyncio.ensure_future(get_and_save_leagues())
+        await enqueue_job("leagues")
         return redirect_response('/league/list')
     except Exception as e:
         logger.error(f"update_leagues: {e}")
@@ -54,12 +65,39 @@ async def update_leagues(request: Request):
 @auth_required()
 async def update_all_leagues(request: Request):
     try:
-        await check_and_save_leagues_data()
+        await enqueue_job("leagues_all")
         return redirect_response('/league/list')
     except Exception as e:
         return jsonify("Failed update league list: %s", e)
 
 
+@cached(page_cache, tags=lambda league_id, auth, version: [("league", league_id)])
+async def render_league_page(league_id: int, auth: bool, version: Optional[datetime]) -> Optional[str]:
+    """Rendered league page; ``version`` is its get_league_updated_at value and only keys the cache."""
+    league_stmt = (
+        select(League)
+        .where(League.id == league_id)
+        .filter(League.deleted_at.is_(None))
+    )
+    async with async_session() as session:
+        result = await session.execute(league_stmt)
+        league_obj = result.scalars().first()
+        if not league_obj:
+            return None
+
+    series = await execute_series_for_league(league_id)
+    hero_stats = await get_hero_stats('league', league_id, version=version)
+
+    teams = set()
+    for series_obj in series:
+        teams.add(series_obj.team_one)
+        teams.add(series_obj.team_two)
+
+    context = {"league": league_obj, "series": series, "teams": teams,
+               "hero_stats": hero_stats, "auth": auth, "user": {}}
+    return render_html("/leagues/detail.html", **context)
+
+
 @league.get("/:league_id")
 async def get_league(request: Request):
     try:
@@ -68,29 +106,16 @@ async def get_league(request: Request):
         if league_id is None:
             return not_found_response(request, 'league', league_id)
 
-        league_stmt = (
-            select(League)
-            .where(League.id == league_id)
-            .filter(League.deleted_at.is_(None))
-        )
-        async with async_session() as session:
-            result = await session.execute(league_stmt)
-            league_obj = result.scalars().first()
-            if not league_obj:
-                return {"NoResultFound league": league_id}
-
-        series = await execute_series_for_league(league_id)
-
-        teams = set()
-        for series_obj in series:
-            teams.add(series_obj.team_one)
-            teams.add(series_obj.team_two)
-
-        template = "/leagues/detail.html"
-        context = {"request": request, "league": league_obj, "series": series, "teams": teams, "auth": auth,
-                   "user": {}}
-        template = templates.render_template(template, **context)
-        return template
+        updated_at = await get_league_updated_at(league_id)
+        etag = make_etag("league", league_id, bool(auth), updated_at)
+        headers = validator_headers(etag, updated_at)
+        if is_not_modified(request, etag, updated_at):
+            return not_modified_response(headers)
+
+        body = await render_league_page(league_id, bool(auth), updated_at)
+        if body is None:
+            return {"NoResultFound league": league_id}
+        return html_response(body, headers=headers)
     except Exception as e:
         logger.error("get_league: %s", e)
         return jsonify("get_league: %s", e)
@@ -103,7 +128,7 @@ async def update_league_series(request):
         league_id = await parse_int(request.path_params["league_id"])
         if league_id is None:
             return redirect_response(f'/league/list')
-        asyncio.ensure_future(get_and_save_league_series(league_id))
+        await enqueue_job("league", league_id)
         return redirect_response(f'/league/{league_id}')
     except Exception as e:
         logger.error("update_league_series: %s", e)
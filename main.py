@@ -3,11 +3,17 @@ import os
 from robyn import Robyn, Request, logger
 
 from account.auth import BasicAuthHandler, CustomBearerGetter
-from account.token import create_access_token, decode_access_token, check_headers_valid_email
+from account.token import create_access_token, decode_access_token, check_headers_valid_email, attach_identity
 from account.views import auth
+from common.client import init_http_client, close_http_client
 from common.execute import get_count_conn
+from common.metrics import install_metrics, metrics_response
+from config.db import pool_stats
 # from common.startup import on_app_startup
-from config.settings import BASE_DIR, templates
+from common.startup import warm_identity_cache
+from config.settings import BASE_DIR, templates, settings
+from jobs.view import job
+from jobs.worker import start_job_workers, stop_job_workers
 from leagues.view import league
 from matches.view import match
 from players.view import player
@@ -19,11 +25,18 @@ app = Robyn(__file__)
 @app.startup_handler
 async def startup_handler():
     print("Starting up")
+    await init_http_client()
+    if settings.JOB_WORKERS > 0:
+        # only a process that ingests needs the known-id cache
+        await warm_identity_cache()
+        await start_job_workers(settings.JOB_WORKERS)
 
 
 @app.shutdown_handler
-def shutdown_handler():
+async def shutdown_handler():
     print("Shutting down")
+    await stop_job_workers()
+    await close_http_client()
 
 
 @app.get("/count", auth_required=True)
@@ -31,12 +44,29 @@ async def messages(request: Request):
     try:
         user = request.identity.claims["user"]
         count = await get_count_conn()
+        if count["count"] is None:
+            # no server-side count off PostgreSQL, report this process's pool instead
+            count["pool"] = pool_stats()
         return {"s": user, "c": count}
     except Exception as e:
         logger.error(f"Error in /count endpoint: {e}")
         return {"error": "Internal server error"}
 
 
+@app.get("/pool", auth_required=True)
+async def pool(request: Request):
+    try:
+        return pool_stats()
+    except Exception as e:
+        logger.error(f"Error in /pool endpoint: {e}")
+        return {"error": "Internal server error"}
+
+
+@app.get("/metrics")
+async def metrics(request: Request):
+    return metrics_response()
+
+
 @app.get("/")
 async def index(request: Request):
     try:
@@ -75,12 +105,15 @@ def main():
             index_file="",
         )
         app.add_response_header("server", "robyn")
+        app.before_request()(attach_identity)
         app.configure_authentication(BasicAuthHandler(token_getter=CustomBearerGetter()))
         app.include_router(auth)
         app.include_router(league)
         app.include_router(team)
         app.include_router(match)
         app.include_router(player)
+        app.include_router(job)
+        install_metrics(app)
 
         app.start(host='0.0.0.0', port=8081)
     except Exception as e:
@@ -1,16 +1,17 @@
 import json
 
-from sqlalchemy import BigInteger, ForeignKey, Index
+from sqlalchemy import BigInteger, ForeignKey, Index, String, Integer, Boolean, SmallInteger, Float
 from sqlalchemy.orm import relationship, Mapped, mapped_column, class_mapper
 
 from common.constants import HEROES
 from common.utils import unix_to_datetime, seconds_to_hours_minutes, sum_elements, unix_to_string, get_delta_time
-from config.db import a_id, a_small_int, a_big_int, a_bool, a_json, Base, a_int, a_char
+from config.db import a_id, a_small_int, a_big_int, a_bool, a_json, Base, a_int, a_char, FingerprintMixin, \
+    a_json_deferred
 from leagues.models import Series, League
 from teams.models import Team
 
 
-class MatchPlayer(Base):
+class MatchPlayer(FingerprintMixin, Base):
     __tablename__ = 'match_players'
 
     match_id: Mapped[a_big_int]
@@ -50,16 +51,16 @@ class MatchPlayer(Base):
     behavior: Mapped[a_int]
     hero_healing: Mapped[a_int]
     roam_lane: Mapped[a_int]
-    abilities: Mapped[a_json]
+    abilities: Mapped[a_json_deferred]
     is_victory: Mapped[a_bool]
     networth: Mapped[a_int]
     neutral0_id: Mapped[a_int]
-    additional_unit: Mapped[a_json]
+    additional_unit: Mapped[a_json_deferred]
     dota_plus_hero_xp: Mapped[a_int]
     invisible_seconds: Mapped[a_int]
-    match_player_stats: Mapped[a_json]
-    stats: Mapped[a_json]
-    playback_data: Mapped[a_json]
+    match_player_stats: Mapped[a_json_deferred]
+    stats: Mapped[a_json_deferred]
+    playback_data: Mapped[a_json_deferred]
     is_dire: Mapped[a_bool]
     role_basic: Mapped[a_int]
     position: Mapped[a_int]
@@ -77,13 +78,15 @@ class MatchPlayer(Base):
         Index('ix_match_players_match_id', 'match_id'),
         Index('ix_match_players_steam_account_id', 'steam_account_id'),
         Index('ix_match_players_hero_id', 'hero_id'),
+        Index('ux_match_players_match_id_player_slot', 'match_id', 'player_slot', unique=True),
+        Index('ix_match_players_steam_account_id_match_id_hero_id', 'steam_account_id', 'match_id', 'hero_id'),
     )
 
     def __str__(self):
         return f" player {self.steam_account_id}={self.player_slot}"
 
 
-class MatchPickBan(Base):
+class MatchPickBan(FingerprintMixin, Base):
     __tablename__ = 'match_picks_ban'
 
     is_pick: Mapped[a_bool]
@@ -104,6 +107,8 @@ class MatchPickBan(Base):
     __table_args__ = (
         Index('ix_match_picks_ban_match_id', 'match_id'),
         Index('ix_match_picks_ban_hero_id', 'hero_id'),
+        Index('ux_match_picks_ban_match_id_order', 'match_id', 'order', unique=True),
+        Index('ix_match_picks_ban_match_id_is_pick_hero_id', 'match_id', 'is_pick', 'hero_id'),
     )
 
     def __str__(self):
@@ -115,7 +120,7 @@ class MatchPickBan(Base):
         return f"{url_image}{hero_image_name}"
 
 
-class Match(Base):
+class Match(FingerprintMixin, Base):
     __tablename__ = 'matches'
 
     id: Mapped[a_id]
@@ -161,16 +166,16 @@ class Match(Base):
     bottom_lane_outcome: Mapped[a_big_int]
     mid_lane_outcome: Mapped[a_big_int]
     top_lane_outcome: Mapped[a_big_int]
-    radiant_networth_lead: Mapped[a_json]
-    radiant_experience_lead: Mapped[a_json]
+    radiant_networth_lead: Mapped[a_json_deferred]
+    radiant_experience_lead: Mapped[a_json_deferred]
     radiant_kills: Mapped[a_json]
     dire_kills: Mapped[a_json]
-    tower_status: Mapped[a_json]
-    lane_report: Mapped[a_json]
-    win_rates: Mapped[a_json]
-    predicted_win_rates: Mapped[a_json]
-    tower_deaths: Mapped[a_json]
-    chat_events: Mapped[a_json]
+    tower_status: Mapped[a_json_deferred]
+    lane_report: Mapped[a_json_deferred]
+    win_rates: Mapped[a_json_deferred]
+    predicted_win_rates: Mapped[a_json_deferred]
+    tower_deaths: Mapped[a_json_deferred]
+    chat_events: Mapped[a_json_deferred]
     did_request_download: Mapped[a_bool]
     game_result: Mapped[a_big_int]
 
@@ -191,6 +196,8 @@ class Match(Base):
         Index('ix_matches_series_id', 'series_id'),
         Index('ix_matches_radiant_team_id', 'radiant_team_id'),
         Index('ix_matches_dire_team_id', 'dire_team_id'),
+        Index('ix_matches_league_id_game_version_id_start_date_time', 'league_id', 'game_version_id', 'start_date_time'),
+        Index('ix_matches_game_version_id_start_date_time', 'game_version_id', 'start_date_time'),
     )
 
     def __str__(self):
@@ -220,3 +227,86 @@ class Match(Base):
 
     def get_count_radiant_kills(self):
         return sum_elements(self.radiant_kills)
+
+
+# columns rendered by matches/includes/match-tables.html
+MATCH_LIST_COLUMNS = (
+    Match.id, Match.did_radiant_win, Match.duration_seconds, Match.end_date_time, Match.radiant_kills,
+    Match.dire_kills, Match.series_id, Match.league_id, Match.radiant_team_id, Match.dire_team_id,
+)
+
+
+class HeroPickBanStat(Base):
+    """
+    Pick/ban counts per hero, kept up to date by ``save_match``.
+
+    scope_type is 'league', 'team' (picks/bans made by that team) or 'all' (scope_id 0).
+    """
+    __tablename__ = 'hero_pick_ban_stats'
+
+    scope_type: Mapped[str] = mapped_column(String(10), nullable=False)
+    scope_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    game_version_id: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    hero_id: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    is_pick: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('ux_hero_pick_ban_stats_scope', 'scope_type', 'scope_id', 'game_version_id', 'hero_id', 'is_pick',
+              unique=True),
+    )
+
+    def __str__(self):
+        return f"{self.scope_type}{self.scope_id}/v{self.game_version_id}/hero_id={self.hero_id}-pick={self.is_pick}"
+
+
+class PicksScopeVersion(Base):
+    """
+    Bumped by ``save_match`` whenever a match changes what a scope's
+    /match/picks chart shows; its updated_at is the chart's validator.
+
+    scope_type is as in HeroPickBanStat, or 'player' (scope_id is the steam account id).
+    """
+    __tablename__ = 'picks_scope_versions'
+
+    scope_type: Mapped[str] = mapped_column(String(10), nullable=False)
+    scope_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('ux_picks_scope_versions_scope', 'scope_type', 'scope_id', unique=True),
+    )
+
+    def __str__(self):
+        return f"{self.scope_type}{self.scope_id}@{self.version}"
+
+
+class HeroStat(Base):
+    """
+    Per-hero pick/ban/win statistics of a scope and game version, recomputed
+    in batch by ``refresh_hero_stats``. Scopes are as in HeroPickBanStat.
+    """
+    __tablename__ = 'hero_stats'
+
+    scope_type: Mapped[str] = mapped_column(String(10), nullable=False)
+    scope_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    game_version_id: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    hero_id: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    matches: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    picks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    wins: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bans: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    first_phase_bans: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pick_rate: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    ban_rate: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    first_phase_ban_rate: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    win_rate: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    win_rate_low: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    win_rate_high: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('ux_hero_stats_scope', 'scope_type', 'scope_id', 'game_version_id', 'hero_id', unique=True),
+    )
+
+    def __str__(self):
+        return f"{self.scope_type}{self.scope_id}/v{self.game_version_id}/hero_id={self.hero_id}"
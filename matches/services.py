@@ -1,16 +1,37 @@
+import asyncio
+from collections import Counter
+from datetime import datetime
 from typing import Any
-from typing import Dict
+from typing import Dict, List, Optional, Iterable, Tuple
 
 from robyn import logger
-from sqlalchemy import select, func, desc, or_, and_
+from sqlalchemy import select, func, desc, or_, and_, case, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from common.execute import update_or_create, get_or_create
-from common.utils import int_to_abs, get_hero_info, scale_size, process_related_data
-from config.db import Base, async_session
+from common.cache import TTLCache, cached
+from common.conditional import max_updated_at
+from common.execute import bulk_upsert, ensure_exists, bulk_increment
+from common.pages import invalidate_pages
+from common.utils import int_to_abs, get_hero_info, scale_size
+from config.db import async_session
 from config.settings import settings
 from leagues.models import Series, League
-from matches.models import Match, MatchPickBan, MatchPlayer
-from players.services import save_player_instance
+from matches.models import Match, MatchPickBan, MatchPlayer, HeroPickBanStat, HeroStat, PicksScopeVersion
+from matches.stats import compute_hero_stats, hero_rates
+from matches.synergy import pick_ban_links
+from players.services import save_player_stubs
+from teams.models import Team
+
+HERO_PICK_BAN_STAT_KEY = ("scope_type", "scope_id", "game_version_id", "hero_id", "is_pick")
+HERO_STAT_KEY = ("scope_type", "scope_id", "game_version_id", "hero_id")
+PICKS_SCOPE_KEY = ("scope_type", "scope_id")
+# optional /match/picks query parameters, passed on as ((name, value), ...) pairs
+MATCH_FILTERS = ("league_id", "team_id", "start_date_time", "duration_seconds")
+MatchFilters = Tuple[Tuple[str, int], ...]
+
+# /match/picks results; entries are tagged (scope type, scope id) and dropped when a match is saved
+picks_cache = TTLCache(settings.PICKS_CACHE_SIZE, settings.PICKS_CACHE_TTL)
+links_cache = TTLCache(settings.PICKS_CACHE_SIZE, settings.SYNERGY_CACHE_TTL)
 
 
 # heroes
@@ -25,31 +46,78 @@ async def create_node(hero_id: int, count: int, min_count: int, max_count: int)
     }
 
 
-async def get_hero_counts_picks_bans(type_: str, id_: int):
+def build_match_filters(filters: MatchFilters) -> List[Any]:
+    """SQL conditions on Match for the optional /match/picks query filters."""
+    conditions = []
+    for name, value in filters:
+        if name == 'league_id':
+            conditions.append(Match.league_id == value)
+        elif name == 'team_id':
+            conditions.append(or_(Match.radiant_team_id == value, Match.dire_team_id == value))
+        elif name == 'start_date_time':
+            conditions.append(Match.start_date_time >= value)
+        elif name == 'duration_seconds':
+            conditions.append(Match.duration_seconds >= value)
+    return conditions
+
+
+def build_scope_filter(type_: str, id_: int) -> Any:
+    """Condition on Match/MatchPickBan selecting the pick/bans of a league, a team's side or all matches."""
+    if type_ == 'team':
+        return or_(
+            and_(Match.radiant_team_id == id_, MatchPickBan.is_radiant.is_(True)),
+            and_(Match.dire_team_id == id_, MatchPickBan.is_radiant.is_(False))
+        )
+    elif type_ == 'league':
+        return and_(Match.league_id == id_)
+    return and_(True)
+
+
+def picks_cache_tags(type_: str, id_: int, filters: MatchFilters = (), version: Optional[datetime] = None):
+    return [(type_, id_)] if type_ in ('team', 'league') else [('all', 0)]
+
+
+@cached(picks_cache, tags=picks_cache_tags)
+async def get_hero_counts_picks_bans(type_: str, id_: int, filters: MatchFilters = (),
+                                     version: Optional[datetime] = None):
+    """
+    Hero pick/ban counts of a league, a team or all matches. Unfiltered
+    charts come from the HeroPickBanStat counters; filtered ones aggregate
+    the matching rows, using the (league_id, game_version_id, start_date_time)
+    and (match_id, is_pick, hero_id) indexes.
+
+    ``version`` (see get_picks_updated_at) only keys the cache, so a change
+    made by another process is not served from a stale entry.
+    """
     try:
         async with async_session() as session:
-            if type_ == 'team':
-                match_filter = or_(
-                    and_(Match.radiant_team_id == id_, MatchPickBan.is_radiant.is_(True)),
-                    and_(Match.dire_team_id == id_, MatchPickBan.is_radiant.is_(False))
+            if filters:
+                stmt = (
+                    select(MatchPickBan.hero_id, MatchPickBan.is_pick, func.count(MatchPickBan.hero_id).label('count'))
+                    .join(Match)
+                    .filter(Match.deleted_at.is_(None), MatchPickBan.deleted_at.is_(None))
+                    .filter(Match.game_version_id >= settings.GAME_VERSION)
+                    .filter(build_scope_filter(type_, id_), *build_match_filters(filters))
+                    .group_by(MatchPickBan.hero_id)
+                    .group_by(MatchPickBan.is_pick)
+                    .order_by(desc('count'))
                 )
-            elif type_ == 'league':
-                match_filter = and_(Match.league_id == id_)
-            elif type_ == 'player':
-                match_filter = and_(True)
             else:
-                match_filter = and_(True)
+                if type_ in ('team', 'league'):
+                    scope_type, scope_id = type_, id_
+                else:
+                    scope_type, scope_id = 'all', 0
 
-            stmt = (
-                select(MatchPickBan.hero_id, MatchPickBan.is_pick, func.count(MatchPickBan.hero_id).label('count'))
-                .join(Match)
-                .filter(Match.deleted_at.is_(None), MatchPickBan.deleted_at.is_(None))
-                .filter(Match.game_version_id >= settings.GAME_VERSION)
-                .filter(match_filter)
-                .group_by(MatchPickBan.hero_id)
-                .group_by(MatchPickBan.is_pick)
-                .order_by(desc('count'))
-            )
+                stmt = (
+                    select(HeroPickBanStat.hero_id, HeroPickBanStat.is_pick,
+                           func.sum(HeroPickBanStat.count).label('count'))
+                    .filter(HeroPickBanStat.scope_type == scope_type, HeroPickBanStat.scope_id == scope_id)
+                    .filter(HeroPickBanStat.game_version_id >= settings.GAME_VERSION)
+                    .group_by(HeroPickBanStat.hero_id)
+                    .group_by(HeroPickBanStat.is_pick)
+                    .having(func.sum(HeroPickBanStat.count) > 0)
+                    .order_by(desc('count'))
+                )
 
             result = await session.execute(stmt)
             pick_bans = result.all()
@@ -64,18 +132,46 @@ async def get_hero_counts_picks_bans(type_: str, id_: int):
                 for pick in pick_bans if pick[1] is False
             ]
 
+            links = await get_hero_links(type_, id_, filters, version)
+
             return {
                 "nodes_picks": nodes_picks,
-                "links_picks": [],
+                "links_picks": links.get("links_picks", []),
                 "nodes_bans": nodes_bans,
-                "links_bans": [],
+                "links_bans": links.get("links_bans", []),
             }
     except Exception as e:
         logger.error("get_hero_counts_picks_bans: %s", e)
         return {}
 
 
-async def get_hero_counts_picks_for_player(id_: int):
+@cached(links_cache, tags=picks_cache_tags)
+async def get_hero_links(type_: str, id_: int, filters: MatchFilters = (),
+                         version: Optional[datetime] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Co-pick and co-ban hero pairs of a scope with their win-rate deltas, see ``pick_ban_links``."""
+    try:
+        stmt = (
+            select(MatchPickBan.match_id, MatchPickBan.is_radiant, MatchPickBan.hero_id, MatchPickBan.is_pick,
+                   Match.did_radiant_win)
+            .join(Match)
+            .filter(Match.deleted_at.is_(None), MatchPickBan.deleted_at.is_(None))
+            .filter(Match.game_version_id >= settings.GAME_VERSION, Match.did_radiant_win.is_not(None))
+            .filter(MatchPickBan.hero_id.is_not(None), MatchPickBan.is_pick.is_not(None))
+            .filter(MatchPickBan.is_radiant.is_not(None))
+            .filter(build_scope_filter(type_, id_), *build_match_filters(filters))
+        )
+        async with async_session() as session:
+            result = await session.execute(stmt)
+            rows = result.all()
+        # numpy releases the GIL in the matrix products, keep them off the event loop
+        return await asyncio.to_thread(pick_ban_links, rows, settings.SYNERGY_TOP_LINKS, settings.SYNERGY_MIN_COUNT)
+    except Exception as e:
+        logger.error("get_hero_links: %s", e)
+        return {}
+
+
+@cached(picks_cache, tags=lambda id_, filters=(), version=None: [('player', id_)])
+async def get_hero_counts_picks_for_player(id_: int, filters: MatchFilters = (), version: Optional[datetime] = None):
     try:
         async with async_session() as session:
             stmt = (
@@ -84,6 +180,11 @@ async def get_hero_counts_picks_for_player(id_: int):
                 .group_by(MatchPlayer.hero_id)
                 .order_by(desc('count'))
             )
+            if filters:
+                stmt = (
+                    stmt.join(Match, Match.id == MatchPlayer.match_id)
+                    .filter(Match.deleted_at.is_(None), *build_match_filters(filters))
+                )
 
             result = await session.execute(stmt)
             picks = result.all()
@@ -103,173 +204,393 @@ async def get_hero_counts_picks_for_player(id_: int):
         return {}
 
 
-# ------------
-async def save_match(match_data: Dict[str, Any]) -> Base | None:
-    try:
-        match_id = match_data.get('id')
+async def get_picks_updated_at(type_: str, id_: int) -> Optional[datetime]:
+    """Last time ``save_match`` changed what a /match/picks chart shows, None if it never did."""
+    scope_type, scope_id = (type_, id_) if type_ in ('team', 'league', 'player') else ('all', 0)
+    return await max_updated_at(
+        select(PicksScopeVersion.updated_at)
+        .filter(PicksScopeVersion.scope_type == scope_type, PicksScopeVersion.scope_id == scope_id)
+        .scalar_subquery()
+    )
 
-        defaults = {
-            'id': match_id,
-            "did_radiant_win": match_data.get("didRadiantWin", None),
-            "duration_seconds": match_data.get("durationSeconds", None),
-            "start_date_time": match_data.get("startDateTime", None),
-            "tower_status_radiant": match_data.get("towerStatusRadiant", None),
-            "tower_status_dire": match_data.get("towerStatusDire", None),
-            "barracks_status_radiant": match_data.get(
-                "barracksStatusRadiant", None
-            ),
-            "barracks_status_dire": match_data.get("barracksStatusDire", None),
-            "cluster_id": match_data.get("clusterId", None),
-            "first_blood_time": match_data.get("firstBloodTime", None),
-            "lobby_type": match_data.get("lobbyType", None),
-            "num_human_players": match_data.get("numHumanPlayers", None),
-            "game_mode": match_data.get("gameMode", None),
-            "replay_salt": match_data.get("replaySalt", None),
-            "is_stats": match_data.get("isStats", None),
-            "tournament_id": match_data.get("tournamentId", None),
-            "tournament_round": match_data.get("tournamentRound", None),
-            "average_rank": match_data.get("averageRank", None),
-            "actual_rank": match_data.get("actualRank", None),
-            "average_imp": match_data.get("averageImp", None),
-            "parsed_date_time": match_data.get("parsedDateTime", None),
-            "stats_date_time": match_data.get("statsDateTime", None),
-            "league_id": match_data.get("leagueId", None),
-            "radiant_team_id": int_to_abs(match_data, 'radiantTeamId'),
-            "dire_team_id": int_to_abs(match_data, 'direTeamId'),
-            "series_id": match_data.get("seriesId", None),
-            "game_version_id": match_data.get("gameVersionId", None),
-            "region_id": match_data.get("regionId", None),
-            "sequence_num": match_data.get("sequenceNum", None),
-            "rank": match_data.get("rank", None),
-            "bracket": match_data.get("bracket", None),
-            "end_date_time": match_data.get("endDateTime", None),
-            "actual_rank_weight": match_data.get("actualRankWeight", None),
-            "analysis_outcome": match_data.get("analysisOutcome", None),
-            "predicted_outcome_weight": match_data.get(
-                "predictedOutcomeWeight", None
-            ),
-            "bottom_lane_outcome": match_data.get("bottomLaneOutcome", None),
-            "mid_lane_outcome": match_data.get("midLaneOutcome"),
-            "top_lane_outcome": match_data.get("topLaneOutcome"),
-            "radiant_networth_lead": match_data.get("radiantNetworthLead"),
-            "radiant_experience_lead": match_data.get("radiantExperienceLead"),
-            "radiant_kills": match_data.get("radiantKills"),
-            "dire_kills": match_data.get("direKills"),
-            "tower_status": match_data.get("towerStatus"),
-            "lane_report": match_data.get("laneReport"),
-            "win_rates": match_data.get("winRates"),
-            "predicted_win_rates": match_data.get("predictedWinRates"),
-            "tower_deaths": match_data.get("towerDeaths"),
-            "chat_events": match_data.get("chatEvents"),
-            "did_request_download": match_data.get("didRequestDownload"),
-            "game_result": match_data.get("gameResult"),
-        }
-        async with async_session() as session:
-            await get_or_create(session, Series, {}, id=match_data.get("seriesId", None))
-            await get_or_create(session, League, {}, id=match_data.get("leagueId", None))
-            match, _ = await update_or_create(session, Match, defaults, id=match_id)
 
-        await process_related_data(match_data, "pickBans", save_match_pick_ban, match_id)
-        await process_related_data(match_data, "players", save_match_player)
-        return match
-    except Exception as e:
-        logger.error(f'An error occurred while saving Match: {e}')
-        return None
+def match_picks_scopes(match_values: Dict[str, Any]) -> List[Tuple[str, Optional[int]]]:
+    """The (scope type, scope id) of every pick/ban chart a match counts towards."""
+    scopes = [('all', 0), ('league', match_values.get("league_id"))]
+    return scopes + [('team', match_values.get(key)) for key in ("radiant_team_id", "dire_team_id")]
+
+
+def player_picks_scopes(players: List[Dict[str, Any]]) -> List[Tuple[str, Optional[int]]]:
+    return [('player', player_data.get("steamAccountId")) for player_data in players]
+
+
+async def bump_picks_scope_versions(session: AsyncSession, scopes: Iterable[Tuple[str, Optional[int]]]) -> None:
+    """Move the validators of ``scopes`` forward; part of the caller's transaction."""
+    rows = [
+        {"scope_type": scope_type, "scope_id": scope_id, "version": 1}
+        for scope_type, scope_id in set(scopes) if scope_id is not None
+    ]
+    await bulk_increment(session, PicksScopeVersion, rows, PICKS_SCOPE_KEY, ("version",))
 
 
-async def save_match_pick_ban(pb_data: Dict[str, Any], match_id: int) -> None:
+def invalidate_picks_cache(match_values: Dict[str, Any], players: List[Dict[str, Any]]) -> None:
+    """
+    Drop cached charts of every scope a saved match belongs to. Only this
+    process's cache is affected; others catch up after PICKS_CACHE_TTL.
+    """
+    tags = match_picks_scopes(match_values) + player_picks_scopes(players)
+    picks_cache.invalidate(*tags)
+    links_cache.invalidate(*tags)
+
+
+# hero pick/ban stats
+def count_hero_pick_ban_stats(match_values: Dict[str, Any], pick_bans: Iterable[Dict[str, Any]]) -> Counter:
+    """HeroPickBanStat counters a match contributes to, keyed like the table's unique index."""
+    counts = Counter()
+    game_version_id = match_values.get("game_version_id")
+    if game_version_id is None:
+        return counts
+    for pick_ban in pick_bans:
+        hero_id, is_pick, is_radiant = pick_ban.get("hero_id"), pick_ban.get("is_pick"), pick_ban.get("is_radiant")
+        if hero_id is None or is_pick is None:
+            continue
+        counts[("all", 0, game_version_id, hero_id, is_pick)] += 1
+        if match_values.get("league_id"):
+            counts[("league", match_values["league_id"], game_version_id, hero_id, is_pick)] += 1
+        if is_radiant is None:
+            continue
+        team_id = match_values.get("radiant_team_id") if is_radiant else match_values.get("dire_team_id")
+        if team_id:
+            counts[("team", team_id, game_version_id, hero_id, is_pick)] += 1
+    return counts
+
+
+async def get_stored_pick_bans(
+        session: AsyncSession, match_id: int
+) -> Tuple[Dict[str, Any], Dict[int, Dict[str, Any]]]:
+    """Stored match values and pick/bans by order, as counted by ``count_hero_pick_ban_stats``."""
+    stmt = (
+        select(Match.league_id, Match.radiant_team_id, Match.dire_team_id, Match.game_version_id,
+               MatchPickBan.order, MatchPickBan.hero_id, MatchPickBan.is_pick, MatchPickBan.is_radiant)
+        .outerjoin(MatchPickBan, and_(MatchPickBan.match_id == Match.id, MatchPickBan.deleted_at.is_(None)))
+        .filter(Match.id == match_id)
+    )
+    result = await session.execute(stmt)
+    match_values, pick_bans = {}, {}
+    for row in result.mappings():
+        match_values = {key: row[key] for key in ("league_id", "radiant_team_id", "dire_team_id", "game_version_id")}
+        if row["order"] is not None:
+            pick_bans[row["order"]] = {key: row[key] for key in ("hero_id", "is_pick", "is_radiant")}
+    return match_values, pick_bans
+
+
+async def update_hero_pick_ban_stats(
+        session: AsyncSession,
+        old_match: Dict[str, Any],
+        old_pick_bans: Dict[int, Dict[str, Any]],
+        match_values: Dict[str, Any],
+        pick_ban_rows: List[Dict[str, Any]],
+) -> None:
+    """Apply the difference between a match's stored and new pick/bans to HeroPickBanStat."""
+    new_pick_bans = {**old_pick_bans, **{row["order"]: row for row in pick_ban_rows if row.get("order") is not None}}
+    delta = count_hero_pick_ban_stats(match_values, new_pick_bans.values())
+    delta.subtract(count_hero_pick_ban_stats(old_match, old_pick_bans.values()))
+    rows = [
+        dict(zip(HERO_PICK_BAN_STAT_KEY, key), count=count)
+        for key, count in delta.items() if count
+    ]
+    await bulk_increment(session, HeroPickBanStat, rows, HERO_PICK_BAN_STAT_KEY, ("count",))
+
+
+async def rebuild_hero_pick_ban_stats() -> int:
+    """
+    Recompute HeroPickBanStat from match_picks_ban in one transaction,
+    e.g. after the table was added or if counters drifted. Returns the row count.
+    """
+    team_id = case(
+        (MatchPickBan.is_radiant.is_(True), Match.radiant_team_id),
+        (MatchPickBan.is_radiant.is_(False), Match.dire_team_id),
+    )
+    scopes = {"all": None, "league": Match.league_id, "team": team_id}
+    rows = []
+    async with async_session() as session:
+        for scope_type, scope_column in scopes.items():
+            columns = [Match.game_version_id, MatchPickBan.hero_id, MatchPickBan.is_pick]
+            if scope_column is not None:
+                columns.append(scope_column)
+            stmt = (
+                select(*columns, func.count().label('count'))
+                .select_from(MatchPickBan)
+                .join(Match)
+                .filter(Match.deleted_at.is_(None), MatchPickBan.deleted_at.is_(None))
+                .filter(Match.game_version_id.is_not(None), MatchPickBan.hero_id.is_not(None))
+                .filter(MatchPickBan.is_pick.is_not(None))
+                .group_by(*columns)
+            )
+            if scope_column is not None:
+                stmt = stmt.filter(scope_column.is_not(None))
+            result = await session.execute(stmt)
+            for row in result.all():
+                scope_id = row[3] if scope_column is not None else 0
+                rows.append(dict(zip(HERO_PICK_BAN_STAT_KEY, (scope_type, scope_id, *row[:3])), count=row[-1]))
+
+        await session.execute(delete(HeroPickBanStat))
+        await bulk_upsert(session, HeroPickBanStat, rows, index_elements=HERO_PICK_BAN_STAT_KEY)
+        await session.commit()
+    return len(rows)
+
+
+# hero statistics
+async def refresh_hero_stats() -> int:
+    """
+    Recompute HeroStat for every scope of the game versions shown on the
+    site (>= GAME_VERSION) and replace the stored rows in one transaction.
+    Returns the number of rows written.
+    """
+    stmt = (
+        select(MatchPickBan.match_id, Match.league_id, Match.radiant_team_id, Match.dire_team_id,
+               Match.game_version_id, Match.did_radiant_win, MatchPickBan.is_radiant, MatchPickBan.hero_id,
+               MatchPickBan.is_pick, MatchPickBan.order)
+        .join(Match)
+        .filter(Match.deleted_at.is_(None), MatchPickBan.deleted_at.is_(None))
+        .filter(Match.game_version_id >= settings.GAME_VERSION)
+    )
+    async with async_session() as session:
+        result = await session.execute(stmt)
+        rows = result.all()
+        stats = await asyncio.to_thread(compute_hero_stats, rows, settings.FIRST_PHASE_BANS)
+        await session.execute(delete(HeroStat).where(HeroStat.game_version_id >= settings.GAME_VERSION))
+        await bulk_upsert(session, HeroStat, stats, index_elements=HERO_STAT_KEY)
+        await session.commit()
+    return len(stats)
+
+
+@cached(picks_cache, tags=lambda type_, id_, version=None: [(type_, id_)])
+async def get_hero_stats(type_: str, id_: int, version: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Hero statistics of a league or team over the game versions shown on the site, most picked first."""
     try:
-        order = pb_data.get("order")
-        defaults = {
-            "match_id": match_id,
-            "order": order,
-            "is_pick": pb_data.get("isPick"),
-            "hero_id": pb_data.get("heroId"),
-            "banned_hero_id": pb_data.get("bannedHeroId"),
-            "is_radiant": pb_data.get("isRadiant"),
-            "player_index": pb_data.get("playerIndex"),
-            "was_banned_successfully": pb_data.get("wasBannedSuccessfully"),
-            "base_win_rate": pb_data.get("baseWinRate"),
-            "adjusted_win_rate": pb_data.get("adjustedWinRate"),
-            "pick_probability": pb_data.get("pickProbability"),
-            "is_captain": pb_data.get("isCaptain"),
-        }
+        scope_filter = and_(
+            HeroStat.scope_type == type_,
+            HeroStat.scope_id == id_,
+            HeroStat.game_version_id >= settings.GAME_VERSION,
+        )
+        matches_stmt = (
+            select(HeroStat.game_version_id, func.max(HeroStat.matches))
+            .filter(scope_filter)
+            .group_by(HeroStat.game_version_id)
+        )
+        heroes_stmt = (
+            select(HeroStat.hero_id, func.sum(HeroStat.picks), func.sum(HeroStat.wins), func.sum(HeroStat.bans),
+                   func.sum(HeroStat.first_phase_bans))
+            .filter(scope_filter)
+            .group_by(HeroStat.hero_id)
+            .order_by(desc(func.sum(HeroStat.picks)), desc(func.sum(HeroStat.bans)))
+        )
         async with async_session() as session:
-            await update_or_create(session, MatchPickBan, defaults, match_id=match_id, order=order)
+            result = await session.execute(matches_stmt)
+            matches = sum(count for _, count in result.all())
+            result = await session.execute(heroes_stmt)
+            heroes = result.all()
+
+        stats = []
+        for hero_id, picks, wins, bans, first_phase_bans in heroes:
+            hero_name, hero_image = get_hero_info(hero_id)
+            counts = {"matches": matches, "picks": picks, "wins": wins, "bans": bans,
+                      "first_phase_bans": first_phase_bans}
+            stats.append({"hero_id": hero_id, "name": hero_name, "image": hero_image, **counts,
+                          **hero_rates(**counts)})
+        return stats
     except Exception as e:
-        logger.error("Failed to save match pick ban: %s", e)
+        logger.error("get_hero_stats: %s", e)
+        return []
 
 
-async def save_match_player(player_data: Dict[str, Any]) -> None:
+# ------------
+def build_match_defaults(match_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': match_data.get('id'),
+        "did_radiant_win": match_data.get("didRadiantWin", None),
+        "duration_seconds": match_data.get("durationSeconds", None),
+        "start_date_time": match_data.get("startDateTime", None),
+        "tower_status_radiant": match_data.get("towerStatusRadiant", None),
+        "tower_status_dire": match_data.get("towerStatusDire", None),
+        "barracks_status_radiant": match_data.get(
+            "barracksStatusRadiant", None
+        ),
+        "barracks_status_dire": match_data.get("barracksStatusDire", None),
+        "cluster_id": match_data.get("clusterId", None),
+        "first_blood_time": match_data.get("firstBloodTime", None),
+        "lobby_type": match_data.get("lobbyType", None),
+        "num_human_players": match_data.get("numHumanPlayers", None),
+        "game_mode": match_data.get("gameMode", None),
+        "replay_salt": match_data.get("replaySalt", None),
+        "is_stats": match_data.get("isStats", None),
+        "tournament_id": match_data.get("tournamentId", None),
+        "tournament_round": match_data.get("tournamentRound", None),
+        "average_rank": match_data.get("averageRank", None),
+        "actual_rank": match_data.get("actualRank", None),
+        "average_imp": match_data.get("averageImp", None),
+        "parsed_date_time": match_data.get("parsedDateTime", None),
+        "stats_date_time": match_data.get("statsDateTime", None),
+        "league_id": match_data.get("leagueId", None),
+        "radiant_team_id": int_to_abs(match_data, 'radiantTeamId'),
+        "dire_team_id": int_to_abs(match_data, 'direTeamId'),
+        "series_id": match_data.get("seriesId", None),
+        "game_version_id": match_data.get("gameVersionId", None),
+        "region_id": match_data.get("regionId", None),
+        "sequence_num": match_data.get("sequenceNum", None),
+        "rank": match_data.get("rank", None),
+        "bracket": match_data.get("bracket", None),
+        "end_date_time": match_data.get("endDateTime", None),
+        "actual_rank_weight": match_data.get("actualRankWeight", None),
+        "analysis_outcome": match_data.get("analysisOutcome", None),
+        "predicted_outcome_weight": match_data.get(
+            "predictedOutcomeWeight", None
+        ),
+        "bottom_lane_outcome": match_data.get("bottomLaneOutcome", None),
+        "mid_lane_outcome": match_data.get("midLaneOutcome"),
+        "top_lane_outcome": match_data.get("topLaneOutcome"),
+        "radiant_networth_lead": match_data.get("radiantNetworthLead"),
+        "radiant_experience_lead": match_data.get("radiantExperienceLead"),
+        "radiant_kills": match_data.get("radiantKills"),
+        "dire_kills": match_data.get("direKills"),
+        "tower_status": match_data.get("towerStatus"),
+        "lane_report": match_data.get("laneReport"),
+        "win_rates": match_data.get("winRates"),
+        "predicted_win_rates": match_data.get("predictedWinRates"),
+        "tower_deaths": match_data.get("towerDeaths"),
+        "chat_events": match_data.get("chatEvents"),
+        "did_request_download": match_data.get("didRequestDownload"),
+        "game_result": match_data.get("gameResult"),
+    }
+
+
+async def save_match(match_data: Dict[str, Any]) -> Optional[int]:
+    """
+    Persist a match together with its League/Series/Team/player stubs,
+    pick/bans and match players in one transaction.
+    """
     try:
-        await save_player_instance(player_data.get("steamAccountId"))
-
-        defaults = {
-            "steam_account_id": player_data.get("steamAccountId"),
-            "hero_id": player_data.get("heroId"),
-            "is_radiant": player_data.get("isRadiant"),
-            "num_kills": player_data.get("numKills"),
-            "num_deaths": player_data.get("numDeaths"),
-            "num_assists": player_data.get("numAssists"),
-            "leaver_status": player_data.get("leaverStatus"),
-            "num_last_hits": player_data.get("numLastHits"),
-            "num_denies": player_data.get("numDenies"),
-            "gold_per_minute": player_data.get("goldPerMinute"),
-            "experience_per_minute": player_data.get("experiencePerMinute"),
-            "level": player_data.get("level"),
-            "gold": player_data.get("gold"),
-            "gold_spent": player_data.get("goldSpent"),
-            "hero_damage": player_data.get("heroDamage"),
-            "tower_damage": player_data.get("towerDamage"),
-            "party_id": player_data.get("partyId"),
-            "is_random": player_data.get("isRandom"),
-            "lane": player_data.get("lane"),
-            "streak_prediction": player_data.get("streakPrediction"),
-            "intentional_feeding": player_data.get("intentionalFeeding"),
-            "role": player_data.get("role"),
-            "imp": player_data.get("imp"),
-            "award": player_data.get("award"),
-            "item0_id": player_data.get("item0Id"),
-            "item1_id": player_data.get("item1Id"),
-            "item2_id": player_data.get("item2Id"),
-            "item3_id": player_data.get("item3Id"),
-            "item4_id": player_data.get("item4Id"),
-            "item5_id": player_data.get("item5Id"),
-            "backpack0_id": player_data.get("backpack0Id"),
-            "backpack1_id": player_data.get("backpack1Id"),
-            "backpack2_id": player_data.get("backpack2Id"),
-            "behavior": player_data.get("behavior"),
-            "hero_healing": player_data.get("heroHealing"),
-            "roam_lane": player_data.get("roamLane"),
-            "is_victory": player_data.get("isVictory"),
-            "networth": player_data.get("networth"),
-            "neutral0_id": player_data.get("neutral0Id"),
-            "dota_plus_hero_xp": player_data.get("dotaPlusHeroXp"),
-            "invisible_seconds": player_data.get("invisibleSeconds"),
-            "match_player_stats": player_data.get("matchPlayerStats"),
-            "is_dire": player_data.get("isDire"),
-            "role_basic": player_data.get("roleBasic"),
-            "position": player_data.get("position"),
-            "base_slot": player_data.get("baseSlot"),
-            "kda": player_data.get("kda"),
-            "map_location_home_fountain": player_data.get(
-                "mapLocationHomeFountain"
-            ),
-            "faction": player_data.get("faction"),
-            "calculate_imp_lane": player_data.get("calculateImpLane"),
-            "game_version_id": player_data.get("gameVersionId"),
-            "stats": player_data.get("stats"),
-            "playback_data": player_data.get("playbackData"),
-            "abilities": player_data.get("abilities")
-        }
+        match_id = match_data.get('id')
+        if not match_id:
+            return None
+
+        defaults = build_match_defaults(match_data)
+        players = match_data.get("players") or []
+        league_id = defaults["league_id"]
+        team_ids = sorted({defaults["radiant_team_id"], defaults["dire_team_id"]} - {None})
+
         async with async_session() as session:
-            match_player, _ = await update_or_create(
-                session,
-                MatchPlayer,
-                defaults,
-                match_id=player_data.get("matchId"),
-                player_slot=player_data.get("playerSlot")
+            old_match, old_pick_bans = await get_stored_pick_bans(session, match_id)
+            await ensure_exists(session, League, [{"id": league_id}])
+            await ensure_exists(session, Team, [{"id": team_id, "name": f"Team-{team_id}"} for team_id in team_ids])
+            await ensure_exists(session, Series, [{"id": defaults["series_id"], "league_id": league_id}])
+            await save_player_stubs(session, [player_data.get("steamAccountId") for player_data in players])
+            pick_ban_rows = [
+                build_match_pick_ban_defaults(pb_data, match_id) for pb_data in match_data.get("pickBans") or []
+            ]
+            changed_match = await bulk_upsert(session, Match, [defaults])
+            changed_pick_bans = await bulk_upsert(session, MatchPickBan, pick_ban_rows,
+                                                  index_elements=("match_id", "order"))
+            # unchanged rows mean the counters already include this match
+            if changed_match or changed_pick_bans:
+                await update_hero_pick_ban_stats(session, old_match, old_pick_bans, defaults, pick_ban_rows)
+            changed_players = await bulk_upsert(
+                session, MatchPlayer,
+                [build_match_player_defaults(player_data, match_id) for player_data in players],
+                index_elements=("match_id", "player_slot"),
             )
+            # scope charts read matches and pick/bans, player charts match players and the match filters
+            changed_scopes = match_picks_scopes(defaults) if changed_match or changed_pick_bans else []
+            if changed_match or changed_players:
+                changed_scopes += player_picks_scopes(players)
+            await bump_picks_scope_versions(session, changed_scopes)
+            await session.commit()
+        if changed_match or changed_pick_bans or changed_players:
+            invalidate_picks_cache(defaults, players)
+            invalidate_pages(("league", league_id), ("series", defaults["series_id"]),
+                             *[("team", team_id) for team_id in team_ids])
+        return match_id
     except Exception as e:
-        logger.error(f'An error occurred while save match player: {e}')
+        logger.error(f'An error occurred while saving Match: {e}')
         return None
+
+
+def build_match_pick_ban_defaults(pb_data: Dict[str, Any], match_id: int) -> Dict[str, Any]:
+    return {
+        "match_id": match_id,
+        "order": pb_data.get("order"),
+        "is_pick": pb_data.get("isPick"),
+        "hero_id": pb_data.get("heroId"),
+        "banned_hero_id": pb_data.get("bannedHeroId"),
+        "is_radiant": pb_data.get("isRadiant"),
+        "player_index": pb_data.get("playerIndex"),
+        "was_banned_successfully": pb_data.get("wasBannedSuccessfully"),
+        "base_win_rate": pb_data.get("baseWinRate"),
+        "adjusted_win_rate": pb_data.get("adjustedWinRate"),
+        "pick_probability": pb_data.get("pickProbability"),
+        "is_captain": pb_data.get("isCaptain"),
+    }
+
+
+def build_match_player_defaults(player_data: Dict[str, Any], match_id: int) -> Dict[str, Any]:
+    return {
+        "match_id": player_data.get("matchId") or match_id,
+        "player_slot": player_data.get("playerSlot"),
+        "steam_account_id": player_data.get("steamAccountId"),
+        "hero_id": player_data.get("heroId"),
+        "is_radiant": player_data.get("isRadiant"),
+        "num_kills": player_data.get("numKills"),
+        "num_deaths": player_data.get("numDeaths"),
+        "num_assists": player_data.get("numAssists"),
+        "leaver_status": player_data.get("leaverStatus"),
+        "num_last_hits": player_data.get("numLastHits"),
+        "num_denies": player_data.get("numDenies"),
+        "gold_per_minute": player_data.get("goldPerMinute"),
+        "experience_per_minute": player_data.get("experiencePerMinute"),
+        "level": player_data.get("level"),
+        "gold": player_data.get("gold"),
+        "gold_spent": player_data.get("goldSpent"),
+        "hero_damage": player_data.get("heroDamage"),
+        "tower_damage": player_data.get("towerDamage"),
+        "party_id": player_data.get("partyId"),
+        "is_random": player_data.get("isRandom"),
+        "lane": player_data.get("lane"),
+        "streak_prediction": player_data.get("streakPrediction"),
+        "intentional_feeding": player_data.get("intentionalFeeding"),
+        "role": player_data.get("role"),
+        "imp": player_data.get("imp"),
+        "award": player_data.get("award"),
+        "item0_id": player_data.get("item0Id"),
+        "item1_id": player_data.get("item1Id"),
+        "item2_id": player_data.get("item2Id"),
+        "item3_id": player_data.get("item3Id"),
+        "item4_id": player_data.get("item4Id"),
+        "item5_id": player_data.get("item5Id"),
+        "backpack0_id": player_data.get("backpack0Id"),
+        "backpack1_id": player_data.get("backpack1Id"),
+        "backpack2_id": player_data.get("backpack2Id"),
+        "behavior": player_data.get("behavior"),
+        "hero_healing": player_data.get("heroHealing"),
+        "roam_lane": player_data.get("roamLane"),
+        "is_victory": player_data.get("isVictory"),
+        "networth": player_data.get("networth"),
+        "neutral0_id": player_data.get("neutral0Id"),
+        "dota_plus_hero_xp": player_data.get("dotaPlusHeroXp"),
+        "invisible_seconds": player_data.get("invisibleSeconds"),
+        "match_player_stats": player_data.get("matchPlayerStats"),
+        "is_dire": player_data.get("isDire"),
+        "role_basic": player_data.get("roleBasic"),
+        "position": player_data.get("position"),
+        "base_slot": player_data.get("baseSlot"),
+        "kda": player_data.get("kda"),
+        "map_location_home_fountain": player_data.get(
+            "mapLocationHomeFountain"
+        ),
+        "faction": player_data.get("faction"),
+        "calculate_imp_lane": player_data.get("calculateImpLane"),
+        "game_version_id": player_data.get("gameVersionId"),
+        "stats": player_data.get("stats"),
+        "playback_data": player_data.get("playbackData"),
+        "abilities": player_data.get("abilities")
+    }
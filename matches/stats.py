@@ -0,0 +1,111 @@
+import math
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+# rows loaded by matches.services.refresh_hero_stats, in this column order
+STAT_COLUMNS = (
+    "match_id", "league_id", "radiant_team_id", "dire_team_id", "game_version_id",
+    "did_radiant_win", "is_radiant", "hero_id", "is_pick", "order",
+)
+WILSON_Z = 1.96
+
+
+def wilson_interval(wins: float, games: float, z: float = WILSON_Z) -> tuple:
+    """95% Wilson score interval of a win rate; (0, 0) without games."""
+    if games <= 0:
+        return 0.0, 0.0
+    rate = wins / games
+    denominator = 1 + z * z / games
+    center = (rate + z * z / (2 * games)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def hero_rates(matches: int, picks: int, wins: int, bans: int, first_phase_bans: int) -> Dict[str, float]:
+    """Rates shown for one hero, from the raw counts of its scope."""
+    win_rate_low, win_rate_high = wilson_interval(wins, picks)
+    return {
+        "pick_rate": picks / matches if matches else 0.0,
+        "ban_rate": bans / matches if matches else 0.0,
+        "first_phase_ban_rate": first_phase_bans / matches if matches else 0.0,
+        "win_rate": wins / picks if picks else 0.0,
+        "win_rate_low": win_rate_low,
+        "win_rate_high": win_rate_high,
+    }
+
+
+def compute_hero_stats(rows: Sequence[Sequence[Any]], first_phase_bans: int) -> List[Dict[str, Any]]:
+    """
+    Per-hero counts and rates for the 'all', 'league' and 'team' scopes of
+    every game version, in one vectorized pass per scope.
+
+    Team scopes only count the pick/bans made by that team, and a team's
+    matches are those in which it made at least one.
+
+    Args:
+        rows: Pick/ban rows with the columns of ``STAT_COLUMNS``; nulls as None.
+        first_phase_bans (int): Bans with a smaller ``order`` are first-phase bans.
+
+    Returns:
+        List[Dict[str, Any]]: HeroStat column values.
+    """
+    if not rows:
+        return []
+    data = np.array([[-1 if value is None else int(value) for value in row] for row in rows], dtype=np.int64)
+    columns = dict(zip(STAT_COLUMNS, data.T))
+    valid = (
+        (columns["game_version_id"] >= 0) & (columns["did_radiant_win"] >= 0) & (columns["is_radiant"] >= 0)
+        & (columns["hero_id"] >= 0) & (columns["is_pick"] >= 0)
+    )
+    is_radiant = columns["is_radiant"] == 1
+    is_pick = columns["is_pick"] == 1
+    won = (columns["did_radiant_win"] == 1) == is_radiant
+    first_phase = ~is_pick & (columns["order"] >= 0) & (columns["order"] < first_phase_bans)
+
+    scopes = {
+        "all": np.zeros(len(data), dtype=np.int64),
+        "league": columns["league_id"],
+        "team": np.where(is_radiant, columns["radiant_team_id"], columns["dire_team_id"]),
+    }
+    stats = []
+    for scope_type, scope_ids in scopes.items():
+        selected = valid & (scope_ids >= 0)
+        if not selected.any():
+            continue
+        scope_ids = scope_ids[selected]
+        game_versions = columns["game_version_id"][selected]
+
+        # matches per (scope, game version)
+        scope_matches = np.unique(np.stack([scope_ids, game_versions, columns["match_id"][selected]], axis=1), axis=0)
+        scope_keys, match_counts = np.unique(scope_matches[:, :2], axis=0, return_counts=True)
+        match_count_by_scope = {(int(key[0]), int(key[1])): int(count) for key, count in zip(scope_keys, match_counts)}
+
+        # pick/ban counts per (scope, game version, hero)
+        keys, inverse = np.unique(
+            np.stack([scope_ids, game_versions, columns["hero_id"][selected]], axis=1), axis=0, return_inverse=True
+        )
+        inverse = inverse.reshape(-1)
+        picked, banned = is_pick[selected], ~is_pick[selected]
+        picks = np.bincount(inverse, weights=picked, minlength=len(keys))
+        wins = np.bincount(inverse, weights=picked & won[selected], minlength=len(keys))
+        bans = np.bincount(inverse, weights=banned, minlength=len(keys))
+        early_bans = np.bincount(inverse, weights=first_phase[selected], minlength=len(keys))
+
+        for index, (scope_id, game_version_id, hero_id) in enumerate(keys.tolist()):
+            counts = {
+                "matches": match_count_by_scope[(scope_id, game_version_id)],
+                "picks": int(picks[index]),
+                "wins": int(wins[index]),
+                "bans": int(bans[index]),
+                "first_phase_bans": int(early_bans[index]),
+            }
+            stats.append({
+                "scope_type": scope_type,
+                "scope_id": scope_id,
+                "game_version_id": game_version_id,
+                "hero_id": hero_id,
+                **counts,
+                **hero_rates(**counts),
+            })
+    return stats
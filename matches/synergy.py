@@ -0,0 +1,91 @@
+from typing import Any, Dict, List
+
+import numpy as np
+
+from common.constants import HEROES
+
+# (match, side) groups multiplied at once; bounds the dense group x hero matrix to a few MB
+GROUP_CHUNK = 16384
+
+
+def co_occurrence_links(
+        group_ids: np.ndarray,
+        hero_ids: np.ndarray,
+        group_wins: np.ndarray,
+        top_n: int,
+        min_count: int = 1,
+) -> List[Dict[str, Any]]:
+    """
+    Hero pairs picked (or banned) together by the same side of a match.
+
+    Every (match, side) group becomes a row of a 0/1 group x hero matrix X;
+    X.T @ X counts how often each pair shares a group and the same product
+    over won groups counts their wins. Its diagonal holds the per-hero totals.
+
+    Args:
+        group_ids (np.ndarray): Group index (0..n-1) of each pick/ban row.
+        hero_ids (np.ndarray): Hero id of each row.
+        group_wins (np.ndarray): Whether each group's side won, indexed by group.
+        top_n (int): Number of links returned, most frequent pairs first.
+        min_count (int): Pairs seen fewer times are dropped.
+
+    Returns:
+        List[Dict[str, Any]]: D3 links: source/target hero ids, value (games together),
+        win_rate of the pair and win_rate_delta against the mean of both heroes' win rates.
+    """
+    if len(hero_ids) == 0:
+        return []
+    size = max(max(HEROES), int(hero_ids.max())) + 1
+    group_count = len(group_wins)
+    counts = np.zeros((size, size), dtype=np.float64)
+    wins = np.zeros((size, size), dtype=np.float64)
+    for start in range(0, group_count, GROUP_CHUNK):
+        stop = min(start + GROUP_CHUNK, group_count)
+        rows = (group_ids >= start) & (group_ids < stop)
+        matrix = np.zeros((stop - start, size), dtype=np.float32)
+        matrix[group_ids[rows] - start, hero_ids[rows]] = 1
+        won = matrix[group_wins[start:stop]]
+        counts += matrix.T @ matrix
+        wins += won.T @ won
+
+    hero_games = np.diag(counts)
+    hero_win_rates = np.divide(np.diag(wins), hero_games, out=np.zeros(size), where=hero_games > 0)
+    source, target = np.triu_indices(size, k=1)
+    pair_counts = counts[source, target]
+    keep = pair_counts >= max(min_count, 1)
+    source, target, pair_counts = source[keep], target[keep], pair_counts[keep]
+    pair_win_rates = wins[source, target] / pair_counts
+    deltas = pair_win_rates - (hero_win_rates[source] + hero_win_rates[target]) / 2
+
+    order = np.lexsort((-np.abs(deltas), -pair_counts))[:top_n]
+    return [
+        {
+            "source": int(source[i]),
+            "target": int(target[i]),
+            "value": int(pair_counts[i]),
+            "win_rate": round(float(pair_win_rates[i]), 4),
+            "win_rate_delta": round(float(deltas[i]), 4),
+        }
+        for i in order
+    ]
+
+
+def pick_ban_links(rows: List[Any], top_n: int, min_count: int) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Split (match_id, is_radiant, hero_id, is_pick, did_radiant_win) rows into
+    picks and bans and compute the links of each in one vectorized pass.
+    """
+    links = {"links_picks": [], "links_bans": []}
+    if not rows:
+        return links
+    data = np.array(rows, dtype=np.int64)
+    match_ids, is_radiant, hero_ids, is_pick, radiant_won = data.T
+    # one group per side of a match
+    group_keys = match_ids * 2 + is_radiant
+    for key, selected in (("links_picks", is_pick == 1), ("links_bans", is_pick == 0)):
+        if not selected.any():
+            continue
+        unique_keys, group_ids = np.unique(group_keys[selected], return_inverse=True)
+        group_wins = (unique_keys % 2) == radiant_won[selected][np.unique(group_ids, return_index=True)[1]]
+        links[key] = co_occurrence_links(group_ids, hero_ids[selected], group_wins, top_n, min_count)
+    return links
@@ -1,15 +1,19 @@
-from robyn import SubRouter, Request, logger
-from sqlalchemy import or_, select
-from sqlalchemy.orm import selectinload
+from robyn import SubRouter, Request, Response, Headers, logger, jsonify
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload, load_only, undefer_group
 
 from account.token import check_headers_valid_email
-from common.execute import active_random
-from common.utils import redirect_response
-from config.db import async_session
+from common.conditional import make_etag, validator_headers, is_not_modified, not_modified_response
+from common.pagination import get_cursor, keyset_page, split_page
+from common.utils import redirect_response, parse_int
+from config.db import async_session, JSON_GROUP
 from config.settings import settings
 from config.settings import templates
-from matches.models import Match
-from matches.services import get_hero_counts_picks_bans, get_hero_counts_picks_for_player
+from matches.models import Match, MATCH_LIST_COLUMNS
+from matches.services import (
+    get_hero_counts_picks_bans, get_hero_counts_picks_for_player, get_picks_updated_at, MATCH_FILTERS,
+)
+from teams.models import TEAM_LIST_COLUMNS
 
 match = SubRouter(__name__, prefix="/match")
 
@@ -23,23 +27,25 @@ async def index():
 async def get_team_list(request: Request):
     try:
         auth = await check_headers_valid_email(request)
+        cursor = get_cursor(request)
         matches_stmt = (
             select(Match)
             .filter(Match.deleted_at.is_(None))
             .filter(Match.game_version_id >= settings.GAME_VERSION)
-            .order_by(Match.id.desc())
             .options(
-                selectinload(Match.radiant_team),
-                selectinload(Match.dire_team),
+                load_only(*MATCH_LIST_COLUMNS),
+                selectinload(Match.radiant_team).load_only(*TEAM_LIST_COLUMNS),
+                selectinload(Match.dire_team).load_only(*TEAM_LIST_COLUMNS),
                 selectinload(Match.pick_bans)
             )
-            .limit(50)
         )
+        matches_stmt = keyset_page(matches_stmt, Match.id, Match.id, cursor, limit=50)
         async with async_session() as session:
             result = await session.execute(matches_stmt)
-            matches = result.scalars().all()
+            matches, next_cursor = split_page(result.scalars().all(), "id", limit=50)
         template = "/matches/list.html"
-        context = {"request": request, "matches": matches, "auth": auth, "user": {}}
+        context = {"request": request, "matches": matches, "cursor": cursor, "next_cursor": next_cursor,
+                   "auth": auth, "user": {}}
         template = templates.render_template(template, **context)
         return template
     except Exception as e:
@@ -50,11 +56,23 @@ async def get_team_list(request: Request):
 @match.get("/:match_id")
 async def get_team(request: Request):
     match_id = int(request.path_params.get("match_id"))
+    stmt = (
+        select(Match)
+        .filter(Match.deleted_at.is_(None), Match.id == match_id)
+        .options(undefer_group(JSON_GROUP))
+    )
     async with async_session() as session:
-        instance = await active_random(session, Match, id=match_id)
+        result = await session.execute(stmt)
+        instance = result.scalars().all()
         if not instance:
             return {"NoResultFound match": match_id}
-        return repr(instance)
+        # the JSON dump is the expensive part here, the row is fetched by primary key anyway
+        updated_at = max(obj.updated_at for obj in instance)
+        etag = make_etag("match", match_id, updated_at)
+        headers = validator_headers(etag, updated_at)
+        if is_not_modified(request, etag, updated_at):
+            return not_modified_response(headers)
+        return Response(status_code=200, description=repr(instance), headers=Headers(headers))
 
 
 @match.get("/picks")
@@ -63,29 +81,32 @@ async def get_picks(request: Request):
         query_data = request.query_params.to_dict()
         type_obj = query_data.get('type_obj')
         id_obj = query_data.get('id_obj')
-        league_id = query_data.get('league_id')
-        team_id = query_data.get('team_id')
-        start_date_time = query_data.get('start_date_time')
-        duration_seconds = query_data.get('duration_seconds')
 
         if not type_obj or not id_obj:
             return {"data": {'error': "Missing type_obj or id_obj parameter"}}
 
         filters = []
-        if league_id:
-            filters.append(Match.league_id == league_id)
-        if team_id:
-            filters.append(or_(Match.radiant_team_id == team_id, Match.dire_team_id == team_id))
-        if start_date_time:
-            filters.append(Match.start_date_time >= start_date_time)
-        if duration_seconds:
-            filters.append(Match.duration_seconds >= duration_seconds)
+        for name in MATCH_FILTERS:
+            values = query_data.get(name)
+            value = await parse_int(values[0]) if values else None
+            if value is not None:
+                filters.append((name, value))
 
-        if type_obj[0] == 'player':
-            data = await get_hero_counts_picks_for_player(int(id_obj[0]))
+        type_, id_, filters = type_obj[0], int(id_obj[0]), tuple(filters)
+        updated_at = await get_picks_updated_at(type_, id_)
+        etag = make_etag("picks", type_, id_, filters, updated_at)
+        headers = validator_headers(etag, updated_at)
+        if is_not_modified(request, etag, updated_at):
+            return not_modified_response(headers)
+
+        if type_ == 'player':
+            data = await get_hero_counts_picks_for_player(id_, filters, version=updated_at)
         else:
-            data = await get_hero_counts_picks_bans(type_obj[0], int(id_obj[0]))
+            data = await get_hero_counts_picks_bans(type_, id_, filters, version=updated_at)
 
-        return data
+        if not data:
+            return data
+        return Response(status_code=200, description=jsonify(data),
+                        headers=Headers({"Content-Type": "application/json", **headers}))
     except Exception as e:
         return {"data": {'error': str(e)}}
@@ -4,7 +4,7 @@ from sqlalchemy import ForeignKey, BigInteger, Index, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship, class_mapper
 
 from common.utils import unix_to_string, convert_to_datetime
-from config.db import Base, a_id, a_char, a_str, a_int, a_bool, a_big_int, a_json
+from config.db import Base, a_id, a_char, a_str, a_int, a_bool, a_big_int, a_json, FingerprintMixin
 
 
 class BattlePass(Base):
@@ -57,7 +57,7 @@ class Name(Base):
         return f"{self.name}  / last at {unix_to_string(self.last_seen_date_time)}"
 
 
-class ProSteamAccount(Base):
+class ProSteamAccount(FingerprintMixin, Base):
     __tablename__ = 'pro_steam_accounts'
 
     id: Mapped[a_id]
@@ -98,7 +98,7 @@ class ProSteamAccount(Base):
         return f"/steam/{self.id}/"
 
 
-class SteamAccount(Base):
+class SteamAccount(FingerprintMixin, Base):
     __tablename__ = 'steam_accounts'
 
     id: Mapped[a_id]
@@ -151,7 +151,7 @@ class SteamAccount(Base):
         return unix_to_string(self.last_match_date_time)
 
 
-class Player(Base):
+class Player(FingerprintMixin, Base):
     __tablename__ = 'players'
 
     id: Mapped[a_id]
@@ -175,6 +175,8 @@ class Player(Base):
     __table_args__ = (
         Index('ix_players_team_id', 'team_id'),
         Index('ix_players_steam_account_id', 'steam_account_id'),
+        Index('ix_players_last_match_date_id', 'last_match_date', 'id',
+              postgresql_ops={'last_match_date': 'DESC NULLS LAST', 'id': 'DESC'}),
     )
 
     # def __str__(self):
@@ -188,3 +190,10 @@ class Player(Base):
 
     def get_verbose_first_match_date(self):
         return unix_to_string(self.first_match_date)
+
+
+# columns rendered by the player list
+PLAYER_LIST_COLUMNS = (
+    Player.id, Player.match_count, Player.win_count, Player.last_match_date, Player.steam_account_id,
+    Player.updated_at,
+)
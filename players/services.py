@@ -1,42 +1,60 @@
-from typing import Dict, Any, Optional
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterable
 
 from robyn import logger
+from sqlalchemy import select, func, update
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from common.execute import update_or_create, get_or_create
+from common.conditional import max_updated_at
+from common.execute import update_or_create, ensure_exists, get_from
+from common.pages import invalidate_pages
 from common.urls import get_url_player, get_url_pro_steam_acc
-from common.utils import fetch_data, process_related_data, save_data_if_exists
+from common.utils import fetch_required, process_related_data, save_data_if_exists
 from config.db import Base, async_session
 from players.models import ProSteamAccount, SteamAccount, Player, Badge, Rank, Name, BattlePass
 from teams.models import TeamMember, Team
 
 
-async def save_player_instance(player_id: int) -> Optional[Player]:
-    try:
-        async with async_session() as session:
-            pro_steam_account = await get_or_create(session, ProSteamAccount, id=player_id)
-            if not pro_steam_account:
-                pro_steam_account = ProSteamAccount(id=player_id)
-                session.add(pro_steam_account)
+async def save_player_stubs(session: AsyncSession, player_ids: Iterable[Optional[int]]) -> None:
+    """
+    Insert bare ProSteamAccount/SteamAccount/Player rows for the given ids
+    when they are missing. Runs inside the caller's transaction.
+    """
+    player_ids = sorted(set(player_ids) - {None})
+    await ensure_exists(session, ProSteamAccount, [{"id": player_id} for player_id in player_ids])
+    await ensure_exists(session, SteamAccount,
+                        [{"id": player_id, "pro_steam_account_id": player_id} for player_id in player_ids])
+    await ensure_exists(session, Player, [{"id": player_id, "steam_account_id": player_id} for player_id in player_ids])
 
-            steam_account = await get_or_create(session, SteamAccount, id=player_id)
-            if not steam_account:
-                steam_account = SteamAccount(id=player_id)
-                steam_account.pro_steam_account_id = player_id
-                session.add(steam_account)
 
-            player = await get_or_create(session, Player, id=player_id)
-            if not player:
-                player = Player(id=player_id)
-                player.steam_account_id = player_id
-                session.add(player)
+async def get_player_updated_at(player_id: int) -> Optional[datetime]:
+    """Latest change to anything the player detail page shows."""
+    player_team = select(Player.team_id).filter(Player.id == player_id).scalar_subquery()
+    subqueries = [
+        select(func.max(model.updated_at)).filter(model.player_id == player_id).scalar_subquery()
+        for model in (Badge, Rank, Name, BattlePass)
+    ]
+    return await max_updated_at(
+        select(func.max(Player.updated_at)).filter(Player.id == player_id).scalar_subquery(),
+        select(func.max(SteamAccount.updated_at)).filter(SteamAccount.id == player_id).scalar_subquery(),
+        select(func.max(ProSteamAccount.updated_at)).filter(ProSteamAccount.id == player_id).scalar_subquery(),
+        select(func.max(TeamMember.updated_at)).filter(TeamMember.uuid == player_team).scalar_subquery(),
+        select(func.max(Team.updated_at)).join(TeamMember, TeamMember.team_id == Team.id)
+        .filter(TeamMember.uuid == player_team).scalar_subquery(),
+        *subqueries,
+    )
 
+
+async def save_player_instance(player_id: int) -> Optional[Player]:
+    try:
+        async with async_session() as session:
+            await save_player_stubs(session, [player_id])
             await session.commit()
-            return player
+            return await get_from(session, Player, Player.id, player_id)
 
     except SQLAlchemyError as e:
         logger.error("Failed to save player instance: %s", e)
-        await session.rollback()
         return None
 
 
@@ -123,7 +141,7 @@ async def save_steam_acc(steam_data: Dict[str, Any]) -> Optional[Base]:
 
 async def get_and_save_player(player_id: int):
     try:
-        player_data = await fetch_data(get_url_player(player_id), dict)
+        player_data = await fetch_required(get_url_player(player_id), dict)
         if not player_data:
             return
         player_id = player_data.get("steamAccountId")
@@ -141,9 +159,11 @@ async def get_and_save_player(player_id: int):
             await process_related_data(player_data, "ranks", save_player_rank, player_id)
             await process_related_data(player_data, "battlePass", save_player_battle_pass, player_id)
             await process_related_data(player_data, "names", save_player_names, player_id)
+        invalidate_pages(("player", player_id))
         return
     except Exception as e:
         logger.error(f"get_and_save_player: An error occurred: {e}")
+        raise
 
 
 async def save_player(player_data: Dict[str, Any]) -> Optional[Base]:
@@ -248,13 +268,14 @@ async def save_player_team_member(team_data: Dict[str, Any], player_id: int) ->
                 "last_match_id": team_data.get("lastMatchId"),
                 "last_match_date_time": team_data.get("lastMatchDateTime"),
             }
-            team, _ = await get_or_create(session, Team, {}, id=team_id)
+            await ensure_exists(session, Team, [{"id": team_id}])
             team_member, _ = await update_or_create(
                 session, TeamMember, defaults_member,
                 steam_account_id=player_id,
                 team_id=team_id
             )
-        await update_or_create(session, Player, {"team": team_member}, id=player_id)
+            await update_or_create(session, Player, {"team": team_member}, id=player_id)
+        invalidate_pages(("team", team_id))
         return team_member
     except Exception as e:
         logger.error(f"Failed to save player team member: {e}")
@@ -263,12 +284,19 @@ async def save_player_team_member(team_data: Dict[str, Any], player_id: int) ->
 
 async def get_and_save_pro_players():
     try:
-        players = await fetch_data(get_url_pro_steam_acc(), dict)
+        players = await fetch_required(get_url_pro_steam_acc(), dict)
         for player_id, player_data in players.items():
             await save_player_instance(int(player_id))
-            await save_steam_acc(
-                {"id": int(player_id), "real_name": player_data.get('realName'), "name": player_data.get('name')})
+            # only name accounts the player endpoint has not filled in yet, never overwrite them
+            async with async_session() as session:
+                await session.execute(
+                    update(SteamAccount)
+                    .where(SteamAccount.id == int(player_id), SteamAccount.name.is_(None))
+                    .values(real_name=player_data.get('realName'), name=player_data.get('name'))
+                )
+                await session.commit()
             await save_pro_steam_acc(player_data)
         logger.info(f"players count:{len(players)}")
     except Exception as e:
         logger.error(f"get_and_save_pro_players: An error occurred: {e}")
+        raise
@@ -1,16 +1,22 @@
-import asyncio
+from datetime import datetime
+from typing import Optional
 
 from robyn import SubRouter, Request, logger, jsonify
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, load_only
 
 from account.token import auth_required, check_headers_valid_email
+from common.cache import cached
+from common.conditional import make_etag, validator_headers, is_not_modified, not_modified_response
+from common.pages import page_cache, render_html, html_response
+from common.pagination import get_cursor, fetch_keyset_page
 from common.utils import parse_int, redirect_response, not_found_response
 from config.db import async_session
 from config.settings import templates
+from jobs.services import enqueue_job
 from players.executes import execute_player
-from players.models import Player, SteamAccount
-from players.services import get_and_save_player, get_and_save_pro_players
+from players.services import get_player_updated_at
+from players.models import Player, SteamAccount, PLAYER_LIST_COLUMNS
 
 player = SubRouter(__name__, prefix="/player")
 
@@ -23,22 +29,23 @@ async def index():
 @player.get("/list")
 async def get_players_list(request: Request):
     auth = await check_headers_valid_email(request)
+    cursor = get_cursor(request)
     stmt = (
         select(Player)
         .filter(Player.deleted_at.is_(None))
-        .order_by(Player.last_match_date.desc())
         .options(
+            load_only(*PLAYER_LIST_COLUMNS),
             selectinload(Player.steam_account)
             .options(
                 selectinload(SteamAccount.pro_steam_account)
             ))
-        .limit(50)
     )
     async with async_session() as session:
-        result = await session.execute(stmt)
-        players = result.scalars().all()
+        players, next_cursor = await fetch_keyset_page(session, stmt, Player.last_match_date, Player.id, cursor,
+                                                       "last_match_date", limit=50)
     template = "/players/list.html"
-    context = {"request": request, "players": players, "auth": auth, "user": {}}
+    context = {"request": request, "players": players, "cursor": cursor, "next_cursor": next_cursor,
+               "auth": auth, "user": {}}
     template = templates.render_template(template, **context)
     return template
 
@@ -47,25 +54,37 @@ async def get_players_list(request: Request):
 @auth_required()
 async def update_players(request: Request):
     try:
-        asyncio.ensure_future(get_and_save_pro_players())
+        await enqueue_job("pro_players")
         return redirect_response('/player/list')
     except Exception as e:
         logger.error(f"update_players: {e}")
         return jsonify("Failed update players list: %s", e)
 
 
+@cached(page_cache, tags=lambda player_id, auth, version: [("player", player_id)])
+async def render_player_page(player_id: int, auth: bool, version: Optional[datetime]) -> Optional[str]:
+    player_ = await execute_player(player_id)
+    if not player_:
+        return None
+    return render_html("/players/detail.html", player=player_, auth=auth, user={})
+
+
 @player.get("/:player_id")
 async def get_player(request: Request):
     auth = await check_headers_valid_email(request)
     player_id = await parse_int(request.path_params["player_id"])
     if player_id is None:
         return not_found_response(request, 'player', player_id)
-    player_ = await execute_player(player_id)
+    updated_at = await get_player_updated_at(player_id)
+    etag = make_etag("player", player_id, bool(auth), updated_at)
+    headers = validator_headers(etag, updated_at)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified_response(headers)
 
-    template = "/players/detail.html"
-    context = {"request": request, "player": player_, "auth": auth, "user": {}}
-    template = templates.render_template(template, **context)
-    return template
+    body = await render_player_page(player_id, bool(auth), updated_at)
+    if body is None:
+        return not_found_response(request, 'player', player_id)
+    return html_response(body, headers=headers)
 
 
 @player.post("/:player_id/u")
@@ -73,7 +92,9 @@ async def get_player(request: Request):
 async def update_player(request):
     try:
         player_id = await parse_int(request.path_params.get("player_id"))
-        asyncio.ensure_future(get_and_save_player(player_id))
+        if player_id is None:
+            return redirect_response('/player/list')
+        await enqueue_job("player", player_id)
         return redirect_response(f'/player/{player_id}')
     except Exception as e:
         logger.error(f"e_player: {e}")
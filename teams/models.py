@@ -2,10 +2,10 @@ from sqlalchemy import Index, BigInteger, ForeignKey
 from sqlalchemy.orm import Mapped, relationship, mapped_column
 
 from common.utils import unix_to_datetime, get_delta_time, convert_to_datetime
-from config.db import a_id, a_small_int, a_big_int, a_str, a_bool, Base, a_char
+from config.db import a_id, a_small_int, a_big_int, a_str, a_bool, Base, a_char, FingerprintMixin
 
 
-class Team(Base):
+class Team(FingerprintMixin, Base):
     __tablename__ = 'teams'
 
     id: Mapped[a_id]
@@ -30,6 +30,7 @@ class Team(Base):
 
     __table_args__ = (
         Index('ix_teams_name', 'name'),
+        Index('ix_teams_rank_id', 'rank', 'id'),
     )
 
     def __str__(self):
@@ -47,6 +48,13 @@ class Team(Base):
     #     return self.members.active().order_by('-last_match_id')
 
 
+# columns rendered by the team list, league team cards and match tables
+TEAM_LIST_COLUMNS = (
+    Team.id, Team.name, Team.tag, Team.logo, Team.url, Team.rank, Team.win_count, Team.loss_count,
+    Team.last_match_date_time, Team.updated_at,
+)
+
+
 class TeamMember(Base):
     __tablename__ = 'team_members'
 
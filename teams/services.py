@@ -1,14 +1,19 @@
+from datetime import datetime
 from typing import Optional, Dict, Any
 
 from robyn import logger
-from sqlalchemy import select
+from sqlalchemy import select, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from common.execute import update_or_create, get_or_create
+from common.conditional import max_updated_at
+from common.execute import update_or_create, ensure_exists
+from common.pages import invalidate_pages
 from common.urls import get_od_url_team_list, get_url_team, get_url_team_matches
-from common.utils import fetch_data, process_related_data, save_data_if_exists
+from common.utils import fetch_required, process_related_data, save_data_if_exists
 from config.db import async_session, Base
+from leagues.models import League, Series
+from matches.models import HeroStat
 from matches.services import save_match
 from players.models import SteamAccount, Player
 from players.services import save_player_instance, save_pro_steam_acc, save_steam_acc
@@ -18,10 +23,11 @@ from teams.models import Team, TeamMember
 # teams
 async def get_and_save_teams():
     try:
-        response = await fetch_data(get_od_url_team_list(), dict)
+        response = await fetch_required(get_od_url_team_list(), dict)
         await process_related_data(response, "rows", process_save_team)
     except Exception as e:
         logger.error(f"get_and_save_teams: An error occurred: {e}")
+        raise
 
 
 async def process_save_team(team_data: Dict[str, Any]) -> None:
@@ -49,18 +55,19 @@ async def process_save_team(team_data: Dict[str, Any]) -> None:
 
 async def get_and_save_team(team_id: int):
     try:
-        team_data = await fetch_data(get_url_team(team_id), dict)
+        team_data = await fetch_required(get_url_team(team_id), dict)
         if not team_data:
             return
         await save_team(team_data)
         await process_related_data(team_data, 'members', process_save_member_data)
         await update_players_team_membership(team_id)
-        team_matches = await fetch_data(get_url_team_matches(team_id), list)
+        team_matches = await fetch_required(get_url_team_matches(team_id), list)
         if not team_matches:
             return
         await process_related_data({"matches": team_matches}, "matches", save_match)
     except Exception as e:
         logger.error(f"get_and_save_team: An error occurred: {e}")
+        raise
 
 
 async def process_save_member_data(member_data: Dict[str, Any]) -> None:
@@ -94,6 +101,7 @@ async def save_team(team_data: Dict[str, Any]) -> Optional[Base]:
         }
         async with async_session() as session:
             team, _ = await update_or_create(session, Team, defaults, id=team_id)
+        invalidate_pages(("team", team_id))
         return team
     except Exception as e:
         session.rollback()
@@ -105,11 +113,11 @@ async def save_team_member(member_data: Dict[str, Any], steam_account_id: int) -
     try:
         async with async_session() as session:
             team_id = member_data.get("teamId")
-            team, _ = await get_or_create(session, Team, {}, id=team_id)
-            steam_acc, _ = await get_or_create(session, SteamAccount, {}, id=steam_account_id)
+            await ensure_exists(session, Team, [{"id": team_id}])
+            await ensure_exists(session, SteamAccount, [{"id": steam_account_id}])
             defaults_member = {
-                "team": team,
-                "steam_account": steam_acc,
+                "team_id": team_id,
+                "steam_account_id": steam_account_id,
                 "first_match_id": member_data.get("firstMatchId"),
                 "first_match_date_time": member_data.get("firstMatchDateTime"),
                 "last_match_id": member_data.get("lastMatchId"),
@@ -117,8 +125,9 @@ async def save_team_member(member_data: Dict[str, Any], steam_account_id: int) -
             }
             team_member, _ = await update_or_create(session, TeamMember, defaults_member,
                                                     steam_account_id=steam_account_id,
-                                                    team_id=member_data.get("teamId")
+                                                    team_id=team_id
                                                     )
+        invalidate_pages(("team", team_id), ("player", steam_account_id))
         return team_member
     except Exception as e:
         await session.rollback()
@@ -141,6 +150,21 @@ async def get_team_from_id(session: AsyncSession, team_id: int):
         return None
 
 
+async def get_team_updated_at(team_id: int) -> Optional[datetime]:
+    """Latest change to anything the team detail page shows."""
+    team_series = or_(Series.team_one_id == team_id, Series.team_two_id == team_id)
+    return await max_updated_at(
+        select(func.max(Team.updated_at)).filter(Team.id == team_id).scalar_subquery(),
+        select(func.max(TeamMember.updated_at)).filter(TeamMember.team_id == team_id).scalar_subquery(),
+        select(func.max(SteamAccount.updated_at)).join(TeamMember, TeamMember.steam_account_id == SteamAccount.id)
+        .filter(TeamMember.team_id == team_id).scalar_subquery(),
+        select(func.max(League.updated_at)).join(Series, Series.league_id == League.id)
+        .filter(team_series).scalar_subquery(),
+        select(func.max(HeroStat.updated_at))
+        .filter(HeroStat.scope_type == 'team', HeroStat.scope_id == team_id).scalar_subquery(),
+    )
+
+
 async def get_team_members(session: AsyncSession, team_id: int):
     try:
         stmt = (
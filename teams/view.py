@@ -1,15 +1,23 @@
-import asyncio
+from datetime import datetime
+from typing import Optional
 
 from robyn import SubRouter, Request, jsonify, logger
 from sqlalchemy import select
+from sqlalchemy.orm import load_only
 
 from account.token import check_headers_valid_email, auth_required
+from common.cache import cached
+from common.conditional import make_etag, validator_headers, is_not_modified, not_modified_response
+from common.pages import page_cache, render_html, html_response
+from common.pagination import get_cursor, keyset_page, split_page
 from common.utils import redirect_response, parse_int, not_found_response
 from config.db import async_session
 from config.settings import templates
+from jobs.services import enqueue_job
 from leagues.services import get_leagues_for_team
-from teams.models import Team
-from teams.services import get_and_save_teams, get_team_from_id, get_and_save_team, get_team_members
+from matches.services import get_hero_stats
+from teams.models import Team, TEAM_LIST_COLUMNS
+from teams.services import get_team_from_id, get_team_members, get_team_updated_at
 
 team = SubRouter(__name__, prefix="/team")
 
@@ -23,18 +31,20 @@ async def index():
 async def get_team_list(request: Request):
     try:
         auth = await check_headers_valid_email(request)
+        cursor = get_cursor(request)
         async with async_session() as session:
             stmt = (
                 select(Team)
                 .filter(Team.deleted_at.is_(None))
                 .filter(Team.rank.is_not(None))
-                .order_by(Team.rank.desc())
-                .limit(30)
+                .options(load_only(*TEAM_LIST_COLUMNS))
             )
+            stmt = keyset_page(stmt, Team.rank, Team.id, cursor, limit=30, nullable=False)
             result = await session.execute(stmt)
-            teams = result.scalars().all()
+            teams, next_cursor = split_page(result.scalars().all(), "rank", limit=30)
         template = "/teams/list.html"
-        context = {"request": request, "teams": teams, "auth": auth, "user": {}}
+        context = {"request": request, "teams": teams, "cursor": cursor, "next_cursor": next_cursor,
+                   "auth": auth, "user": {}}
         template = templates.render_template(template, **context)
         return template
     except Exception as e:
@@ -45,13 +55,29 @@ async def get_team_list(request: Request):
 @auth_required()
 async def update_team_list(request: Request):
     try:
-        asyncio.ensure_future(get_and_save_teams())
+        await enqueue_job("teams")
         return redirect_response('/team/list')
     except Exception as e:
         logger.error(f"update_team_list: {e}")
         return jsonify("Failed update team list: %s", e)
 
 
+@cached(page_cache, tags=lambda team_id, auth, version: [("team", team_id)])
+async def render_team_page(team_id: int, auth: bool, version: Optional[datetime]) -> Optional[str]:
+    async with async_session() as session:
+        instance = await get_team_from_id(session, team_id)
+        if not instance:
+            return None
+        members = await get_team_members(session, team_id)
+
+    leagues = await get_leagues_for_team(team_id)
+    hero_stats = await get_hero_stats('team', team_id, version=version)
+
+    context = {"team": instance, "leagues": leagues, "members": members,
+               "hero_stats": hero_stats, "auth": auth, "user": {}}
+    return render_html("/teams/detail.html", **context)
+
+
 @team.get("/:team_id")
 async def get_team(request):
     try:
@@ -60,18 +86,16 @@ async def get_team(request):
         if team_id is None:
             return not_found_response(request, 'team', team_id)
 
-        async with async_session() as session:
-            instance = await get_team_from_id(session, team_id)
-            if not instance:
-                return {"NoResultFound team": team_id}
-            members = await get_team_members(session, team_id)
-
-        leagues = await get_leagues_for_team(team_id)
+        updated_at = await get_team_updated_at(team_id)
+        etag = make_etag("team", team_id, bool(auth), updated_at)
+        headers = validator_headers(etag, updated_at)
+        if is_not_modified(request, etag, updated_at):
+            return not_modified_response(headers)
 
-        template = "/teams/detail.html"
-        context = {"request": request, "team": instance, "leagues": leagues, "members": members, "auth": auth,
-                   "user": {}}
-        return templates.render_template(template, **context)
+        body = await render_team_page(team_id, bool(auth), updated_at)
+        if body is None:
+            return {"NoResultFound team": team_id}
+        return html_response(body, headers=headers)
     except Exception as e:
         logger.error("get_team: %s", e)
         return jsonify("get_team: %s", e)
@@ -84,7 +108,7 @@ async def update_team(request):
         team_id = await parse_int(request.path_params["team_id"])
         if team_id is None:
             return redirect_response(f'/team/list')
-        asyncio.ensure_future(get_and_save_team(team_id))
+        await enqueue_job("team", team_id)
         return redirect_response(f'/team/{team_id}')
     except Exception as e:
         logger.error("update_team: %s", e)
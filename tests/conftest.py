@@ -0,0 +1,37 @@
+import importlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest_asyncio
+
+# the tests run against a throwaway SQLite database; the settings below are only
+# placeholders for values config/settings.py requires but these tests never use
+os.environ["USE_SQLITE_DB"] = "True"
+for name in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_PORT", "POSTGRES_DB", "FROM", "MAIL_PASSWORD",
+             "TO_MAIL", "SECRET", "ALLOWED_HOSTS", "JWT_PREFIX", "COOKIE_DOMAIN", "UPLOAD_FOLDER",
+             "TOKEN_STRATZ", "URL_IMG_HERO"):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# config.db opens ./db.sqlite3 relative to the working directory
+os.chdir(tempfile.mkdtemp(prefix="dota-tests-"))
+
+from config.db import Base, engine  # noqa: E402
+
+# register every app's tables on Base.metadata
+for app in ("account", "jobs", "leagues", "matches", "players", "teams"):
+    importlib.import_module(f"{app}.models")
+
+# SQLite cannot autoincrement the composite (id, uuid) key of users, which these tests do not need
+TABLES = [table for table in Base.metadata.sorted_tables if table.name != "users"]
+
+
+@pytest_asyncio.fixture
+async def db():
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.drop_all(sync_conn, tables=TABLES))
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=TABLES))
+    yield engine
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import select
+
+from common.execute import bulk_upsert
+from config.db import async_session
+from leagues.models import League
+
+
+async def get_leagues():
+    async with async_session() as session:
+        result = await session.execute(select(League.id, League.display_name, League.tier).order_by(League.id))
+        return result.all()
+
+
+@pytest.mark.asyncio
+async def test_conflicts_update_only_supplied_columns(db):
+    async with async_session() as session:
+        assert await bulk_upsert(session, League, [
+            {"id": 1, "display_name": "A", "tier": 2},
+            {"id": 2, "display_name": "B", "tier": 3},
+        ]) == [1, 2]
+        await session.commit()
+        # rows with different column sets; the missing tier of league 1 must not become NULL
+        await bulk_upsert(session, League, [
+            {"id": 1, "display_name": "A2"},
+            {"id": 2, "display_name": "B", "tier": 4},
+            {"id": 3, "tier": 1},
+        ])
+        await session.commit()
+
+    assert await get_leagues() == [(1, "A2", 2), (2, "B", 4), (3, None, 1)]
+
+
+@pytest.mark.asyncio
+async def test_unchanged_rows_are_skipped(db):
+    rows = [{"id": 1, "display_name": "A", "tier": 2}, {"id": 1, "display_name": "A", "tier": 3}]
+    async with async_session() as session:
+        # rows sharing a key collapse, last one wins
+        assert await bulk_upsert(session, League, rows) == [1]
+        await session.commit()
+        assert await bulk_upsert(session, League, rows) == []
+        # with update_fields only those columns are fingerprinted: the first call re-fingerprints
+        # the row, after that a change confined to other columns is skipped
+        assert await bulk_upsert(session, League, [{"id": 1, "display_name": "A", "tier": 5}],
+                                 update_fields=("display_name",)) == [1]
+        await session.commit()
+        assert await bulk_upsert(session, League, [{"id": 1, "display_name": "A", "tier": 6}],
+                                 update_fields=("display_name",)) == []
+        await session.commit()
+
+    assert await get_leagues() == [(1, "A", 3)]
+
+
+@pytest.mark.asyncio
+async def test_empty_update_fields_do_nothing(db):
+    async with async_session() as session:
+        await bulk_upsert(session, League, [{"id": 1, "display_name": "A"}])
+        await bulk_upsert(session, League, [{"id": 1, "display_name": "B"}, {"id": 2}], update_fields=())
+        await session.commit()
+
+    assert await get_leagues() == [(1, "A", None), (2, None, None)]
@@ -0,0 +1,61 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from common.cache import TTLCache, MISSING, cached
+
+
+def test_lru_eviction_and_expiry():
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    # "b" was the least recently used
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+
+    with mock.patch("common.cache.time.monotonic", return_value=10 ** 9):
+        assert cache.get("a") is MISSING
+    assert len(cache) == 1
+
+
+def test_tag_invalidation():
+    cache = TTLCache(maxsize=10, ttl=10)
+    cache.set("league-page", 1, [("league", 1)])
+    cache.set("team-page", 2, [("team", 5), ("league", 1)])
+    cache.set("other", 3, [("league", 2)])
+
+    cache.invalidate(("league", 1))
+
+    assert cache.get("league-page") is MISSING
+    assert cache.get("team-page") is MISSING
+    assert cache.get("other") == 3
+    # dropped entries no longer hold their other tags
+    cache.invalidate(("team", 5))
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_shares_concurrent_misses_and_skips_falsy():
+    cache = TTLCache(maxsize=10, ttl=10)
+    calls = []
+
+    @cached(cache, tags=lambda scope_id: [("league", scope_id)])
+    async def load(scope_id):
+        calls.append(scope_id)
+        await asyncio.sleep(0)
+        return {"id": scope_id} if scope_id else {}
+
+    assert await asyncio.gather(load(1), load(1)) == [{"id": 1}, {"id": 1}]
+    assert await load(1) == {"id": 1}
+    assert calls == [1]
+
+    await load(0)
+    await load(0)
+    assert calls == [1, 0, 0]
+
+    cache.invalidate(("league", 1))
+    await load(1)
+    assert calls == [1, 0, 0, 1]
@@ -0,0 +1,83 @@
+import copy
+
+import pytest
+from sqlalchemy import select
+
+from config.db import async_session
+from matches.models import HeroPickBanStat, Match
+from matches.services import save_match, rebuild_hero_pick_ban_stats, get_picks_updated_at
+
+MATCH = {
+    "id": 100,
+    "leagueId": 7,
+    "seriesId": 9,
+    "radiantTeamId": 1,
+    "direTeamId": 2,
+    "didRadiantWin": True,
+    "gameVersionId": 176,
+    "pickBans": [
+        {"order": order, "isPick": order % 2 == 0, "heroId": order + 1, "isRadiant": order % 2 == 0}
+        for order in range(6)
+    ],
+    "players": [],
+}
+
+
+async def get_counters():
+    async with async_session() as session:
+        result = await session.execute(select(HeroPickBanStat).filter(HeroPickBanStat.count != 0))
+        return sorted(
+            (row.scope_type, row.scope_id, row.game_version_id, row.hero_id, row.is_pick, row.count)
+            for row in result.scalars()
+        )
+
+
+@pytest.mark.asyncio
+async def test_incremental_counters_match_rebuild(db):
+    other = copy.deepcopy(MATCH)
+    other["id"] = 101
+    other["pickBans"][0]["heroId"] = 3
+    edited = copy.deepcopy(MATCH)
+    edited["pickBans"][1]["heroId"] = 50
+    edited["radiantTeamId"] = 5
+
+    for match_data in (MATCH, other, edited):
+        assert await save_match(match_data) == match_data["id"]
+    incremental = await get_counters()
+
+    assert await rebuild_hero_pick_ban_stats() == len(incremental)
+    assert await get_counters() == incremental
+    assert ("team", 5, 176, 1, True, 1) in incremental
+    assert ("team", 1, 176, 1, True, 1) not in incremental
+
+
+@pytest.mark.asyncio
+async def test_resaving_identical_match_is_noop(db):
+    await save_match(MATCH)
+    counters = await get_counters()
+    async with async_session() as session:
+        updated_at = (await session.execute(select(Match.updated_at).filter(Match.id == MATCH["id"]))).scalar()
+
+    assert await save_match(copy.deepcopy(MATCH)) == MATCH["id"]
+
+    assert await get_counters() == counters
+    async with async_session() as session:
+        assert (await session.execute(select(Match.updated_at).filter(Match.id == MATCH["id"]))).scalar() == updated_at
+
+
+@pytest.mark.asyncio
+async def test_picks_updated_at_follows_match_result(db):
+    await save_match(MATCH)
+    before = {scope: await get_picks_updated_at(*scope) for scope in (("league", 7), ("team", 1), ("all", 0))}
+    assert None not in before.values()
+    assert await get_picks_updated_at("league", 8) is None
+
+    await save_match(copy.deepcopy(MATCH))
+    assert {scope: await get_picks_updated_at(*scope) for scope in before} == before
+
+    flipped = copy.deepcopy(MATCH)
+    flipped["didRadiantWin"] = False
+    await save_match(flipped)
+
+    for scope, updated_at in before.items():
+        assert await get_picks_updated_at(*scope) > updated_at
@@ -0,0 +1,69 @@
+import random
+from collections import defaultdict
+
+import pytest
+
+from matches.stats import compute_hero_stats, wilson_interval
+
+FIRST_PHASE_BANS = 4
+
+
+def make_rows(seed=7, match_count=40):
+    rng = random.Random(seed)
+    rows = []
+    for match_id in range(1, match_count + 1):
+        league_id, radiant, dire = rng.choice([1, 2, None]), rng.randint(1, 4), rng.randint(5, 8)
+        game_version_id, did_radiant_win = rng.choice([175, 176]), rng.random() < 0.5
+        for order, hero_id in enumerate(rng.sample(range(1, 12), 8)):
+            is_radiant = rng.random() < 0.5 if order != 7 else None
+            rows.append((match_id, league_id, radiant, dire, game_version_id,
+                         did_radiant_win, is_radiant, hero_id, order % 3 != 0, order))
+    return rows
+
+
+def count_naively(rows):
+    matches, counts = defaultdict(set), defaultdict(lambda: defaultdict(int))
+    for match_id, league_id, radiant, dire, version, radiant_won, is_radiant, hero_id, is_pick, order in rows:
+        if is_radiant is None:
+            continue
+        team_id = radiant if is_radiant else dire
+        for scope in (("all", 0), ("league", league_id), ("team", team_id)):
+            if scope[1] is None:
+                continue
+            matches[(*scope, version)].add(match_id)
+            hero = counts[(*scope, version, hero_id)]
+            hero["picks"] += is_pick
+            hero["wins"] += is_pick and radiant_won == is_radiant
+            hero["bans"] += not is_pick
+            hero["first_phase_bans"] += not is_pick and order < FIRST_PHASE_BANS
+    return {
+        key: {"matches": len(matches[key[:3]]), **hero}
+        for key, hero in counts.items()
+    }
+
+
+def test_matches_a_plain_count():
+    rows = make_rows()
+    stats = compute_hero_stats(rows, FIRST_PHASE_BANS)
+
+    expected = count_naively(rows)
+    actual = {
+        (row["scope_type"], row["scope_id"], row["game_version_id"], row["hero_id"]):
+            {field: row[field] for field in ("matches", "picks", "wins", "bans", "first_phase_bans")}
+        for row in stats
+    }
+    assert actual == expected
+    for row in stats:
+        assert row["pick_rate"] == pytest.approx(row["picks"] / row["matches"])
+        assert row["win_rate_low"] <= row["win_rate"] <= row["win_rate_high"]
+
+
+def test_wilson_interval_bounds():
+    assert wilson_interval(0, 0) == (0.0, 0.0)
+    low, high = wilson_interval(5, 10)
+    assert low == pytest.approx(0.2366, abs=1e-4) and high == pytest.approx(0.7634, abs=1e-4)
+    assert wilson_interval(10, 10)[1] == 1.0
+
+
+def test_empty_input():
+    assert compute_hero_stats([], FIRST_PHASE_BANS) == []
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+from sqlalchemy import select, update
+
+from config.db import async_session
+from config.settings import settings
+from jobs.models import Job, JobStatus
+from jobs.services import enqueue_job, claim_job
+from jobs.worker import execute_job
+
+
+async def get_job(job):
+    async with async_session() as session:
+        result = await session.execute(select(Job).filter(Job.uuid == job.uuid))
+        return result.scalars().one()
+
+
+@pytest.mark.asyncio
+async def test_upstream_failure_is_retried_with_backoff(db):
+    job = await enqueue_job("league", 16435)
+    claimed = await claim_job("worker")
+    assert claimed.uuid == job.uuid
+
+    started = datetime.now()
+    with mock.patch("common.utils.fetch_data", mock.AsyncMock(return_value=None)):
+        await execute_job(claimed)
+
+    job = await get_job(job)
+    assert job.status == JobStatus.QUEUED
+    assert job.attempts == 1
+    assert "UpstreamError" in job.last_error
+    assert job.run_after >= started + timedelta(seconds=settings.JOB_RETRY_BACKOFF)
+
+
+@pytest.mark.asyncio
+async def test_failure_on_last_attempt_is_permanent(db):
+    job = await enqueue_job("leagues")
+    async with async_session() as session:
+        await session.execute(update(Job).where(Job.uuid == job.uuid).values(max_attempts=1))
+        await session.commit()
+    claimed = await claim_job("worker")
+
+    with mock.patch("common.utils.fetch_data", mock.AsyncMock(return_value=None)):
+        await execute_job(claimed)
+
+    job = await get_job(job)
+    assert job.status == JobStatus.FAILED
+    assert job.finished_at is not None
+    # the dedup key is free again once the job is no longer active
+    assert (await enqueue_job("leagues")).uuid != job.uuid
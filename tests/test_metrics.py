@@ -0,0 +1,43 @@
+import pytest
+from robyn import Response
+from sqlalchemy import text
+
+from common.metrics import instrument, responses_total
+from config.db import engine
+
+
+def status_count(route, status):
+    labels = (("method", "GET"), ("route", route), ("status", status))
+    return responses_total._values.get(labels, 0)
+
+
+@pytest.mark.asyncio
+async def test_status_of_plain_returns_and_errors():
+    async def as_dict():
+        return {"ok": True}
+
+    def as_response():
+        return Response(status_code=404, description="", headers={})
+
+    async def failing():
+        raise RuntimeError("boom")
+
+    assert await instrument(as_dict, "GET", "/dict")() == {"ok": True}
+    instrument(as_response, "GET", "/response")()
+    with pytest.raises(RuntimeError):
+        await instrument(failing, "GET", "/failing")()
+
+    assert status_count("/dict", "200") == 1
+    assert status_count("/dict", "500") == 0
+    assert status_count("/response", "404") == 1
+    assert status_count("/failing", "500") == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_statement_clears_query_start():
+    async with engine.connect() as conn:
+        with pytest.raises(Exception):
+            await conn.execute(text("SELECT * FROM no_such_table"))
+        assert not conn.sync_connection.info.get("query_start")
+        await conn.execute(text("SELECT 1"))
+        assert not conn.sync_connection.info.get("query_start")
@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from common.pagination import encode_cursor, decode_cursor, fetch_keyset_page, keyset_page
+from config.db import async_session
+from players.models import Player
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    assert decode_cursor(encode_cursor([1700000000, 42])) == [1700000000, 42]
+    assert decode_cursor(encode_cursor([None, 42])) == [None, 42]
+    assert decode_cursor(None) is None
+    assert decode_cursor("not-a-cursor") is None
+    assert decode_cursor(encode_cursor(["1", 2])) is None
+
+
+def test_seek_is_a_row_value_comparison():
+    stmt = keyset_page(select(Player.id), Player.last_match_date, Player.id, [1700000000, 42], limit=50)
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "(players.last_match_date, players.id) < (" in sql
+    assert " OR " not in sql
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 8])
+async def test_pages_visit_every_row_once_nulls_last(db, limit):
+    # duplicate and NULL sort keys exercise the id tie-breaker and the NULL tail
+    dates = [300, 200, 200, None, 100, None, 200, 300]
+    async with async_session() as session:
+        session.add_all(Player(id=player_id, last_match_date=date) for player_id, date in enumerate(dates, start=1))
+        await session.commit()
+
+    seen, cursor = [], None
+    while True:
+        async with async_session() as session:
+            page, next_cursor = await fetch_keyset_page(session, select(Player), Player.last_match_date, Player.id,
+                                                        cursor, "last_match_date", limit=limit)
+        assert len(page) == limit or next_cursor is None
+        seen.extend((player.last_match_date, player.id) for player in page)
+        if next_cursor is None:
+            break
+        cursor = decode_cursor(next_cursor)
+
+    assert seen == [(300, 8), (300, 1), (200, 7), (200, 3), (200, 2), (100, 5), (None, 6), (None, 4)]
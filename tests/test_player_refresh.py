@@ -0,0 +1,51 @@
+from unittest import mock
+
+import pytest
+from sqlalchemy import select
+
+from config.db import async_session
+from players.models import Player, SteamAccount, ProSteamAccount
+from players.services import get_and_save_player, get_and_save_pro_players
+from teams.models import TeamMember
+
+PRO_ACCOUNT = {"steamAccountId": 42, "name": "Miracle-", "realName": "Amer", "teamId": 5, "isPro": True}
+PLAYER = {
+    "steamAccountId": 42,
+    "date": 1725000000,
+    "matchCount": 100,
+    "winCount": 60,
+    "languageCode": ["en"],
+    "steamAccount": {"id": 42, "name": "miracle", "realName": "Amer", "proSteamAccount": PRO_ACCOUNT},
+    "team": {"teamId": 5, "firstMatchId": 1, "lastMatchId": 9, "lastMatchDateTime": 1725000000},
+}
+
+
+def upstream(url, expected_type):
+    return {"42": PRO_ACCOUNT} if url.endswith("/proSteamAccount") else PLAYER
+
+
+async def get_updated_at():
+    async with async_session() as session:
+        return [
+            (await session.execute(select(model.updated_at).order_by(model.updated_at))).scalars().all()
+            for model in (Player, SteamAccount, ProSteamAccount, TeamMember)
+        ]
+
+
+@pytest.mark.asyncio
+async def test_identical_refresh_writes_nothing(db):
+    with mock.patch("common.utils.fetch_data", mock.AsyncMock(side_effect=upstream)):
+        await get_and_save_player(42)
+        written = await get_updated_at()
+        async with async_session() as session:
+            player = (await session.execute(select(Player).filter(Player.id == 42))).scalars().one()
+            assert player.team_id is not None and player.match_count == 100
+
+        await get_and_save_player(42)
+        await get_and_save_pro_players()
+        await get_and_save_player(42)
+
+    assert await get_updated_at() == written
+    async with async_session() as session:
+        account = (await session.execute(select(SteamAccount).filter(SteamAccount.id == 42))).scalars().one()
+        assert account.name == "miracle"